@@ -1,14 +1,31 @@
 from flask import Flask
 from routes.core import bp as core_bp
 from routes.debug import bp as debug_bp
+from logic import lifecycle
+
+
+def create_app(preload: bool = False) -> Flask:
+    """Build the Flask app.
+
+    With ``preload`` (gunicorn's master, before it forks) the catalog, every
+    form's sections, choices, compiled plans and pre-rendered modals are
+    warmed synchronously so the workers inherit them. Otherwise the warm-up
+    runs in the background.
+    """
+
+    # I'm bootstrapping the Flask app here so future me remembers where it all starts.
+    app = Flask(__name__)
+    # Keeping the main routes wired up; don't forget these if things vanish.
+    app.register_blueprint(core_bp)
+    # Debug routes live here for when I need to poke around.
+    app.register_blueprint(debug_bp)
+
+    # Snapshots, the warm-up and the refresh hook live in
+    # ``logic.lifecycle`` so importing this module stays side-effect free.
+    lifecycle.startup(preload=preload)
+    return app
 
-# I'm bootstrapping the Flask app here so future me remembers where it all starts.
-app = Flask(__name__)
-# Keeping the main routes wired up; don't forget these if things vanish.
-app.register_blueprint(core_bp)
-# Debug routes live here for when I need to poke around.
-app.register_blueprint(debug_bp)
 
 if __name__ == "__main__":
     # Running the dev server directly because that's how I like to test.
-    app.run(host="0.0.0.0", port=5000)
+    create_app().run(host="0.0.0.0", port=5000)
@@ -0,0 +1,262 @@
+"""asyncio entry point for the Slack endpoints.
+
+Serves ``/it-ticket``, ``/interactions`` and ``/options`` like
+``routes/core.py`` does, but each interaction is a task on one event loop
+instead of an OS thread, and Freshdesk/Slack calls go through the pooled
+async clients. Run it with any ASGI server, e.g.
+``uvicorn asgi:app --host 0.0.0.0 --port 5000``. The debug
+routes stay on the Flask app.
+"""
+from __future__ import annotations
+import asyncio, json, logging
+from urllib.parse import parse_qs
+from config import ENABLE_WIZARD
+from services import freshdesk, slack
+from services.freshdesk import afd_post, get_ticket_forms_cached, get_ticket_fields_cached
+from services.slack import aslack_api, aget_user_email
+from services.coalesce import VIEWS, action_seq
+from logic import lifecycle
+from logic.forms import portal_picker_modal
+from logic.choice_search import options_for
+from logic.single_page import build_form_fields_modal
+from logic.wizard import (
+    aopen_wizard_first_page,
+    aupdate_wizard,
+    wizard_submission,
+    WIZARD_SESSIONS,
+    SESSION_EXPIRED_VIEW,
+)
+from logic.ticket import modal_values_to_fd_ticket
+from ui import loading_modal, error_modal, ticket_created_modal
+
+log = logging.getLogger(__name__)
+
+# Fire-and-forget work scheduled after acking Slack; kept here so the
+# tasks aren't garbage collected mid-flight.
+_TASKS: set[asyncio.Task] = set()
+
+
+def _spawn(coro):
+    task = asyncio.get_running_loop().create_task(coro)
+    _TASKS.add(task)
+    task.add_done_callback(_TASKS.discard)
+    return task
+
+
+def _spawn_latest(key, seq, job, droppable: bool = True):
+    # Same per-view latest-wins queue as the Flask routes; ``job`` makes a coroutine.
+    if VIEWS.offer(key, seq, job, droppable):
+        _spawn(_drain(key))
+
+
+async def _drain(key):
+    # See ``executor._drain``: a failed job is logged, and a cancelled
+    # drainer frees its key so the next update starts a new one.
+    try:
+        while (item := VIEWS.next(key)) is not None:
+            seq, job = item
+            try:
+                await job()
+            except Exception as e:
+                log.exception("View job for %s failed: %s", key, e)
+            finally:
+                VIEWS.rendered(key, seq)
+    except BaseException:
+        VIEWS.abandon(key)
+        raise
+
+
+async def _update_view(view_id: str, view_hash: str | None, view: dict):
+    try:
+        await aslack_api("views.update", {"view_id": view_id, "hash": view_hash, "view": view}, supersede=view_id)
+    except RuntimeError:
+        await aslack_api("views.update", {"view_id": view_id, "view": view}, supersede=view_id)
+
+
+async def _notify_user_ticket_created(user_id: str, ticket_id: int) -> bool:
+    try:
+        dm = await aslack_api("conversations.open", {"users": user_id})
+        channel_id = (dm.get("channel") or {}).get("id") or user_id
+        await aslack_api("chat.postMessage", {"channel": channel_id, "text": f"Ticket created: {ticket_id}"})
+        return True
+    except Exception as e:
+        log.exception("Notify user failed: %s", e)
+        return False
+
+
+async def _create_ticket(payload: dict, values: dict, ticket_form_id, token: str | None = None):
+    user_id = (payload.get("user") or {}).get("id")
+    user_email = await aget_user_email(user_id) if user_id else None
+    # Mapping values may look up fields and the session store is SQLite or
+    # Redis; both block, so they run off the event loop.
+    fd_ticket = await asyncio.to_thread(modal_values_to_fd_ticket, values, ticket_form_id, user_email)
+    try:
+        created = await afd_post("/api/v2/tickets", fd_ticket)
+        ticket_id = created.get("id")
+        log.info("✅ Ticket created: %s", ticket_id)
+        notified = await _notify_user_ticket_created(user_id, ticket_id) if user_id and ticket_id else False
+        if token:
+            await asyncio.to_thread(WIZARD_SESSIONS.pop, token, None)
+        if notified:
+            return {"response_action": "clear"}
+        return {"response_action": "update", "view": ticket_created_modal(ticket_id)}
+    except Exception as e:
+        log.exception("Ticket create failed: %s", e)
+        return {"response_action": "errors", "errors": {"subject": "Ticket creation failed. Please try again."}}
+
+
+async def _single_page_update(view: dict, ticket_form_id, state_values: dict | None):
+    try:
+        forms, fd_fields = await asyncio.gather(
+            asyncio.to_thread(get_ticket_forms_cached),
+            asyncio.to_thread(get_ticket_fields_cached),
+        )
+        form = next((f for f in forms if str(f["id"]) == str(ticket_form_id)), None)
+        # The single-page builder resolves sections as it renders; keep it off the loop.
+        updated = await asyncio.to_thread(build_form_fields_modal, form, fd_fields, state_values)
+        await _update_view(view["id"], view.get("hash"), updated)
+    except Exception as e:
+        log.exception("Live update failed: %s", e)
+
+
+async def it_ticket_command(form: dict):
+    trigger_id = form.get("trigger_id")
+    initial = await aslack_api("views.open", {"trigger_id": trigger_id, "view": loading_modal("Loading forms...")})
+    view_info = initial.get("view") or {}
+    view_id = view_info.get("id")
+
+    async def _populate():
+        try:
+            picker = await asyncio.to_thread(portal_picker_modal)
+            await _update_view(view_id, view_info.get("hash"), picker)
+        except Exception as e:
+            log.exception("Opening form picker failed: %s", e)
+            err_view = error_modal(f":warning: Failed to load forms.\n`{e}`")
+            await aslack_api("views.update", {"view_id": view_id, "view": err_view}, supersede=view_id)
+
+    _spawn(_populate())
+    return None
+
+
+async def interactions(form: dict):
+    payload = json.loads(form["payload"])
+    ptype = payload.get("type")
+    view = payload.get("view", {})
+    cb = view.get("callback_id")
+    try:
+        meta = json.loads(view.get("private_metadata") or "{}")
+    except json.JSONDecodeError:
+        meta = {}
+    state_values = view.get("state", {}).get("values", {}) or {}
+
+    if ptype == "view_submission" and cb == "pick_form":
+        sel = state_values.get("form_select", {}).get("ticket_form_select", {})
+        chosen = (sel.get("selected_option") or {}).get("value")
+        if not chosen or chosen == "__noop__":
+            return {"response_action": "errors", "errors": {"form_select": "Please choose a ticket type"}}
+        seq = action_seq(payload)
+        if ENABLE_WIZARD:
+            job = lambda: aopen_wizard_first_page(view["id"], int(chosen), view.get("hash"))
+        else:
+            job = lambda: _single_page_update(view, chosen, None)
+        _spawn_latest(view["id"], seq, job, droppable=False)
+        return {"response_action": "update", "view": loading_modal("Loading form...")}
+
+    if ptype == "block_actions":
+        if ENABLE_WIZARD and meta.get("wizard_token"):
+            nav = None
+            for a in payload.get("actions", []) or []:
+                if a.get("action_id") == "wizard_next":
+                    nav = "next"
+                elif a.get("action_id") == "wizard_prev":
+                    nav = "prev"
+            _spawn_latest(
+                view["id"], action_seq(payload),
+                lambda: aupdate_wizard(view["id"], meta["wizard_token"], view.get("hash"), state_values, nav, meta),
+                droppable=nav is None,
+            )
+        elif meta.get("ticket_form_id"):
+            _spawn_latest(
+                view["id"], action_seq(payload),
+                lambda: _single_page_update(view, meta["ticket_form_id"], state_values),
+            )
+        return None
+
+    if ptype == "view_submission" and cb == "submit_it_ticket":
+        return await _create_ticket(payload, view["state"]["values"], meta.get("ticket_form_id"))
+
+    if ptype == "view_submission" and cb == "wizard_submit":
+        try:
+            token, merged, ticket_form_id = await asyncio.to_thread(wizard_submission, meta, state_values)
+        except KeyError:
+            return {"response_action": "update", "view": SESSION_EXPIRED_VIEW}
+        return await _create_ticket(payload, merged, ticket_form_id, token)
+
+    return None
+
+
+async def options_load(form: dict):
+    payload = json.loads(form["payload"])
+    if payload.get("type") != "block_suggestion":
+        return {"options": []}
+    # Answered from the in-memory index; only a cold field touches the network.
+    options = await asyncio.to_thread(options_for, payload.get("action_id"), payload.get("value"))
+    return {"options": options}
+
+
+ROUTES = {
+    ("POST", "/it-ticket"): it_ticket_command,
+    ("POST", "/interactions"): interactions,
+    ("POST", "/options"): options_load,
+}
+
+
+async def _read_form(receive) -> dict:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    return {k: v[0] for k, v in parse_qs(body.decode("utf-8")).items()}
+
+
+async def _respond(send, status: int, body: dict | None):
+    raw = json.dumps(body).encode() if body is not None else b""
+    headers = [(b"content-type", b"application/json")] if body is not None else []
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": raw})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Same startup as app.py: snapshots, then crawl now and whenever
+            # the catalog changes.
+            lifecycle.startup()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            for mod in (freshdesk, slack):
+                client = mod._ACLIENT.get("client")
+                if client is not None:
+                    await client.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+    handler = ROUTES.get((scope["method"], scope["path"]))
+    if handler is None:
+        return await _respond(send, 404, {"error": "not found"})
+    form = await _read_form(receive)
+    try:
+        body = await handler(form)
+    except Exception as e:
+        log.exception("Handling %s failed: %s", scope["path"], e)
+        return await _respond(send, 500, None)
+    await _respond(send, 200, body)
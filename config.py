@@ -1,13 +1,19 @@
 import os
 import logging
+from pathlib import Path
 from dotenv import load_dotenv
 
-# I want logging ready right away, so I'm pulling in env vars first thing.
-load_dotenv()
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
+# Pulling in env vars first thing, from the .env next to this file only
+# (no directory search), so the settings below can read them.
+load_dotenv(Path(__file__).resolve().parent / ".env")
+
+
+def configure_logging():
+    # Entry points call this; importing config alone leaves logging alone.
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s [%(levelname)s] %(message)s"
+    )
 
 def _as_bool(v: str | None, default=False):
     # Tiny helper so I stop rewriting the same truthy checks everywhere.
@@ -26,11 +32,54 @@ PORTAL_TICKET_FORM_URL = os.getenv("PORTAL_TICKET_FORM_URL") or f"https://{FRESH
 # Feature flags I flip on and off when experimenting.
 ENABLE_WIZARD    = _as_bool(os.getenv("ENABLE_WIZARD"), True)
 WIZARD_CROSS_SECTION_CHILDREN = _as_bool(os.getenv("WIZARD_CROSS_SECTION_CHILDREN"), True)
+# Carry wizard answers in each view's private_metadata instead of the session
+# store; forms whose answers don't fit still fall back to WIZARD_SESSIONS.
+WIZARD_STATELESS = _as_bool(os.getenv("WIZARD_STATELESS"), False)
 
 # Misc knobs I might tweak later.
 ALLOWED_FORM_IDS = [s.strip() for s in (os.getenv("ALLOWED_FORM_IDS", "")).split(",") if s.strip()]
 HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "12.0"))
 MAX_BLOCKS   = int(os.getenv("MAX_BLOCKS", "49"))
+# Dropdowns with more choices than this load them from /options as the user
+# types (Slack external_select) instead of shipping them all in the view.
+EXTERNAL_SELECT_THRESHOLD = int(os.getenv("EXTERNAL_SELECT_THRESHOLD", "100"))
+FORM_DETAIL_TTL = int(os.getenv("FORM_DETAIL_TTL", "300"))
+# Past the TTL the last good catalog is still served while a refresh runs,
+# but never once it is older than this many seconds.
+CATALOG_MAX_STALE = int(os.getenv("CATALOG_MAX_STALE", "3600"))
+# Freshdesk budget per minute until the API tells us the real one, the share
+# of it kept back for ticket creation, and how long a read may queue for it.
+FD_RATE_LIMIT = int(os.getenv("FD_RATE_LIMIT", "100"))
+FD_TICKET_RESERVE = float(os.getenv("FD_TICKET_RESERVE", "0.2"))
+FD_RATE_WAIT = float(os.getenv("FD_RATE_WAIT", "30.0"))
+FD_MAX_RETRIES = int(os.getenv("FD_MAX_RETRIES", "3"))
+# How long a Slack call may queue for its method's budget, and how many
+# times a 429 is retried.
+SLACK_RATE_WAIT = float(os.getenv("SLACK_RATE_WAIT", "10.0"))
+SLACK_MAX_RETRIES = int(os.getenv("SLACK_MAX_RETRIES", "3"))
+# Where the on-disk catalog snapshot lives; set SNAPSHOT_PATH empty to disable it.
+DATA_DIR = os.getenv("DATA_DIR") or str(Path(__file__).resolve().parent / "data")
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", str(Path(DATA_DIR) / "catalog.sqlite3"))
+SECTIONS_CONCURRENCY = int(os.getenv("SECTIONS_CONCURRENCY", "8"))
+SECTIONS_DEADLINE = float(os.getenv("SECTIONS_DEADLINE", "10.0"))
+# A plan cut short by SECTIONS_DEADLINE is reused for this long before the
+# next open pays for another compile.
+PARTIAL_PLAN_RETRY = float(os.getenv("PARTIAL_PLAN_RETRY", "30"))
+# Shared worker pool for interaction work: total workers, queue bound per
+# lane, and workers kept free of picker/live-update work for submits and nav.
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", "16"))
+WORKER_QUEUE_MAX = int(os.getenv("WORKER_QUEUE_MAX", "200"))
+WORKER_RESERVED = int(os.getenv("WORKER_RESERVED", "2"))
+# Wizard sessions: idle lifetime in seconds, and the caps that evict the
+# least recently used ones first.
+WIZARD_SESSION_TTL = int(os.getenv("WIZARD_SESSION_TTL", "3600"))
+WIZARD_SESSION_MAX = int(os.getenv("WIZARD_SESSION_MAX", "5000"))
+WIZARD_SESSION_MAX_BYTES = int(os.getenv("WIZARD_SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+# Where wizard sessions live: "memory" (one process), "sqlite" (workers on
+# one host share SESSION_SQLITE_PATH) or "redis" (any replica, REDIS_URL).
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", str(Path(DATA_DIR) / "sessions.sqlite3"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
 # I like this order when the portal doesn't force a specific form list.
 PORTAL_FORMS_ORDER = [
@@ -0,0 +1,57 @@
+"""Microbenchmark: rendering every dropdown's blocks, uncached vs cached.
+
+    python debug/bench_blocks.py [--choices 60] [--rounds 200]
+
+Uses the dropdowns in the bundled ticket_fields.json (96 plus ticket type). That
+file carries no choice lists, so each dropdown gets ``--choices`` synthetic ones,
+a few long enough to go through the hashed proxy values like real catalogs.
+"""
+import argparse, json, pathlib, sys, time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from logic.mapping import DROPDOWN_LIKE, to_slack_block, normalize_blocks, field_blocks, clear_block_cache
+
+
+def _dropdowns(n_choices: int) -> list[dict]:
+    fields = json.loads((ROOT / "ticket_fields.json").read_text(encoding="utf-8"))
+    out = []
+    for f in fields:
+        if f.get("type") not in DROPDOWN_LIKE:
+            continue
+        f = dict(f, displayed_to_customers=True)
+        f["choices"] = [
+            f"{f['name']} option {i}" + (" - " + "long description " * 10 if i % 10 == 0 else "")
+            for i in range(n_choices)
+        ]
+        out.append(f)
+    return out
+
+
+def _time(render, fields, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for f in fields:
+            render(f)
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--choices", type=int, default=60)
+    ap.add_argument("--rounds", type=int, default=200)
+    args = ap.parse_args()
+
+    fields = _dropdowns(args.choices)
+    clear_block_cache()
+    uncached = _time(lambda f: normalize_blocks(to_slack_block(f)), fields, args.rounds)
+    cached = _time(field_blocks, fields, args.rounds)
+    per = 1e6 / (args.rounds * len(fields))
+    print(f"{len(fields)} dropdowns x {args.choices} choices, {args.rounds} rounds")
+    print(f"  to_slack_block  {uncached * per:8.1f} us/field")
+    print(f"  field_blocks    {cached * per:8.1f} us/field   ({uncached / cached:.0f}x less CPU)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Production server: ``gunicorn -c gunicorn.conf.py``.
+
+The app is built once in the master with every cache filled, frozen out of
+the garbage collector, and then forked, so all workers share the catalog,
+sections and compiled plans copy-on-write. Each worker opens its own HTTP
+and SQLite connections and recreates its locks after the fork (see the
+``register_at_fork`` hooks in ``services`` and ``logic.warmup``).
+"""
+import gc
+import os
+import multiprocessing
+from config import SESSION_BACKEND
+
+wsgi_app = "app:create_app(preload=True)"
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+# "memory" sessions live in one process: a wizard click handled by another
+# worker would find no session. Several workers need a shared backend.
+_default_workers = 1 if SESSION_BACKEND == "memory" else multiprocessing.cpu_count() * 2 + 1
+workers = int(os.getenv("WEB_CONCURRENCY", _default_workers))
+if SESSION_BACKEND == "memory" and workers > 1:
+    raise RuntimeError(
+        f"SESSION_BACKEND=memory cannot be shared by {workers} workers; "
+        "set SESSION_BACKEND=sqlite or redis, or WEB_CONCURRENCY=1"
+    )
+# Interaction handlers mostly wait on Slack/Freshdesk, so threads per worker pay off.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+preload_app = True
+accesslog = "-"
+
+# Collections during preload only move objects around; skip them until the fork.
+gc.disable()
+
+
+# How long the master waits for background refreshes before forking anyway.
+_quiesce_timeout = float(os.getenv("PRELOAD_QUIESCE_TIMEOUT", "30"))
+
+
+def when_ready(server):
+    from logic import lifecycle
+
+    # A refresh thread forked mid-way would leave its locks held and its
+    # half-written caches in every worker; let them finish first.
+    if not lifecycle.quiesce(_quiesce_timeout):
+        server.log.warning("Forking with background refreshes still running")
+    # Everything allocated so far is shared with the workers; keep the
+    # collector from touching (and so copying) those pages. Workers inherit
+    # the collector switched back on.
+    gc.collect()
+    gc.freeze()
+    gc.enable()
+    server.log.info("Preloaded caches frozen: %d objects", gc.get_freeze_count())
@@ -1,7 +1,10 @@
 from __future__ import annotations
+import asyncio
 import logging
-from services.freshdesk import get_sections, fd_get
+from services import snapshot
+from services.freshdesk import get_sections, aget_sections, fd_get
 from logic.mapping import iter_choice_items, extract_input
+from logic.forms import normalize_id_list
 from logic.mapping import ensure_choices, get_field_choices  # used by resolver
 from config import FRESHDESK_EMAIL
 
@@ -15,8 +18,58 @@ def get_sections_cached(field_id: int):
     if secs is None:
         secs = get_sections(field_id) or []
         SECTIONS_CACHE[field_id] = secs
+        snapshot.save("sections", field_id, secs)
     return secs
 
+def refresh_sections(field_id: int):
+    # Swap in a fresh copy without ever leaving a gap for readers.
+    secs = get_sections(field_id) or []
+    SECTIONS_CACHE[field_id] = secs
+    snapshot.save("sections", field_id, secs)
+    return secs
+
+async def aprefetch_sections(root_ids, fields: list[dict]):
+    """Fill ``SECTIONS_CACHE`` for the section graph under ``root_ids``.
+
+    Each BFS level is fetched concurrently on the event loop, so a plan
+    compiled afterwards only reads memory. The level's snapshot write runs
+    in a thread; it shares a lock with the warm-up's commits.
+    """
+    nested = {
+        str(f.get("id")): [str(d.get("id")) for d in f.get("dependent_fields") or [] if isinstance(d, dict)]
+        for f in fields if f.get("type") == "nested_field"
+    }
+    seen = {str(i) for i in normalize_id_list(root_ids or [])}
+    frontier = [fid for fid in seen if fid.isdigit()]
+    while frontier:
+        missing = [int(fid) for fid in frontier if int(fid) not in SECTIONS_CACHE]
+        found = await asyncio.gather(*(aget_sections(fid) for fid in missing), return_exceptions=True)
+        fresh = {}
+        for fid, secs in zip(missing, found):
+            if isinstance(secs, Exception):
+                log.debug("Section prefetch for %s failed: %s", fid, secs)
+                continue
+            SECTIONS_CACHE[fid] = fresh[fid] = secs or []
+        if fresh:
+            await asyncio.to_thread(snapshot.save_many, "sections", fresh)
+        next_frontier = []
+        for fid in frontier:
+            kids = list(nested.get(fid, []))
+            for sec in SECTIONS_CACHE.get(int(fid)) or []:
+                kids.extend(str(c) for c in normalize_id_list(sec.get("fields") or []))
+            for cid in kids:
+                if cid not in seen:
+                    seen.add(cid)
+                    if cid.isdigit():
+                        next_frontier.append(cid)
+        frontier = next_frontier
+
+def load_sections_snapshot():
+    # Sections from the last run, loaded at startup (``logic.lifecycle``);
+    # the startup crawl refetches them in place.
+    for key, (_saved_at, secs) in snapshot.load("sections").items():
+        SECTIONS_CACHE.setdefault(int(key), secs)
+
 def activator_values(sec_obj) -> list[str]:
     src = sec_obj.get("choices") or sec_obj.get("values") or sec_obj.get("option_values") or {}
     vals = []
@@ -0,0 +1,103 @@
+"""Typeahead over large dropdowns for Slack ``external_select`` menus.
+
+Dropdowns with more than ``EXTERNAL_SELECT_THRESHOLD`` choices render as
+``external_select`` (see ``mapping.to_slack_block``); Slack then asks the
+options-load endpoint for matches as the user types. Each field gets one
+:class:`ChoiceIndex` per choice list, so it is built once per catalog and
+every keystroke is answered from memory.
+"""
+from __future__ import annotations
+import logging
+from bisect import bisect_left
+from logic.mapping import get_field_choices, choices_to_slack_options, ensure_choices, field_by_name
+
+log = logging.getLogger(__name__)
+
+# Slack shows at most this many options per response.
+MAX_OPTIONS = 100
+
+
+def _norm(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ChoiceIndex:
+    """Word-prefix and trigram index over a dropdown's option labels.
+
+    Query tokens shorter than three characters match the start of a label
+    word; longer ones match anywhere in the label, narrowed by trigrams
+    first. Every token must match. Labels starting with the whole query
+    come first, then labels with a word starting with it, in list order.
+    """
+
+    def __init__(self, options: list[dict]):
+        self.options = options
+        self._labels = [_norm(o["text"]["text"]) for o in options]
+        words = set()
+        grams: dict[str, list[int]] = {}
+        for i, label in enumerate(self._labels):
+            words.update((w, i) for w in label.split())
+            for g in _grams(label):
+                grams.setdefault(g, []).append(i)
+        self._words = sorted(words)
+        self._grams = {g: frozenset(ids) for g, ids in grams.items()}
+
+    def _prefix(self, token: str) -> set[int]:
+        hits = set()
+        pos = bisect_left(self._words, (token,))
+        while pos < len(self._words) and self._words[pos][0].startswith(token):
+            hits.add(self._words[pos][1])
+            pos += 1
+        return hits
+
+    def _substring(self, token: str) -> set[int]:
+        postings = sorted((self._grams.get(g, frozenset()) for g in _grams(token)), key=len)
+        if not postings[0]:
+            return set()
+        found = set(postings[0]).intersection(*postings[1:])
+        return {i for i in found if token in self._labels[i]}
+
+    def search(self, query: str, limit: int = MAX_OPTIONS) -> list[dict]:
+        query = _norm(query or "")
+        if not query:
+            return self.options[:limit]
+        hits: set[int] | None = None
+        for token in query.split():
+            found = self._prefix(token) if len(token) < 3 else self._substring(token)
+            hits = found if hits is None else hits & found
+            if not hits:
+                return []
+
+        def _rank(i: int):
+            label = self._labels[i]
+            if label.startswith(query):
+                return (0, i)
+            return (1 if f" {query}" in f" {label}" else 2, i)
+
+        return [self.options[i] for i in sorted(hits, key=_rank)[:limit]]
+
+
+# field id -> (choice list, ChoiceIndex); holding the list keeps its id unique.
+_INDEXES: dict[object, tuple] = {}
+
+
+def index_for(field: dict) -> ChoiceIndex:
+    choices = get_field_choices(ensure_choices(field))
+    entry = _INDEXES.get(field.get("id"))
+    if entry is None or entry[0] is not choices:
+        entry = (choices, ChoiceIndex(choices_to_slack_options(choices, field)))
+        _INDEXES[field.get("id")] = entry
+    return entry[1]
+
+
+def options_for(action_id: str, query: str) -> list[dict]:
+    """Options matching ``query`` for the dropdown behind ``action_id``."""
+    field = field_by_name(action_id)
+    if field is None:
+        log.info("Options requested for unknown field %s", action_id)
+        return []
+    return index_for(field).search(query)
@@ -1,9 +1,14 @@
 import logging, os
 from config import PORTAL_FORMS_ORDER, ALLOWED_FORM_IDS
+from services.freshdesk import get_ticket_forms_cached, catalog_version
 from logic.mapping import slug
+from ui import build_form_picker_modal
 
 log = logging.getLogger(__name__)
 
+# The picker only changes with the forms catalog: {"key", "view"}.
+_PICKER: dict = {"key": None, "view": None}
+
 def filter_portal_forms(forms: list[dict]):
     # Logging what's available so I can see what Freshdesk is handing back.
     log.info("FD forms available: %s", [f.get("name") for f in forms])
@@ -49,3 +54,17 @@ def normalize_id_list(raw_ids):
         else:
             ids.append(f)
     return ids
+
+def portal_picker_modal():
+    """Return the form picker for the current catalog.
+
+    Built once per catalog version (and forms list) and shared, so callers
+    must treat the returned view as read-only.
+    """
+
+    forms = get_ticket_forms_cached()
+    key = (catalog_version(), id(forms))
+    if _PICKER["key"] != key:
+        _PICKER["view"] = build_form_picker_modal(filter_portal_forms(forms))
+        _PICKER["key"] = key
+    return _PICKER["view"]
@@ -0,0 +1,79 @@
+"""Process startup, kept out of module import.
+
+Importing any module in this app is cheap and offline: no files are parsed,
+no threads are started and nothing talks to Freshdesk. The entry points
+(``app.create_app``, the ASGI lifespan, ``python app.py``) call
+``startup`` once instead.
+"""
+from __future__ import annotations
+import logging
+import threading
+import time
+from config import configure_logging
+from services import freshdesk
+from logic import branching, warmup
+
+log = logging.getLogger(__name__)
+
+_STARTED = False
+_LOCK = threading.Lock()
+
+
+def load_snapshots():
+    """Seed the catalog and section caches from disk so the first requests
+    can be served stale while the crawl revalidates them."""
+    freshdesk.load_snapshot()
+    branching.load_sections_snapshot()
+
+
+def startup(preload: bool = False) -> bool:
+    """Run the one-time startup; later calls are no-ops.
+
+    With ``preload`` the warm-up (see ``warmup.warm_up``) finishes before
+    this returns (gunicorn's master, before it forks). Otherwise it runs in
+    the background. Returns ``False`` if startup already ran.
+    """
+
+    global _STARTED
+    with _LOCK:
+        if _STARTED:
+            return False
+        _STARTED = True
+    configure_logging()
+    load_snapshots()
+    # Warming every form now and whenever the catalog changes, so users never
+    # pay for a section lookup, plan compile or choice fetch themselves.
+    # Startup refetches sections in place since anything already cached
+    # came from the disk snapshot.
+    freshdesk.on_catalog_refresh(warmup.on_catalog_refresh)
+    if preload:
+        warmup.warm_up(refresh=True)
+    else:
+        warmup.start_background_warm_up(refresh=True)
+    return True
+
+
+def _background_threads() -> list[threading.Thread]:
+    names = {freshdesk.BACKGROUND_THREAD, warmup.CRAWL_THREAD, warmup.WARM_THREAD}
+    return [t for t in threading.enumerate() if t.name in names and t is not threading.current_thread()]
+
+
+def quiesce(timeout: float = 30.0) -> bool:
+    """Wait for background catalog refreshes, crawls and warm-ups to finish.
+
+    Called before forking workers, so no thread is mid-refresh (holding a
+    lock or half-way through a cache) when the process is copied. A refresh
+    that finishes may start a warm-up, so this waits until none are left.
+    Returns ``False`` if some are still running after ``timeout`` seconds.
+    """
+
+    deadline = time.monotonic() + timeout
+    while True:
+        threads = _background_threads()
+        if not threads:
+            return True
+        left = deadline - time.monotonic()
+        if left <= 0:
+            log.warning("%d background threads still running: %s", len(threads), [t.name for t in threads])
+            return False
+        threads[0].join(left)
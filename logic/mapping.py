@@ -1,7 +1,7 @@
 from __future__ import annotations
-import re, hashlib, logging
-from config import MAX_BLOCKS
-from services.freshdesk import fetch_field_detail
+import re, hashlib, logging, asyncio
+from config import MAX_BLOCKS, EXTERNAL_SELECT_THRESHOLD
+from services.freshdesk import fetch_field_detail, afetch_field_detail, get_ticket_fields_cached, catalog_version
 
 log = logging.getLogger(__name__)
 
@@ -67,40 +67,117 @@ def get_field_choices(field: dict):
             return pp.get(k)
     return None
 
+def _needs_choices(field: dict) -> bool:
+    return field.get("type") in DROPDOWN_LIKE and not get_field_choices(field)
+
+def _apply_detail(field: dict, detail) -> dict:
+    if detail and isinstance(detail, dict):
+        if detail.get("customers_properties"):
+            field.setdefault("customers_properties", {}).update(detail["customers_properties"])
+        for k in ("choices","option_values","values","dropdown_choices","label_choices","portal_properties"):
+            if detail.get(k):
+                field[k] = detail[k]
+    return field
+
 def ensure_choices(field: dict) -> dict:
-    if field.get("type") in DROPDOWN_LIKE and not get_field_choices(field):
-        detail = fetch_field_detail(field["id"])
-        if detail and isinstance(detail, dict):
-            if detail.get("customers_properties"):
-                field.setdefault("customers_properties", {}).update(detail["customers_properties"])
-            for k in ("choices","option_values","values","dropdown_choices","label_choices","portal_properties"):
-                if detail.get(k):
-                    field[k] = detail[k]
+    if _needs_choices(field):
+        _apply_detail(field, fetch_field_detail(field["id"]))
     return field
 
+async def aensure_choices(fields: list[dict]) -> list[dict]:
+    # Fetch every missing choice list at once instead of one per render.
+    missing = [f for f in fields if _needs_choices(f)]
+    details = await asyncio.gather(*(afetch_field_detail(f["id"]) for f in missing))
+    for field, detail in zip(missing, details):
+        _apply_detail(field, detail)
+    return fields
+
+# Forward (value -> option value) and reverse (hashed proxy -> value) tables
+# per choice list, so neither rendering nor resolving hashes anything twice.
+# Entries hold the list itself, which keeps its id unique.
+_PROXY_TABLES: dict[int, tuple] = {}
+_PROXY_TABLES_MAX = 4096
+
+def proxy_tables(choices) -> tuple[dict, dict]:
+    if not choices:
+        return {}, {}
+    entry = _PROXY_TABLES.get(id(choices))
+    if entry is None or entry[0] is not choices:
+        forward, reverse = {}, {}
+        for val, _lbl in iter_choice_items(choices):
+            proxy = proxy_value_if_needed(val)
+            forward[str(val)] = proxy
+            if proxy != str(val):
+                reverse[proxy] = str(val)
+        entry = (choices, forward, reverse)
+        if len(_PROXY_TABLES) >= _PROXY_TABLES_MAX:
+            _PROXY_TABLES.pop(next(iter(_PROXY_TABLES)), None)
+        _PROXY_TABLES[id(choices)] = entry
+    return entry[1], entry[2]
+
+# Catalog fields (and nested dependents) by name, rebuilt when the catalog changes.
+_BY_NAME: dict = {"key": None, "fields": None, "map": {}}
+
+def field_by_name(name: str) -> dict | None:
+    fields = get_ticket_fields_cached()
+    key = catalog_version()
+    if _BY_NAME["key"] != key or _BY_NAME["fields"] is not fields:
+        by_name = {}
+        for f in fields:
+            by_name[f.get("name")] = f
+            for df in f.get("dependent_fields") or []:
+                if isinstance(df, dict):
+                    by_name.setdefault(df.get("name"), df)
+        _BY_NAME.update({"key": key, "fields": fields, "map": by_name})
+    return _BY_NAME["map"].get(name)
+
 def choices_to_slack_options(choices, field: dict | None = None):
+    forward, _ = proxy_tables(choices)
     options = []
     for val, lbl in iter_choice_items(choices):
         visible = str(val) if str(val).strip() else str(lbl)
         options.append({
             "text":  {"type": "plain_text", "text": visible[:75]},
-            "value": proxy_value_if_needed(val)
+            "value": forward[str(val)]
         })
     return options
 
+# Types that render one input whatever their choices; dropdowns without
+# choices fall back to a text input.
+SIMPLE_TYPES = (
+    {"default_subject","default_description"}
+    | TEXT_LIKE | NUMBER_LIKE | PARAGRAPH_LIKE | DATE_LIKE | CHECKBOX_LIKE | DROPDOWN_LIKE
+)
+
+def _shown_to_customers(field: dict) -> bool:
+    if field.get("type") in SKIP_ALWAYS:
+        return False
+    required = bool(field.get("required_for_customers"))
+    if not field.get("displayed_to_customers") and not required:
+        return False
+    if not field.get("customers_can_edit", True) and not required:
+        return False
+    return True
+
+def is_renderable(field: dict) -> bool:
+    """Whether ``to_slack_block(field)`` yields any blocks, from flags and type alone.
+
+    No choices are fetched, hashed or rendered.
+    """
+    if not _shown_to_customers(field):
+        return False
+    ftype = field.get("type")
+    if ftype in NESTED:
+        return any(is_renderable(df) for df in field.get("dependent_fields") or [])
+    return ftype in SIMPLE_TYPES
+
 def to_slack_block(field: dict):
     ftype = field.get("type")
     name  = field.get("name")
     label = field.get("label_for_customers") or field.get("label") or name or "Field"
     required = bool(field.get("required_for_customers"))
-    displayed = bool(field.get("displayed_to_customers"))
-    customers_can_edit = bool(field.get("customers_can_edit", True))
 
-    if ftype in SKIP_ALWAYS:
-        return None
-    if not displayed and not required:
-        return None
-    if not customers_can_edit and not required:
+    if not _shown_to_customers(field):
         return None
 
     if ftype == "default_subject":
@@ -126,8 +203,15 @@ def to_slack_block(field: dict):
                 "options":[{"text":{"type":"plain_text","text":label},"value":"true"}]}
     elif ftype in DROPDOWN_LIKE:
         raw_choices = get_field_choices(field)
-        options = choices_to_slack_options(raw_choices, field)
-        if options:
+        # The proxy table is built once per choice list; only its size is
+        # needed to pick the element, so large lists never build options here.
+        external = len(proxy_tables(raw_choices)[0]) > EXTERNAL_SELECT_THRESHOLD
+        options = [] if external else choices_to_slack_options(raw_choices, field)
+        if external:
+            # Served by logic.choice_search through the options-load endpoint.
+            elem = {"type":"external_select","action_id":name,
+                    "placeholder":{"type":"plain_text","text":"Type to search..."},"min_query_length":0}
+        elif options:
             elem = {"type":"static_select","action_id":name,
                     "placeholder":{"type":"plain_text","text":"Select..."},"options":options}
         else:
@@ -154,6 +238,52 @@ def normalize_blocks(mapped):
         return []
     return mapped if isinstance(mapped, list) else [mapped]
 
+# Rendered blocks per field version. Admin edits move ``updated_at`` and a
+# choice refresh swaps the choice objects, so either one renders afresh.
+# Entries hold the choice objects themselves, which keeps their ids unique.
+_BLOCK_CACHE: dict[tuple, tuple] = {}
+_BLOCK_CACHE_MAX = 4096
+
+def _choice_refs(field: dict) -> tuple:
+    refs = (get_field_choices(field),)
+    if field.get("type") in NESTED:
+        for df in field.get("dependent_fields") or []:
+            refs += _choice_refs(df)
+    return refs
+
+def _copy_block(block: dict) -> dict:
+    # Views only ever add keys to a block or its element; nested parts such
+    # as option lists and labels stay shared with the cached template.
+    out = dict(block)
+    if "element" in out:
+        out["element"] = dict(out["element"])
+    return out
+
+def field_blocks(field: dict) -> list[dict]:
+    """``normalize_blocks(to_slack_block(field))``, rendered once per field version.
+
+    Returns fresh copies of the block and element dicts, safe to embed in a
+    view; the templates behind them are shared and never handed out.
+    """
+    if field.get("updated_at") is None or field.get("id") is None:
+        return normalize_blocks(to_slack_block(field))
+    if field.get("type") in NESTED:
+        # Rendering fills missing choices; do it first so the key sees them.
+        for df in field.get("dependent_fields") or []:
+            ensure_choices(df)
+    refs = _choice_refs(field)
+    key = (field["id"], field["updated_at"], tuple(id(r) for r in refs))
+    entry = _BLOCK_CACHE.get(key)
+    if entry is None:
+        entry = (refs, tuple(normalize_blocks(to_slack_block(field))))
+        if len(_BLOCK_CACHE) >= _BLOCK_CACHE_MAX:
+            _BLOCK_CACHE.pop(next(iter(_BLOCK_CACHE)), None)
+        _BLOCK_CACHE[key] = entry
+    return [_copy_block(b) for b in entry[1]]
+
+def clear_block_cache():
+    _BLOCK_CACHE.clear()
+
 def extract_input(entry: dict):
     if not entry:
         return None
@@ -161,7 +291,7 @@ def extract_input(entry: dict):
     t = data.get("type")
     if t == "plain_text_input":
         return data.get("value")
-    if t == "static_select":
+    if t in ("static_select", "external_select"):
         sel = data.get("selected_option")
         return sel.get("value") if sel else None
     if t == "datepicker":
@@ -0,0 +1,398 @@
+from __future__ import annotations
+import hashlib, logging, time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from logic.forms import normalize_id_list
+from logic.mapping import is_renderable, extract_input
+from logic.branching import activator_values, selected_value_for
+
+log = logging.getLogger(__name__)
+
+CORE_TYPES = {"default_subject", "default_description"}
+
+
+@dataclass(frozen=True)
+class PlanSection:
+    id: int | None
+    values: frozenset[str]
+    children: tuple
+
+
+@dataclass(frozen=True)
+class FormPlan:
+    """Everything the wizard needs to walk a form without touching the network.
+
+    Field ids are normalized to strings for lookups; ``order`` keeps the raw
+    ids as Freshdesk returned them so page items stay the same type as before.
+    """
+
+    form_id: int
+    key: tuple
+    order: tuple
+    by_id: dict[str, dict]
+    sections: dict[str, tuple[PlanSection, ...]]
+    section_ids: dict[str, frozenset[int]]
+    nested: dict[str, tuple]
+    renderable: dict[str, bool]
+    reachable: frozenset[str]
+    subject: dict | None = None
+    description: dict | None = None
+    names: dict[str, str] = field(default_factory=dict)
+    complete: bool = True
+    _descendants: dict[str, frozenset[str]] = field(default_factory=dict, repr=False)
+
+    @property
+    def version(self) -> str:
+        # Stable across processes so a stored walk can be checked against it anywhere.
+        return hashlib.blake2b(repr(self.key).encode("utf-8"), digest_size=8).hexdigest()
+
+    def descendants(self, fid) -> frozenset[str]:
+        """Every field id reachable below ``fid`` through sections or nesting."""
+        fid = str(fid)
+        cached = self._descendants.get(fid)
+        if cached is not None:
+            return cached
+        seen: set[str] = set()
+        queue = [fid]
+        while queue:
+            cur = queue.pop()
+            kids = [str(d) for d in self.nested.get(cur, ()) if d is not None]
+            for sec in self.sections.get(cur, ()):
+                kids.extend(str(c) for c in sec.children)
+            for k in kids:
+                if k not in seen and k != fid:
+                    seen.add(k)
+                    queue.append(k)
+        out = frozenset(seen)
+        self._descendants[fid] = out
+        return out
+
+    def choice_fields(self) -> list[dict]:
+        """Reachable fields and their nested levels: all a render may need choices for."""
+        ids = set(self.reachable)
+        for fid in self.reachable:
+            ids.update(str(d) for d in self.nested.get(fid, ()) if d is not None)
+        return [self.by_id[fid] for fid in ids if fid in self.by_id]
+
+
+def fields_fingerprint(fields: list[dict]) -> str:
+    # Cheap identity for a field list; ``updated_at`` moves whenever an admin edits a field.
+    raw = "\x1f".join(f"{f.get('id')}:{f.get('updated_at')}" for f in fields)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def index_fields(fields: list[dict]) -> dict[str, dict]:
+    """Map ``str(id)`` to the field object, including nested dependents."""
+    by_id: dict[str, dict] = {}
+
+    def _add(field_obj):
+        fid = field_obj.get("id")
+        if fid is None:
+            return
+        by_id[str(fid)] = field_obj
+        if field_obj.get("type") == "nested_field":
+            for df in field_obj.get("dependent_fields") or []:
+                if isinstance(df, dict):
+                    _add(df)
+
+    for f in fields:
+        _add(f)
+    return by_id
+
+
+def _section_ids_for(f: dict) -> frozenset[int]:
+    out = set()
+    for m in f.get("section_mappings") or []:
+        if m.get("section_id"):
+            try:
+                out.add(int(m.get("section_id")))
+            except (TypeError, ValueError):
+                pass
+    return frozenset(out)
+
+
+def _compile_sections(raw_sections) -> tuple[PlanSection, ...]:
+    compiled = []
+    for sec in raw_sections or []:
+        sid = sec.get("id")
+        try:
+            sid = int(sid) if sid is not None else None
+        except (TypeError, ValueError):
+            sid = None
+        compiled.append(PlanSection(
+            id=sid,
+            values=frozenset(activator_values(sec)),
+            children=tuple(normalize_id_list(sec.get("fields") or [])),
+        ))
+    return tuple(compiled)
+
+
+def compile_form_plan(form_id: int, key: tuple, raw_ids, fields: list[dict], sections_for,
+                      concurrency: int = 1, deadline: float | None = None) -> FormPlan:
+    """Compile a :class:`FormPlan` for ``form_id``.
+
+    ``sections_for(field_id)`` is only consulted here, walking the section
+    graph breadth first from ``raw_ids``; everything else reads the result.
+    Each BFS level is looked up through a pool of ``concurrency`` threads.
+    If ``deadline`` (a ``time.monotonic()`` value) passes first, the fields
+    still pending are treated as having no sections and the plan comes back
+    with ``complete=False``.
+    """
+
+    order = tuple(normalize_id_list(raw_ids or []))
+    by_id = index_fields(fields)
+
+    sections: dict[str, tuple[PlanSection, ...]] = {}
+    reachable: set[str] = {str(i) for i in order}
+    looked_up: set[str] = set(reachable)
+    frontier = list(reachable)
+    complete = True
+
+    def _lookup(fid: str):
+        try:
+            fid_int = int(fid)
+        except (TypeError, ValueError):
+            return ()
+        return _compile_sections(sections_for(fid_int))
+
+    def _discover(fid: str, compiled, next_frontier: list):
+        f = by_id.get(fid)
+        if f and f.get("type") == "nested_field":
+            # Nested levels get their own pages, so their sections count too.
+            for df in f.get("dependent_fields") or []:
+                dfid = str(df.get("id") if isinstance(df, dict) else df)
+                if dfid not in looked_up:
+                    looked_up.add(dfid)
+                    next_frontier.append(dfid)
+        if compiled:
+            sections[fid] = compiled
+        for sec in compiled:
+            for child_id in sec.children:
+                cid = str(child_id)
+                reachable.add(cid)
+                if cid not in looked_up:
+                    looked_up.add(cid)
+                    next_frontier.append(cid)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency)) if concurrency > 1 else None
+    try:
+        while frontier and complete:
+            next_frontier: list[str] = []
+            if pool is None or len(frontier) == 1:
+                for fid in frontier:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        complete = False
+                        break
+                    _discover(fid, _lookup(fid), next_frontier)
+            else:
+                pending = {pool.submit(_lookup, fid): fid for fid in frontier}
+                while pending:
+                    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    if not done:
+                        complete = False
+                        break
+                    for fut in done:
+                        fid = pending.pop(fut)
+                        try:
+                            compiled = fut.result()
+                        except Exception as e:
+                            log.debug("Section lookup for %s failed (%s)", fid, e)
+                            compiled = ()
+                        _discover(fid, compiled, next_frontier)
+            frontier = next_frontier
+    finally:
+        if pool is not None:
+            # Stragglers keep running and still land in the sections cache.
+            pool.shutdown(wait=False, cancel_futures=True)
+    if not complete:
+        log.warning("Section discovery for form %s hit its deadline; plan is partial", form_id)
+
+    section_ids: dict[str, frozenset[int]] = {}
+    nested: dict[str, tuple] = {}
+    renderable: dict[str, bool] = {}
+    names: dict[str, str] = {}
+    for fid, f in by_id.items():
+        if f.get("name"):
+            names[f["name"]] = fid
+        if f.get("type") in CORE_TYPES:
+            continue
+        try:
+            int(f.get("id"))
+            section_ids[fid] = _section_ids_for(f)
+        except (TypeError, ValueError):
+            section_ids[fid] = frozenset()
+        if f.get("type") == "nested_field":
+            deps = sorted(f.get("dependent_fields") or [], key=lambda d: d.get("level", 99))
+            nested[fid] = tuple(d.get("id") if isinstance(d, dict) else d for d in deps)
+
+    # Visibility comes from flags and type; choices are fetched and
+    # rendered only when a field's page is actually built.
+    wanted = set(reachable)
+    for fid in reachable:
+        wanted.update(str(d) for d in nested.get(fid, ()))
+    for fid in wanted:
+        f = by_id.get(fid)
+        if not f or f.get("type") in CORE_TYPES:
+            continue
+        renderable[fid] = is_renderable(f)
+
+    subject = next((f for f in fields if f.get("type") == "default_subject"), None)
+    description = next((f for f in fields if f.get("type") == "default_description"), None)
+
+    return FormPlan(
+        form_id=form_id,
+        key=key,
+        order=order,
+        by_id=by_id,
+        sections=sections,
+        section_ids=section_ids,
+        nested=nested,
+        renderable=renderable,
+        reachable=frozenset(reachable),
+        subject=subject,
+        description=description,
+        names=names,
+        complete=complete,
+    )
+
+
+def walk_pages(plan: FormPlan, state_values: dict, resume: dict | None = None) -> dict:
+    """Walk ``plan`` into the ordered list of question pages.
+
+    The walk is an explicit stack so that a checkpoint can be taken each time
+    a page is emitted, right before its answer is read. Passing one of those
+    checkpoints back as ``resume`` continues from that page with fresh
+    answers instead of starting over. Everything returned is plain JSON so it
+    can live in the wizard session.
+    """
+
+    by_id = plan.by_id
+    if resume:
+        pages = list(resume["pages"])
+        checkpoints = [list(c) for c in resume["checkpoints"]]
+        stack = [list(fr) for fr in resume["stack"]]
+        active = set(resume["active"])
+        visited_order = list(resume["visited"])
+        pending = resume.get("pending")
+    else:
+        pages, checkpoints, stack, active, visited_order, pending = [], [], [["roots", 0]], set(), [], None
+    visited = set(visited_order)
+
+    def enter(fid_raw) -> str | None:
+        fid_key = str(fid_raw)
+        if fid_key in visited:
+            return None
+        f = by_id.get(fid_key)
+        if not f:
+            log.debug("Skipping unknown field %s", fid_raw)
+            visited.add(fid_key); visited_order.append(fid_key)
+            return None
+        if f.get("type") in CORE_TYPES:
+            log.debug("Skipping core field %s", fid_raw)
+            visited.add(fid_key); visited_order.append(fid_key)
+            return None
+        sec_ids = plan.section_ids.get(fid_key)
+        if sec_ids and not sec_ids.issubset(active):
+            log.debug("Skipping field %s not in active section", fid_raw)
+            return None
+        visited.add(fid_key); visited_order.append(fid_key)
+        if not plan.renderable.get(fid_key):
+            log.debug("Skipping field %s with no renderable blocks", fid_raw)
+            return None
+        if fid_key in plan.nested:
+            stack.append(["nested", fid_key, 0])
+            return None
+        pages.append(f.get("id"))
+        checkpoints.append([[list(fr) for fr in stack], sorted(active), len(visited_order)])
+        return fid_key
+
+    def answered(fid_key: str) -> bool:
+        selected = selected_value_for(by_id[fid_key], state_values)
+        if selected is None:
+            return False
+        stack.append(["sections", fid_key, str(selected), 0, -1])
+        return True
+
+    done = pending is not None and not answered(pending)
+    while stack and not done:
+        frame = stack[-1]
+        kind = frame[0]
+        if kind == "roots":
+            if frame[1] >= len(plan.order):
+                stack.pop()
+                continue
+            fid = plan.order[frame[1]]
+            frame[1] += 1
+        elif kind == "nested":
+            deps = plan.nested.get(frame[1], ())
+            if frame[2] >= len(deps):
+                stack.pop()
+                continue
+            fid = deps[frame[2]]
+            frame[2] += 1
+            if fid is None:
+                continue
+        else:
+            _, fid_key, sel, si, ci = frame
+            secs = plan.sections.get(fid_key, ())
+            if ci == -1:
+                while si < len(secs) and sel not in secs[si].values:
+                    si += 1
+                if si >= len(secs):
+                    stack.pop()
+                    continue
+                frame[3], frame[4] = si, 0
+                if secs[si].id is not None:
+                    active.add(secs[si].id)
+                continue
+            sec = secs[si]
+            if ci >= len(sec.children):
+                if sec.id is not None:
+                    active.discard(sec.id)
+                frame[3], frame[4] = si + 1, -1
+                continue
+            fid = sec.children[ci]
+            frame[4] = ci + 1
+        page_key = enter(fid)
+        if page_key is not None and not answered(page_key):
+            done = True
+
+    return {"plan": plan.version, "pages": pages, "checkpoints": checkpoints, "visited": visited_order}
+
+
+def changed_answers(old_values: dict, new_values: dict) -> set[str]:
+    """Names whose extracted answer differs between two Slack state maps."""
+    return {
+        name for name, entry in (new_values or {}).items()
+        if extract_input(entry) != extract_input((old_values or {}).get(name) or {})
+    }
+
+
+def resume_walk(plan: FormPlan, state_values: dict, prev: dict | None, changed: set[str]) -> dict:
+    """Recompute the walk, reusing ``prev`` up to the first changed answer.
+
+    Pages before the earliest changed field only depend on answers that did
+    not change, so the walk restarts from that field's checkpoint. When no
+    field on the previous path changed the previous walk is returned as is.
+    """
+
+    if not prev or prev.get("plan") != plan.version:
+        return walk_pages(plan, state_values)
+    idx = None
+    for i, fid in enumerate(prev["pages"]):
+        f = plan.by_id.get(str(fid))
+        if f and f.get("name") in changed:
+            idx = i
+            break
+    if idx is None:
+        return prev
+    stack, active, nvisited = prev["checkpoints"][idx]
+    return walk_pages(plan, state_values, resume={
+        "pages": prev["pages"][:idx + 1],
+        "checkpoints": prev["checkpoints"][:idx + 1],
+        "stack": stack,
+        "active": active,
+        "visited": prev["visited"][:nvisited],
+        "pending": str(prev["pages"][idx]),
+    })
@@ -0,0 +1,313 @@
+"""Wizard session storage behind one dict-like interface.
+
+``SessionStore`` keeps sessions in this process. ``SqliteSessions`` and
+``RedisSessions`` share them between workers (one host) or replicas (any
+host) so Slack's next click can land anywhere. Shared backends store each
+session as one compact blob written in a single statement, so a write for
+a token is all-or-nothing; readers get a fresh copy and assign it back
+after changing it.
+"""
+from __future__ import annotations
+import os, json, time, zlib, sqlite3, logging, threading
+from abc import abstractmethod
+from collections.abc import MutableMapping
+from pathlib import Path
+from services import metrics
+from services.resp import RespClient
+
+log = logging.getLogger(__name__)
+
+# Bodies above this many bytes are zlib-compressed; Slack state compresses ~5x.
+_COMPRESS_OVER = 512
+
+
+def _size(value) -> int:
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+def dumps(value) -> bytes:
+    raw = json.dumps(value, separators=(",", ":"), default=str).encode()
+    if len(raw) > _COMPRESS_OVER:
+        return b"z" + zlib.compress(raw, 6)
+    return b"j" + raw
+
+
+def loads(blob: bytes):
+    blob = bytes(blob)
+    if blob[:1] == b"z":
+        return json.loads(zlib.decompress(blob[1:]))
+    return json.loads(blob[1:])
+
+
+class SessionBackend(MutableMapping):
+    """Dict-like session storage; subclasses implement the four primitives."""
+
+    @abstractmethod
+    def load(self, token: str): ...
+
+    @abstractmethod
+    def store(self, token: str, value): ...
+
+    @abstractmethod
+    def remove(self, token: str) -> bool: ...
+
+    @abstractmethod
+    def tokens(self) -> list[str]: ...
+
+    def __getitem__(self, token: str):
+        value = self.load(token)
+        if value is None:
+            raise KeyError(token)
+        return value
+
+    def __setitem__(self, token: str, value):
+        self.store(token, value)
+
+    def __delitem__(self, token: str):
+        if not self.remove(token):
+            raise KeyError(token)
+
+    def __iter__(self):
+        return iter(self.tokens())
+
+    def __len__(self):
+        return len(self.tokens())
+
+    def clear(self):
+        for token in self.tokens():
+            self.remove(token)
+
+
+class SessionStore(SessionBackend):
+    """Dict-like session store bounded by idle TTL, entry count and bytes.
+
+    Reading a session marks it recently used; a session idle for longer than
+    ``ttl`` seconds reads as missing. When either cap is exceeded the least
+    recently used sessions are evicted. Values are sized once, when they are
+    stored, so callers that mutate a session should assign it back.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int, name: str = "sessions"):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.name = name
+        self._lock = threading.Lock()
+        # token -> [last_used, size, value]; dict order is LRU order.
+        self._data: dict[str, list] = {}
+        self._bytes = 0
+
+    def _drop(self, token: str, reason: str):
+        entry = self._data.pop(token)
+        self._bytes -= entry[1]
+        metrics.incr(f"{self.name}.{reason}")
+
+    def _expired(self, entry, now: float) -> bool:
+        return self.ttl > 0 and now - entry[0] > self.ttl
+
+    def _publish(self):
+        metrics.gauge(f"{self.name}.count", len(self._data))
+        metrics.gauge(f"{self.name}.bytes", self._bytes)
+
+    def load(self, token: str):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                return None
+            if self._expired(entry, now):
+                self._drop(token, "expired")
+                self._publish()
+                return None
+            entry[0] = now
+            self._data[token] = self._data.pop(token)
+            return entry[2]
+
+    def store(self, token: str, value):
+        size = _size(value)
+        now = time.time()
+        with self._lock:
+            if token in self._data:
+                self._bytes -= self._data.pop(token)[1]
+            self._data[token] = [now, size, value]
+            self._bytes += size
+            self._evict(now, keep=token)
+            self._publish()
+
+    def _evict(self, now: float, keep: str | None = None):
+        # LRU order is also last-use order, so expired sessions sit at the front.
+        while self._data:
+            oldest = next(iter(self._data))
+            if oldest == keep or not self._expired(self._data[oldest], now):
+                break
+            self._drop(oldest, "expired")
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._data))
+            if oldest == keep:
+                break
+            self._drop(oldest, "evicted")
+            log.info("Evicted wizard session %s (store over its cap)", oldest)
+
+    def remove(self, token: str) -> bool:
+        with self._lock:
+            if token not in self._data:
+                return False
+            self._bytes -= self._data.pop(token)[1]
+            self._publish()
+            return True
+
+    def tokens(self) -> list[str]:
+        with self._lock:
+            return list(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self._publish()
+
+    def sweep(self):
+        """Drop every expired session now instead of waiting for the next write."""
+        with self._lock:
+            self._evict(time.time())
+            self._publish()
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+
+class SqliteSessions(SessionBackend):
+    """Sessions in a SQLite file in WAL mode, shared by every worker on the host.
+
+    Idle sessions past ``ttl`` read as missing and are purged, together with
+    the least recently used ones over ``max_entries``, every ``_SWEEP_EVERY``
+    writes.
+    """
+
+    _SWEEP_EVERY = 200
+
+    def __init__(self, path: str, ttl: float, max_entries: int, name: str = "sessions"):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = name
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._pid = None
+        self._db = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per process: a forked worker opens its own. Nothing
+        # touches the disk until the first session is read or written.
+        if self._pid != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions (token TEXT PRIMARY KEY, touched REAL NOT NULL, data BLOB NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS sessions_touched ON sessions (touched)")
+            self._pid = os.getpid()
+        return self._db
+
+    def _cutoff(self, now: float) -> float:
+        return now - self.ttl if self.ttl > 0 else float("-inf")
+
+    def load(self, token: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE token = ? AND touched >= ?", (token, self._cutoff(now))
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE sessions SET touched = ? WHERE token = ?", (now, token))
+        return loads(row[0])
+
+    def store(self, token: str, value):
+        blob = dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (token, touched, data) VALUES (?, ?, ?)", (token, time.time(), blob)
+            )
+            self._writes += 1
+            if self._writes % self._SWEEP_EVERY == 0:
+                self._sweep()
+
+    def _sweep(self):
+        expired = self._conn.execute("DELETE FROM sessions WHERE touched < ?", (self._cutoff(time.time()),)).rowcount
+        evicted = self._conn.execute(
+            "DELETE FROM sessions WHERE token IN (SELECT token FROM sessions ORDER BY touched DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        metrics.incr(f"{self.name}.expired", max(0, expired))
+        metrics.incr(f"{self.name}.evicted", max(0, evicted))
+        metrics.gauge(f"{self.name}.count", self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0])
+
+    def sweep(self):
+        with self._lock:
+            self._sweep()
+
+    def remove(self, token: str) -> bool:
+        with self._lock:
+            return self._conn.execute("DELETE FROM sessions WHERE token = ?", (token,)).rowcount > 0
+
+    def tokens(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT token FROM sessions WHERE touched >= ? ORDER BY touched", (self._cutoff(time.time()),)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+
+class RedisSessions(SessionBackend):
+    """Sessions in Redis (or anything speaking its protocol) for multi-replica deploys.
+
+    Each session is one key holding its blob; every read pushes the key's
+    expiry out by ``ttl`` so Redis itself forgets abandoned modals.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "wizard:session:", client: RespClient | None = None):
+        self.client = client or RespClient(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def load(self, token: str):
+        key = self.prefix + token
+        if self.ttl > 0:
+            blob, _ = self.client.pipeline(("GET", key), ("EXPIRE", key, self.ttl))
+        else:
+            blob = self.client.execute("GET", key)
+        return None if blob is None else loads(blob)
+
+    def store(self, token: str, value):
+        args = ("SET", self.prefix + token, dumps(value))
+        if self.ttl > 0:
+            args += ("EX", self.ttl)
+        self.client.execute(*args)
+
+    def remove(self, token: str) -> bool:
+        return self.client.execute("DEL", self.prefix + token) > 0
+
+    def tokens(self) -> list[str]:
+        out, cursor = [], b"0"
+        while True:
+            cursor, keys = self.client.execute("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 500)
+            out.extend(k.decode()[len(self.prefix):] for k in keys)
+            if cursor in (b"0", "0"):
+                return out
+
+
+def make_session_store(backend: str, *, ttl: float, max_entries: int, max_bytes: int,
+                       sqlite_path: str = "", redis_url: str = "", name: str = "sessions") -> SessionBackend:
+    backend = (backend or "memory").lower()
+    if backend == "sqlite":
+        return SqliteSessions(sqlite_path, ttl, max_entries, name=name)
+    if backend == "redis":
+        return RedisSessions(redis_url, ttl)
+    if backend != "memory":
+        log.warning("Unknown SESSION_BACKEND %r; keeping sessions in memory", backend)
+    return SessionStore(ttl, max_entries, max_bytes, name=name)
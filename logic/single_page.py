@@ -2,7 +2,7 @@ from __future__ import annotations
 from config import MAX_BLOCKS
 from services.freshdesk import get_form_detail
 from logic.forms import normalize_id_list
-from logic.mapping import to_slack_block, normalize_blocks, ensure_choices
+from logic.mapping import field_blocks, ensure_choices
 from logic.branching import get_sections_cached, activator_values, selected_value_for
 
 def build_fields_for_form(form: dict, all_fields: list, state_values: dict | None = None):
@@ -27,7 +27,7 @@ def build_fields_for_form(form: dict, all_fields: list, state_values: dict | Non
     desc = next((f for f in all_fields if f.get("type") == "default_description"), None)
     for core in (subj, desc):
         if core:
-            blocks.extend(normalize_blocks(to_slack_block(core)))
+            blocks.extend(field_blocks(core))
     if sections_list and blocks:
         blocks.append({"type":"divider"})
 
@@ -40,7 +40,7 @@ def build_fields_for_form(form: dict, all_fields: list, state_values: dict | Non
         if bid and bid in added:
             return
         ensure_choices(field_obj)
-        fb = normalize_blocks(to_slack_block(field_obj))
+        fb = field_blocks(field_obj)
         for bb in fb:
             if bb and bb.get("type") == "input" and bb.get("block_id"):
                 added.add(bb["block_id"])
@@ -1,11 +1,12 @@
-import hashlib, logging
+import logging
 from config import FRESHDESK_EMAIL, IT_GROUP_ID, FORM_NAME_TO_TYPE
-from services.freshdesk import fd_get, get_form_detail
+from services.freshdesk import get_form_detail
 from logic.mapping import (
     extract_input,
     ensure_choices,
     get_field_choices,
-    iter_choice_items,
+    field_by_name,
+    proxy_tables,
 )
 
 log = logging.getLogger(__name__)
@@ -16,21 +17,15 @@ def resolve_proxy_value(field_name: str, proxy_or_value: str) -> str:
     if not val.startswith("hash:"):
         return val
 
-    fd_fields = fd_get("/api/v2/admin/ticket_fields")
-    target = next((f for f in fd_fields if f.get("name") == field_name), None)
+    # The cached catalog and the field's proxy table make this a lookup.
+    target = field_by_name(field_name)
     if not target:
         log.warning("Could not resolve proxy for field %s: field not found", field_name)
         return val
 
-    ensure_choices(target)
-    choices = get_field_choices(target) or {}
-    items = list(iter_choice_items(choices))
-
-    want = val[5:]
-    for raw_value, _lbl in items:
-        h = hashlib.sha1(str(raw_value).encode("utf-8")).hexdigest()
-        if h == want:
-            return str(raw_value)
+    _forward, reverse = proxy_tables(get_field_choices(ensure_choices(target)))
+    if val in reverse:
+        return reverse[val]
 
     log.warning("Could not resolve proxy for field %s: no choice matched hash", field_name)
     return val
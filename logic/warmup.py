@@ -0,0 +1,384 @@
+from __future__ import annotations
+import hashlib, json, os, time, logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from config import SECTIONS_CONCURRENCY
+from services import metrics
+from services.freshdesk import get_ticket_forms_cached, get_ticket_fields_cached, get_form_detail, catalog_version
+from logic.forms import filter_portal_forms, normalize_id_list, portal_picker_modal
+from logic.branching import get_sections_cached, refresh_sections
+from logic.mapping import ensure_choices, get_field_choices, proxy_tables
+from logic.plan import index_fields
+from logic.wizard import filter_fields_for_form, get_form_plan, prerender_first_page, clear_first_pages
+
+log = logging.getLogger(__name__)
+
+# Progress of the last (or running) catalog crawl, served by /debug/crawl.
+CRAWL_STATUS: dict[str, object] = {
+    "state": "idle",
+    "started_at": None,
+    "finished_at": None,
+    "duration": None,
+    "forms_total": 0,
+    "forms_done": 0,
+    "fields_seen": 0,
+    "fields_done": 0,
+    "errors": 0,
+    "last_error": None,
+}
+_CRAWL_LOCK = threading.Lock()
+_STATUS_LOCK = threading.Lock()
+
+
+def _bump(key: str, n: int = 1):
+    with _STATUS_LOCK:
+        CRAWL_STATUS[key] += n
+
+
+def crawl_catalog(refresh: bool = False, concurrency: int = SECTIONS_CONCURRENCY,
+                  form_ids: set[int] | None = None) -> bool:
+    """Load every portal form's detail and conditional sections up front.
+
+    Forms are fetched concurrently, then the section graph of all forms is
+    walked one BFS level at a time through the same pool so that
+    ``SECTIONS_CACHE`` is full before users arrive. With ``refresh`` every
+    section list is refetched and swapped in place. ``form_ids`` limits the
+    crawl to those forms. Returns ``False`` when another crawl is already
+    running.
+    """
+
+    if not _CRAWL_LOCK.acquire(blocking=False):
+        return False
+    started = time.time()
+    CRAWL_STATUS.update({
+        "state": "running", "started_at": started, "finished_at": None, "duration": None,
+        "forms_total": 0, "forms_done": 0, "fields_seen": 0, "fields_done": 0,
+        "errors": 0, "last_error": None,
+    })
+    fetch = refresh_sections if refresh else get_sections_cached
+
+    def _note_error(e):
+        _bump("errors")
+        CRAWL_STATUS["last_error"] = str(e)
+
+    def _detail(form):
+        try:
+            raw = get_form_detail(int(form["id"])).get("fields") or form.get("fields") or []
+        except Exception as e:
+            _note_error(e)
+            raw = form.get("fields") or []
+        _bump("forms_done")
+        return normalize_id_list(raw)
+
+    def _sections(fid: str):
+        try:
+            secs = fetch(int(fid))
+        except Exception as e:
+            _note_error(e)
+            secs = []
+        _bump("fields_done")
+        return fid, secs
+
+    try:
+        forms = filter_portal_forms(get_ticket_forms_cached())
+        if form_ids is not None:
+            forms = [f for f in forms if int(f["id"]) in form_ids]
+        fields = get_ticket_fields_cached()
+        nested = {
+            str(f.get("id")): [str(d.get("id")) for d in f.get("dependent_fields") or [] if isinstance(d, dict)]
+            for f in fields if f.get("type") == "nested_field"
+        }
+        CRAWL_STATUS["forms_total"] = len(forms)
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            seen: set[str] = set()
+            for ids in pool.map(_detail, forms):
+                seen.update(str(i) for i in ids)
+            frontier = [fid for fid in seen if fid.isdigit()]
+            CRAWL_STATUS["fields_seen"] = len(seen)
+            while frontier:
+                next_frontier: list[str] = []
+                for fid, secs in pool.map(_sections, frontier):
+                    kids = list(nested.get(fid, []))
+                    for sec in secs or []:
+                        kids.extend(str(c) for c in normalize_id_list(sec.get("fields") or []))
+                    for cid in kids:
+                        if cid not in seen:
+                            seen.add(cid)
+                            if cid.isdigit():
+                                next_frontier.append(cid)
+                CRAWL_STATUS["fields_seen"] = len(seen)
+                frontier = next_frontier
+        CRAWL_STATUS["state"] = "done"
+    except Exception as e:
+        _note_error(e)
+        CRAWL_STATUS["state"] = "failed"
+        log.warning("Catalog crawl failed: %s", e)
+    finally:
+        finished = time.time()
+        CRAWL_STATUS["finished_at"] = finished
+        CRAWL_STATUS["duration"] = round(finished - started, 3)
+        _CRAWL_LOCK.release()
+    log.info(
+        "Catalog crawl %s in %.2fs: %d forms, %d fields, %d errors",
+        CRAWL_STATUS["state"], CRAWL_STATUS["duration"], CRAWL_STATUS["forms_done"],
+        CRAWL_STATUS["fields_done"], CRAWL_STATUS["errors"],
+    )
+    return True
+
+
+def compile_plans() -> int:
+    """Compile the wizard plan of every portal form from the cached catalog.
+
+    Follows the same filter-then-plan path as a wizard click so the cached
+    plan keys match. Returns how many forms compiled.
+    """
+
+    try:
+        forms = filter_portal_forms(get_ticket_forms_cached())
+        fields = get_ticket_fields_cached()
+    except Exception as e:
+        log.warning("Plan compile skipped, catalog unavailable: %s", e)
+        return 0
+    done = 0
+    for form in forms:
+        try:
+            get_form_plan(form, filter_fields_for_form(form, fields))
+            done += 1
+        except Exception as e:
+            log.warning("Plan for form %s failed: %s", form.get("id"), e)
+    return done
+
+
+# Names of the background crawl and warm-up threads (see ``lifecycle.quiesce``).
+CRAWL_THREAD = "catalog-crawl"
+WARM_THREAD = "warm-up"
+
+
+def start_background_crawl(refresh: bool = False):
+    threading.Thread(target=crawl_catalog, kwargs={"refresh": refresh}, name=CRAWL_THREAD, daemon=True).start()
+
+
+# Outcome of the last (or running) warm-up, served by /debug/warmup. Each
+# step records "pending" / "running" / "done" / "failed" / "skipped", its
+# duration, how many items it covered and the error if any.
+WARM_STATUS: dict[str, object] = {
+    "state": "idle",
+    "started_at": None,
+    "finished_at": None,
+    "duration": None,
+    "catalog_version": None,
+    "steps": {},
+}
+_WARM_LOCK = threading.Lock()
+# A warm-up asked for while one runs is queued here and run right after it,
+# so a catalog refresh that lands mid warm-up still gets warmed.
+_RERUN = {"pending": False, "refresh": False}
+_RERUN_LOCK = threading.Lock()
+# form id -> (fields the form reached, signature) as of the last warm-up; a
+# refresh only re-crawls the sections of forms whose signature moved.
+_FORM_SIGS: dict[int, tuple] = {}
+
+
+def _form_signature(form: dict, reach: frozenset, by_id: dict) -> str | None:
+    # The form as listed, its field order and the ``updated_at`` of every
+    # field it reached; an admin edit to any of them changes the signature.
+    try:
+        order = normalize_id_list(get_form_detail(int(form["id"])).get("fields") or [])
+    except Exception:
+        return None
+    ids = sorted(reach | {str(i) for i in order})
+    raw = json.dumps(
+        [form, order, [(fid, (by_id.get(fid) or {}).get("updated_at")) for fid in ids]],
+        sort_keys=True, default=str,
+    )
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _changed_forms(portal_forms: list[dict], fields: list[dict]) -> set[int]:
+    by_id = index_fields(fields)
+    changed = set()
+    for form in portal_forms:
+        reach, sig = _FORM_SIGS.get(int(form["id"]), (frozenset(), None))
+        if sig is None or _form_signature(form, reach, by_id) != sig:
+            changed.add(int(form["id"]))
+    return changed
+
+
+def _remember_forms(portal_forms: list[dict], fields: list[dict]):
+    by_id = index_fields(fields)
+    for form, form_fields in _form_fields(portal_forms, fields):
+        reach = frozenset(get_form_plan(form, form_fields).reachable)
+        _FORM_SIGS[int(form["id"])] = (reach, _form_signature(form, reach, by_id))
+
+
+def _form_fields(portal_forms: list[dict], fields: list[dict]):
+    # (form, that form's filtered fields) through the same path as a click.
+    return [(form, filter_fields_for_form(form, fields)) for form in portal_forms]
+
+
+def _warm_steps(refresh: bool, concurrency: int) -> dict:
+    """The warm-up graph: ``name -> (dependencies, fn(results))``."""
+
+    def _details(r):
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            return list(pool.map(lambda f: get_form_detail(int(f["id"])), r["portal_forms"]))
+
+    def _sections(r):
+        form_ids = _changed_forms(r["portal_forms"], r["fields"]) if refresh else None
+        if not crawl_catalog(refresh=refresh, concurrency=concurrency, form_ids=form_ids):
+            raise RuntimeError("another crawl is running")
+        if CRAWL_STATUS["state"] != "done":
+            raise RuntimeError(CRAWL_STATUS["last_error"] or "crawl failed")
+        return CRAWL_STATUS["fields_done"]
+
+    def _plans(r):
+        done = compile_plans()
+        if not CRAWL_STATUS["errors"]:
+            # A form whose sections failed keeps its old signature, so the
+            # next refresh crawls it again.
+            _remember_forms(r["portal_forms"], r["fields"])
+        return done
+
+    def _choices(r):
+        # Only dropdowns a portal form can reach; the fetched choices land on
+        # the shared catalog objects, so renders never fetch them again, and
+        # their proxy-value tables are built here rather than on first use.
+        reachable: dict[object, dict] = {}
+        for form, fields in _form_fields(r["portal_forms"], r["fields"]):
+            plan = get_form_plan(form, fields)
+            reachable.update((f.get("id"), f) for f in plan.choice_fields())
+        def _hydrate(f):
+            return proxy_tables(get_field_choices(ensure_choices(f)))
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            return list(pool.map(_hydrate, reachable.values()))
+
+    def _first_pages(r):
+        return [prerender_first_page(form, r["fields"]) for form in r["portal_forms"]]
+
+    return {
+        "forms": ((), lambda r: get_ticket_forms_cached()),
+        "fields": ((), lambda r: get_ticket_fields_cached()),
+        "portal_forms": (("forms",), lambda r: filter_portal_forms(r["forms"])),
+        "form_details": (("portal_forms",), _details),
+        "sections": (("form_details", "fields"), _sections),
+        "plans": (("sections",), _plans),
+        "choices": (("plans",), _choices),
+        "picker": (("portal_forms",), lambda r: portal_picker_modal()),
+        "first_pages": (("choices", "picker"), _first_pages),
+    }
+
+
+def _count(result):
+    if isinstance(result, bool) or result is None:
+        return None
+    if isinstance(result, int):
+        return result
+    return len(result) if isinstance(result, (list, dict)) else 1
+
+
+def warm_up(refresh: bool = False, concurrency: int = SECTIONS_CONCURRENCY) -> bool:
+    """Fill every cache a first click would need, reporting into ``WARM_STATUS``.
+
+    Steps run as soon as the ones they depend on have finished, so
+    independent work (forms and fields, the picker and the section crawl)
+    overlaps. A failed step skips only the steps that depend on it. With
+    ``refresh`` only forms that changed since the last warm-up have their
+    sections refetched. Returns ``False`` when another warm-up is already
+    running; that one then runs once more when it finishes.
+    """
+
+    with _RERUN_LOCK:
+        if not _WARM_LOCK.acquire(blocking=False):
+            _RERUN["pending"] = True
+            _RERUN["refresh"] = _RERUN["refresh"] or refresh
+            return False
+    try:
+        while True:
+            _warm_once(refresh, concurrency)
+            with _RERUN_LOCK:
+                if not _RERUN["pending"]:
+                    _WARM_LOCK.release()
+                    return True
+                refresh = _RERUN["refresh"]
+                _RERUN.update(pending=False, refresh=False)
+    except BaseException:
+        _WARM_LOCK.release()
+        raise
+
+
+def _warm_once(refresh: bool, concurrency: int):
+    steps = _warm_steps(refresh, concurrency)
+    started = time.time()
+    WARM_STATUS.update({
+        "state": "running", "started_at": started, "finished_at": None, "duration": None,
+        "catalog_version": None,
+        "steps": {name: {"state": "pending", "duration": None, "count": None, "error": None} for name in steps},
+    })
+    results: dict[str, object] = {}
+
+    def _run(name, deps, fn, futures):
+        status = WARM_STATUS["steps"][name]
+        for dep in deps:
+            futures[dep].result()
+            if WARM_STATUS["steps"][dep]["state"] != "done":
+                status["state"] = "skipped"
+                status["error"] = f"{dep} did not finish"
+                return
+        status["state"] = "running"
+        t0 = time.monotonic()
+        try:
+            results[name] = fn(results)
+            status["count"] = _count(results[name])
+            status["state"] = "done"
+        except Exception as e:
+            status["state"] = "failed"
+            status["error"] = str(e)
+            metrics.incr("warmup.failed")
+            log.warning("Warm-up step %s failed: %s", name, e)
+        finally:
+            status["duration"] = round(time.monotonic() - t0, 3)
+
+    try:
+        futures: dict = {}
+        # One thread per step: a step blocks on its dependencies' futures,
+        # which always run on their own threads, so nothing can starve.
+        with ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="warmup") as pool:
+            for name, (deps, fn) in steps.items():
+                futures[name] = pool.submit(_run, name, deps, fn, futures)
+        states = {s["state"] for s in WARM_STATUS["steps"].values()}
+        WARM_STATUS["state"] = "done" if states == {"done"} else "degraded"
+    finally:
+        finished = time.time()
+        WARM_STATUS["finished_at"] = finished
+        WARM_STATUS["duration"] = round(finished - started, 3)
+        WARM_STATUS["catalog_version"] = catalog_version()
+        metrics.gauge("warmup.duration", WARM_STATUS["duration"])
+    log.info(
+        "Warm-up %s in %.2fs: %s", WARM_STATUS["state"], WARM_STATUS["duration"],
+        ", ".join(f"{n}={s['state']}({s['duration']}s)" for n, s in WARM_STATUS["steps"].items()),
+    )
+
+
+def start_background_warm_up(refresh: bool = False):
+    threading.Thread(target=warm_up, kwargs={"refresh": refresh}, name=WARM_THREAD, daemon=True).start()
+
+
+def on_catalog_refresh(kind: str):
+    # A changed catalog may carry new or edited sections, plans and choices;
+    # drop the pre-rendered pages built from the old one and warm it all again.
+    clear_first_pages()
+    start_background_warm_up(refresh=True)
+
+
+def _after_fork():
+    # A crawl or warm-up running in the parent does not exist in the child;
+    # its locks must not stay held there.
+    global _CRAWL_LOCK, _STATUS_LOCK, _WARM_LOCK, _RERUN_LOCK
+    _CRAWL_LOCK = threading.Lock()
+    _STATUS_LOCK = threading.Lock()
+    _WARM_LOCK = threading.Lock()
+    _RERUN_LOCK = threading.Lock()
+    _RERUN.update(pending=False, refresh=False)
+
+
+os.register_at_fork(after_in_child=_after_fork)
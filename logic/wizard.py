@@ -1,58 +1,163 @@
 from __future__ import annotations
-import time, uuid, logging
-from concurrent.futures import ThreadPoolExecutor
-from config import MAX_BLOCKS
+import asyncio, base64, json, time, uuid, zlib, logging
+from config import (
+    MAX_BLOCKS,
+    SECTIONS_CONCURRENCY,
+    SECTIONS_DEADLINE,
+    PARTIAL_PLAN_RETRY,
+    WIZARD_SESSION_TTL,
+    WIZARD_SESSION_MAX,
+    WIZARD_SESSION_MAX_BYTES,
+    SESSION_BACKEND,
+    SESSION_SQLITE_PATH,
+    REDIS_URL,
+    WIZARD_STATELESS,
+)
 from services.freshdesk import (
     get_form_detail,
     get_ticket_forms_cached,
     get_ticket_fields_cached,
     get_form_fields_scraped,
     get_sections_scraped,
+    aget_form_detail,
+    catalog_version,
 )
-from services.slack import slack_api
+from services import metrics
+from services.slack import slack_api, aslack_api
 from logic.forms import normalize_id_list
-from logic.mapping import to_slack_block, normalize_blocks, ensure_choices
-from logic.branching import get_sections_cached, activator_values, selected_value_for
+from logic.mapping import field_blocks, ensure_choices, aensure_choices, extract_input
+from logic.branching import get_sections_cached, selected_value_for, aprefetch_sections
+from logic.sessions import make_session_store
+from ui import error_modal
+from logic.plan import (
+    FormPlan,
+    CORE_TYPES,
+    compile_form_plan,
+    fields_fingerprint,
+    index_fields,
+    walk_pages,
+    resume_walk,
+    changed_answers,
+)
 
 log = logging.getLogger(__name__)
 
-# Tracking wizard sessions in memory so I know where each user left off.
-WIZARD_SESSIONS: dict[str, dict] = {}  # {"ticket_form_id":int, "page":int, "values":dict}
+# Tracking wizard sessions so I know where each user left off.
+# Abandoned modals age out after WIZARD_SESSION_TTL or get evicted LRU-first.
+# SESSION_BACKEND picks where they live so several workers can share them.
+WIZARD_SESSIONS = make_session_store(
+    SESSION_BACKEND,
+    ttl=WIZARD_SESSION_TTL,
+    max_entries=WIZARD_SESSION_MAX,
+    max_bytes=WIZARD_SESSION_MAX_BYTES,
+    sqlite_path=SESSION_SQLITE_PATH,
+    redis_url=REDIS_URL,
+    name="wizard_sessions",
+)  # {"ticket_form_id":int, "page":int, "values":dict}
+
+SESSION_EXPIRED_VIEW = error_modal(
+    ":hourglass: Wizard session expired. Run `/it-ticket` again to start a new ticket."
+)
+
+# Compiled plans keyed by form, root order and field fingerprint; a new
+# catalog simply produces a new key and the oldest plan falls out.
+_FORM_PLANS: dict[tuple, FormPlan] = {}
+_MAX_PLANS = 64
+# Plans cut short by the sections deadline: key -> (plan, retry_at).
+_PARTIAL_PLANS: dict[tuple, tuple] = {}
+# Field lists are replaced, never edited, when the catalog refreshes, so a
+# list's fingerprint holds for a catalog version:
+# id(list) -> (catalog version, list, fingerprint); holding the list keeps its id unique.
+_FINGERPRINTS: dict[int, tuple] = {}
+# form id -> (catalog version, fd_fields, filtered list), so plans over the
+# filtered list hit the fingerprint memo above instead of hashing a new list.
+_FILTERED: dict[int, tuple] = {}
+
+
+def _fingerprint(fields: list) -> str:
+    version = catalog_version()
+    entry = _FINGERPRINTS.get(id(fields))
+    if entry is None or entry[0] != version or entry[1] is not fields:
+        if len(_FINGERPRINTS) >= _MAX_PLANS:
+            _FINGERPRINTS.pop(next(iter(_FINGERPRINTS)), None)
+        entry = (version, fields, fields_fingerprint(fields))
+        _FINGERPRINTS[id(fields)] = entry
+    return entry[2]
+
+
+def get_form_plan(form: dict, all_fields: list, raw_ids=None) -> FormPlan:
+    """Return the compiled :class:`FormPlan` for ``form`` over ``all_fields``.
+
+    ``raw_ids`` pins the root field order; otherwise it comes from the form
+    detail API, falling back to the scraped portal order and sections.
+    """
+
+    form_id = int(form["id"])
+    scraped = False
+    if raw_ids is None:
+        try:
+            form_detail = get_form_detail(form_id)
+            raw_ids = form_detail.get("fields") or form.get("fields") or []
+        except Exception as e:
+            # Falling back to scraping when the API doesn't cooperate.
+            log.warning("Form detail API failed (%s); using scraped field order", e)
+            raw_ids = get_form_fields_scraped(form_id) or form.get("fields") or []
+            scraped = True
+
+    order = tuple(normalize_id_list(raw_ids))
+    key = (form_id, scraped, order, _fingerprint(all_fields))
+    plan = _FORM_PLANS.get(key)
+    if plan is not None:
+        return plan
+    partial = _PARTIAL_PLANS.get(key)
+    if partial is not None and time.monotonic() < partial[1]:
+        return partial[0]
+
+    if scraped:
+        scraped_sections = get_sections_scraped(form_id)
+        sections_for = lambda fid: scraped_sections.get(fid, [])
+    else:
+        sections_for = get_sections_cached
+    plan = compile_form_plan(
+        form_id, key, order, all_fields, sections_for,
+        concurrency=SECTIONS_CONCURRENCY,
+        deadline=time.monotonic() + SECTIONS_DEADLINE,
+    )
+    if not plan.complete:
+        # Serve opens from what we found for a while, then compile again.
+        if len(_PARTIAL_PLANS) >= _MAX_PLANS:
+            _PARTIAL_PLANS.pop(next(iter(_PARTIAL_PLANS)), None)
+        _PARTIAL_PLANS[key] = (plan, time.monotonic() + PARTIAL_PLAN_RETRY)
+        return plan
+    _PARTIAL_PLANS.pop(key, None)
+    if len(_FORM_PLANS) >= _MAX_PLANS:
+        _FORM_PLANS.pop(next(iter(_FORM_PLANS)), None)
+    _FORM_PLANS[key] = plan
+    return plan
+
+
+def clear_form_plans():
+    _FORM_PLANS.clear()
+    _PARTIAL_PLANS.clear()
+    _FINGERPRINTS.clear()
+    _FILTERED.clear()
+    _PREFETCHED.clear()
 
 
 def filter_fields_for_form(form: dict, fd_fields: list[dict]):
     """Return only Freshdesk fields referenced by the form.
 
     The returned list includes any fields listed on the form itself and any
-    conditional children discovered via :func:`get_sections_cached`.
+    conditional children reachable through the form's compiled plan.
     """
 
-    raw_ids = form.get("fields")
-    if not raw_ids:
-        try:
-            form_detail = get_form_detail(int(form["id"]))
-            raw_ids = form_detail.get("fields")
-        except Exception as e:
-            # Falling back to scraping when the API doesn't cooperate.
-            log.warning("Form detail API failed (%s); using scraped field order", e)
-            raw_ids = get_form_fields_scraped(int(form["id"]))
+    version = catalog_version()
+    entry = _FILTERED.get(int(form["id"]))
+    if entry is not None and entry[0] == version and entry[1] is fd_fields:
+        return entry[2]
 
-    ids = {str(i) for i in normalize_id_list(raw_ids or [])}
-    queue = list(ids)
-    while queue:
-        fid = queue.pop()
-        try:
-            fid_int = int(fid)
-        except (TypeError, ValueError):
-            continue
-        for sec in get_sections_cached(fid_int):
-            for child_id in normalize_id_list(sec.get("fields") or []):
-                cid = str(child_id)
-                if cid not in ids:
-                    ids.add(cid)
-                    queue.append(cid)
-
-    if not ids:
+    plan = get_form_plan(form, fd_fields, form.get("fields") or None)
+    if not plan.reachable:
         return fd_fields
 
     filtered: list[dict] = []
@@ -60,11 +165,15 @@ def filter_fields_for_form(form: dict, fd_fields: list[dict]):
         fid = f.get("id")
         if fid is None:
             continue
-        if str(fid) in ids or f.get("type") in {"default_subject", "default_description"}:
+        if str(fid) in plan.reachable or f.get("type") in CORE_TYPES:
             filtered.append(f)
+    if plan.complete:
+        if len(_FILTERED) >= _MAX_PLANS:
+            _FILTERED.pop(next(iter(_FILTERED)), None)
+        _FILTERED[int(form["id"])] = (version, fd_fields, filtered)
     return filtered
 
-def compute_pages(form: dict, all_fields: list, state_values: dict):
+def compute_pages(form: dict, all_fields: list, state_values: dict, plan: FormPlan | None = None):
     """Compute the sequence of wizard pages.
 
     Pages are generated dynamically based on answered values. Each
@@ -73,123 +182,26 @@ def compute_pages(form: dict, all_fields: list, state_values: dict):
     trailing ``None`` sentinel marks the final submission step.
     """
 
-    scraped_sections: dict[int, list] = {}
-    use_scraped_sections = False
-    try:
-        form_detail = get_form_detail(int(form["id"]))
-        raw = form_detail.get("fields") or form.get("fields") or []
-    except Exception as e:
-        log.warning("Form detail API failed (%s); using scraped field order", e)
-        raw = get_form_fields_scraped(int(form["id"])) or form.get("fields") or []
-        scraped_sections = get_sections_scraped(int(form["id"]))
-        use_scraped_sections = True
-    id_order = normalize_id_list(raw)
-    by_id: dict[object, dict] = {}
-
-    def _add_to_map(field_obj):
-        fid = field_obj.get("id")
-        if fid is None:
-            return
-        by_id[fid] = field_obj
-        by_id[str(fid)] = field_obj
-        try:
-            by_id[int(fid)] = field_obj
-        except (TypeError, ValueError):
-            pass
-        if field_obj.get("type") == "nested_field":
-            for df in field_obj.get("dependent_fields") or []:
-                if isinstance(df, dict):
-                    _add_to_map(df)
-
-    for f in all_fields:
-        _add_to_map(f)
-
-    pages: list[int | str | None] = []
-    visited: set[str] = set()
-    active_sections: set[int] = set()
-
-    def add_field_and_children(fid_raw: int | str) -> bool:
-        fid_key = str(fid_raw)
-        if fid_key in visited:
-            return True
-        f = by_id.get(fid_raw) or by_id.get(fid_key)
-        if not f:
-            log.debug("Skipping unknown field %s", fid_raw)
-            visited.add(fid_key)
-            return True
-        if f.get("type") in {"default_subject", "default_description"}:
-            log.debug("Skipping core field %s", fid_raw)
-            visited.add(fid_key)
-            return True
-        ensure_choices(f)
-        try:
-            fid_int = int(f.get("id"))
-        except (TypeError, ValueError):
-            fid_int = None
-        sec_ids = {
-            int(m.get("section_id"))
-            for m in (f.get("section_mappings") or [])
-            if m.get("section_id")
-        } if fid_int is not None else set()
-        if sec_ids and not sec_ids.issubset(active_sections):
-            log.debug("Skipping field %s not in active section", fid_raw)
-            return True
-        if not normalize_blocks(to_slack_block(f)):
-            visited.add(fid_key)
-            log.debug("Skipping field %s with no renderable blocks", fid_raw)
-            return True
-        visited.add(fid_key)
-        if f.get("type") == "nested_field":
-            for df in sorted(f.get("dependent_fields") or [], key=lambda d: d.get("level", 99)):
-                dfid = df.get("id") if isinstance(df, dict) else df
-                if dfid is None:
-                    continue
-                if not add_field_and_children(dfid):
-                    return False
-            return True
-
-        pages.append(f.get("id"))
-        selected = selected_value_for(f, state_values)
-        if selected is None:
-            return False
-        sel = str(selected)
-        if fid_int is not None:
-            if use_scraped_sections:
-                secs_iter = scraped_sections.get(fid_int, [])
-            else:
-                secs_iter = get_sections_cached(fid_int)
-            for sec in secs_iter:
-                if sel not in activator_values(sec):
-                    continue
-                sid = sec.get("id")
-                if sid is not None:
-                    try:
-                        active_sections.add(int(sid))
-                    except (TypeError, ValueError):
-                        pass
-                for child_id in normalize_id_list(sec.get("fields") or []):
-                    if not add_field_and_children(child_id):
-                        return False
-                if sid is not None:
-                    try:
-                        active_sections.discard(int(sid))
-                    except (TypeError, ValueError):
-                        pass
-        return True
-
-    for fid in id_order:
-        if not add_field_and_children(fid):
-            break
-    skipped = [f.get("id") for f in all_fields if str(f.get("id")) not in visited]
-    if skipped:
-        log.debug("Unreferenced fields skipped from wizard: %s", skipped)
+    plan = plan or get_form_plan(form, all_fields)
+    walk = walk_pages(plan, state_values)
+    return _pages_from_walk(form, all_fields, walk)
+
+
+def _pages_from_walk(form: dict, all_fields: list, walk: dict):
+    pages: list[int | str | None] = list(walk["pages"])
+    if log.isEnabledFor(logging.DEBUG):
+        visited = set(walk["visited"])
+        skipped = [f.get("id") for f in all_fields if str(f.get("id")) not in visited]
+        if skipped:
+            log.debug("Unreferenced fields skipped from wizard: %s", skipped)
 
     pages.append("core")
     pages.append(None)
     log.info("Wizard pages for %s: %s", form.get("name") or form.get("id"), pages)
     return pages
 
-def build_fields_for_page(form: dict, all_fields: list, state_values: dict, page_item: int | str | None):
+def build_fields_for_page(form: dict, all_fields: list, state_values: dict, page_item: int | str | None,
+                          plan: FormPlan | None = None):
     """Build Slack blocks for a given page item.
 
     ``page_item`` may be ``"core"`` for the subject/description step, an
@@ -197,23 +209,18 @@ def build_fields_for_page(form: dict, all_fields: list, state_values: dict, page
     submission step.
     """
 
-    def _iter_fields(fields):
-        for f in fields:
-            yield f
-            if f.get("type") == "nested_field":
-                for df in f.get("dependent_fields") or []:
-                    if isinstance(df, dict):
-                        yield from _iter_fields([df])
-
-    by_id = {f["id"]: f for f in _iter_fields(all_fields)}
+    by_id = plan.by_id if plan else index_fields(all_fields)
 
     if page_item == "core":
         blocks = []
-        subj = next((f for f in all_fields if f.get("type") == "default_subject"), None)
-        desc = next((f for f in all_fields if f.get("type") == "default_description"), None)
+        if plan:
+            subj, desc = plan.subject, plan.description
+        else:
+            subj = next((f for f in all_fields if f.get("type") == "default_subject"), None)
+            desc = next((f for f in all_fields if f.get("type") == "default_description"), None)
         for core in (subj, desc):
             if core:
-                blocks.extend(normalize_blocks(to_slack_block(core)))
+                blocks.extend(field_blocks(core))
         if not blocks:
             blocks.append({"type":"section","text":{"type":"mrkdwn","text":"_No core fields._"}})
         return blocks[:MAX_BLOCKS]
@@ -221,20 +228,23 @@ def build_fields_for_page(form: dict, all_fields: list, state_values: dict, page
     if page_item is None:
         return [{"type":"section","text":{"type":"mrkdwn","text":"_No more questions._"}}]
 
-    field_obj = by_id.get(page_item)
+    field_obj = by_id.get(str(page_item))
     if not field_obj:
         return [{"type":"section","text":{"type":"mrkdwn","text":"_Field not found._"}}]
 
     ensure_choices(field_obj)
-    return normalize_blocks(to_slack_block(field_obj))[:MAX_BLOCKS]
+    return field_blocks(field_obj)[:MAX_BLOCKS]
 
-def build_wizard_page_modal(form: dict, all_fields: list, token: str, page: int, state_values: dict):
-    pages = compute_pages(form, all_fields, state_values)
+def build_wizard_page_modal(form: dict, all_fields: list, token: str, page: int, state_values: dict,
+                            pages: list | None = None, plan: FormPlan | None = None):
+    plan = plan or get_form_plan(form, all_fields)
+    if pages is None:
+        pages = compute_pages(form, all_fields, state_values, plan=plan)
     total = len(pages)
     page = max(0, min(page, total - 1))
     page_item = pages[page]
 
-    fields_blocks = build_fields_for_page(form, all_fields, state_values, page_item)
+    fields_blocks = build_fields_for_page(form, all_fields, state_values, page_item, plan=plan)
 
     nav_elems = []
     if page > 0:
@@ -270,106 +280,305 @@ def build_wizard_page_modal(form: dict, all_fields: list, token: str, page: int,
         view["submit"] = {"type": "plain_text", "text": "Create"}
     return view
 
+def _find_form(forms: list, ticket_form_id, missing: str):
+    form = next((f for f in forms if str(f["id"]) == str(ticket_form_id)), None)
+    if not form:
+        raise RuntimeError(missing)
+    return form
+
+
+# Slack rejects a view whose private_metadata is longer than this.
+PRIVATE_METADATA_LIMIT = 3000
+
+
+def encode_answers(values: dict) -> str:
+    """Pack state values into a short string: field name -> answer only."""
+    compact = {}
+    for name, entry in (values or {}).items():
+        val = extract_input(entry)
+        if val is not None:
+            compact[name] = val
+    raw = json.dumps(compact, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(zlib.compress(raw, 9)).decode()
+
+
+def decode_answers(blob: str) -> dict:
+    """Inverse of :func:`encode_answers`, back in Slack state-value shape."""
+    compact = json.loads(zlib.decompress(base64.urlsafe_b64decode(blob.encode())))
+    values = {}
+    for name, val in compact.items():
+        if isinstance(val, bool):
+            entry = {"type": "checkboxes", "selected_options": [{"value": "true"}] if val else []}
+        else:
+            entry = {"type": "plain_text_input", "value": val}
+        values[name] = {name: entry}
+    return values
+
+
+def _load_session(token: str, meta: dict | None):
+    """Return ``(session, from_store)`` from the view's metadata or the store."""
+    if meta and meta.get("a") is not None:
+        sess = {
+            "ticket_form_id": meta.get("ticket_form_id"),
+            "page": int(meta.get("page_index") or 0),
+            "values": decode_answers(meta["a"]),
+        }
+        return sess, False
+    return WIZARD_SESSIONS.get(token), True
+
+
+def _save_session(token: str, sess: dict, view: dict, from_store: bool = True):
+    """Keep the session with the view when it fits, otherwise in the store."""
+    if WIZARD_STATELESS:
+        meta = json.loads(view["private_metadata"])
+        meta["a"] = encode_answers(sess.get("values") or {})
+        encoded = _json_dumps(meta)
+        if len(encoded) <= PRIVATE_METADATA_LIMIT:
+            view["private_metadata"] = encoded
+            if from_store:
+                WIZARD_SESSIONS.pop(token, None)
+            return
+        metrics.incr("wizard.metadata_overflow")
+    WIZARD_SESSIONS[token] = sess
+
+
+# First page of each form, rendered once per catalog with a placeholder
+# where the per-user token goes: form id -> (version, fields, view JSON).
+# Holding the fields list keeps its identity from being reused.
+_FIRST_PAGES: dict[int, tuple] = {}
+_TOKEN_SLOT = "@@wizard_token@@"
+
+
+def prerender_first_page(form: dict, fd_fields: list) -> str:
+    """Render ``form``'s first wizard page as a token-less template and cache it."""
+    view = build_wizard_page_modal(form, filter_fields_for_form(form, fd_fields), _TOKEN_SLOT, 0, {})
+    template = _json_dumps(view)
+    _FIRST_PAGES[int(form["id"])] = (catalog_version(), fd_fields, template)
+    return template
+
+
+def _first_page_template(form: dict, fd_fields: list) -> str | None:
+    entry = _FIRST_PAGES.get(int(form["id"]))
+    if entry and entry[0] == catalog_version() and entry[1] is fd_fields:
+        return entry[2]
+    return None
+
+
+def clear_first_pages():
+    _FIRST_PAGES.clear()
+
+
+def _start_wizard(form: dict, fd_fields: list, ticket_form_id: int):
+    template = _first_page_template(form, fd_fields)
+    if template is None:
+        metrics.incr("wizard.first_page.miss")
+        template = prerender_first_page(form, fd_fields)
+    else:
+        metrics.incr("wizard.first_page.hit")
+
+    token = uuid.uuid4().hex
+    sess = {"ticket_form_id": ticket_form_id, "page": 0, "values": {}}
+    view = json.loads(template.replace(_TOKEN_SLOT, token))
+    _save_session(token, sess, view, from_store=False)
+    return view
+
+
+def _advance_wizard(token: str, sess: dict, form: dict, fd_fields: list, new_state_values: dict | None,
+                    nav: str | None):
+    # Merge incoming view state, remembering which answers actually moved.
+    old_values = sess.get("values") or {}
+    changed = changed_answers(old_values, new_state_values or {})
+    values = {**old_values, **(new_state_values or {})}
+
+    fd_fields = filter_fields_for_form(form, fd_fields)
+    plan = get_form_plan(form, fd_fields)
+
+    # Only the pages after the earliest changed answer are walked again;
+    # the prefix before it cannot have moved. This avoids glitches where
+    # unrelated fields appear or pages repeat when conditional branches
+    # change, without paying for the whole form on every click.
+    walk = resume_walk(plan, values, sess.get("walk"), changed)
+    pages = _pages_from_walk(form, fd_fields, walk)
+
+    # Drop stale answers below a changed field whose branch is no longer
+    # on the path. Answers elsewhere in the form are left alone.
+    on_path = {str(item) for item in walk["pages"]}
+    for name in changed:
+        fid = plan.names.get(name)
+        if fid is None:
+            continue
+        for child in plan.descendants(fid):
+            child_field = plan.by_id.get(child)
+            if child not in on_path and child_field and child_field.get("name"):
+                values.pop(child_field["name"], None)
+    sess["values"] = values
+    sess["walk"] = walk
+
+    page = max(0, min(int(sess.get("page", 0)), len(pages) - 1))
+    current_item = pages[page]
+
+    if nav == "next":
+        # Don't advance unless the current field has a value when the
+        # page represents a specific field id.
+        allow_advance = True
+        if isinstance(current_item, int):
+            field_obj = plan.by_id.get(str(current_item))
+            if field_obj and selected_value_for(field_obj, values) is None:
+                allow_advance = False
+        if allow_advance:
+            page = min(page + 1, len(pages) - 1)
+    elif nav == "prev":
+        page = max(page - 1, 0)
+
+    sess["page"] = page
+
+    return build_wizard_page_modal(form, fd_fields, token, page, values, pages=pages, plan=plan)
+
+
+def _step_wizard(token: str, sess: dict, from_store: bool, form: dict, fd_fields: list,
+                 new_state_values: dict | None, nav: str | None):
+    view = _advance_wizard(token, sess, form, fd_fields, new_state_values, nav)
+    _save_session(token, sess, view, from_store)
+    return view
+
+
+def _is_hash_conflict(e: RuntimeError) -> bool:
+    data = e.args[0] if e.args else {}
+    return isinstance(data, dict) and data.get("error") == "hash_conflict"
+
+
+def _push_view(view_id: str, view_hash: str | None, view: dict):
+    try:
+        slack_api("views.update", {"view_id": view_id, "hash": view_hash, "view": view}, supersede=view_id)
+    except RuntimeError as e:
+        if not _is_hash_conflict(e):
+            raise
+        time.sleep(0.05)
+        slack_api("views.update", {"view_id": view_id, "view": view}, supersede=view_id)
+
+
 # helpers used by routes (async flows)
 def open_wizard_first_page(view_id: str, ticket_form_id: int, view_hash: str | None):
     try:
-        with ThreadPoolExecutor() as ex:
-            forms_future = ex.submit(get_ticket_forms_cached)
-            fields_future = ex.submit(get_ticket_fields_cached)
-            forms = forms_future.result()
-            fd_fields = fields_future.result()
-        form = next((f for f in forms if str(f["id"]) == str(ticket_form_id)), None)
-        if not form:
-            raise RuntimeError(f"Form {ticket_form_id} not found")
+        # Both catalogs are served from memory (stale-while-revalidate).
+        form = _find_form(get_ticket_forms_cached(), ticket_form_id, f"Form {ticket_form_id} not found")
+        view = _start_wizard(form, get_ticket_fields_cached(), ticket_form_id)
+        _push_view(view_id, view_hash, view)
+    except Exception as e:
+        log.exception("Wizard open failed: %s", e)
 
-        fd_fields = filter_fields_for_form(form, fd_fields)
+def update_wizard(view_id: str, token: str, view_hash: str | None, new_state_values: dict | None, nav: str | None = None,
+                  meta: dict | None = None):
+    try:
+        sess, from_store = _load_session(token, meta)
+        if not sess:
+            log.info("Wizard session expired for view %s", view_id)
+            _push_view(view_id, None, SESSION_EXPIRED_VIEW)
+            return
+        form = _find_form(get_ticket_forms_cached(), sess["ticket_form_id"], "Form not found for wizard session")
+        view = _step_wizard(token, sess, from_store, form, get_ticket_fields_cached(), new_state_values, nav)
+        _push_view(view_id, view_hash, view)
+    except Exception as e:
+        log.exception("Wizard update failed: %s", e)
 
-        token = uuid.uuid4().hex
-        WIZARD_SESSIONS[token] = {"ticket_form_id": ticket_form_id, "page": 0, "values": {}}
 
-        view = build_wizard_page_modal(form, fd_fields, token, 0, {})
-        try:
-            slack_api("views.update", {"view_id": view_id, "hash": view_hash, "view": view})
-        except RuntimeError as e:
-            data = e.args[0] if e.args else {}
-            if isinstance(data, dict) and data.get("error") == "hash_conflict":
-                time.sleep(0.05)
-                slack_api("views.update", {"view_id": view_id, "view": view})
-            else:
-                raise
+# Coroutine flows for the ASGI entry point. Network lookups (form detail,
+# every section level, missing dropdown choices) are fanned out on the
+# event loop first; the plan and page logic above then run from memory in a
+# worker thread, together with the session store, which may be SQLite or Redis.
+async def _acatalog():
+    return await asyncio.gather(
+        asyncio.to_thread(get_ticket_forms_cached),
+        asyncio.to_thread(get_ticket_fields_cached),
+    )
+
+
+# form id -> (catalog version, fd_fields) of the last complete prefetch;
+# holding the list keeps its id unique.
+_PREFETCHED: dict[int, tuple] = {}
+
+
+def _plan_for(form: dict, fd_fields: list) -> FormPlan:
+    # The filtered path, so the plan key is the one _advance_wizard uses.
+    return get_form_plan(form, filter_fields_for_form(form, fd_fields))
+
+
+async def aprefetch_form(form: dict, fd_fields: list):
+    """Fetch what ``form``'s plan needs concurrently, once per catalog."""
+    version = catalog_version()
+    done = _PREFETCHED.get(int(form["id"]))
+    if done is not None and done[0] == version and done[1] is fd_fields:
+        return
+    roots = list(normalize_id_list(form.get("fields") or []))
+    try:
+        detail = await aget_form_detail(int(form["id"]))
+        roots.extend(normalize_id_list(detail.get("fields") or []))
+    except Exception as e:
+        # get_form_plan falls back to the scraped order on its own.
+        log.debug("Form detail prefetch for %s failed: %s", form.get("id"), e)
+    await aprefetch_sections(roots, fd_fields)
+    plan = await asyncio.to_thread(_plan_for, form, fd_fields)
+    await aensure_choices(plan.choice_fields())
+    if plan.complete:
+        if len(_PREFETCHED) >= _MAX_PLANS:
+            _PREFETCHED.pop(next(iter(_PREFETCHED)), None)
+        _PREFETCHED[int(form["id"])] = (version, fd_fields)
+
+
+async def _apush_view(view_id: str, view_hash: str | None, view: dict):
+    try:
+        await aslack_api("views.update", {"view_id": view_id, "hash": view_hash, "view": view}, supersede=view_id)
+    except RuntimeError as e:
+        if not _is_hash_conflict(e):
+            raise
+        await asyncio.sleep(0.05)
+        await aslack_api("views.update", {"view_id": view_id, "view": view}, supersede=view_id)
+
+
+async def aopen_wizard_first_page(view_id: str, ticket_form_id: int, view_hash: str | None):
+    try:
+        forms, fd_fields = await _acatalog()
+        form = _find_form(forms, ticket_form_id, f"Form {ticket_form_id} not found")
+        if _first_page_template(form, fd_fields) is None:
+            await aprefetch_form(form, fd_fields)
+        view = await asyncio.to_thread(_start_wizard, form, fd_fields, ticket_form_id)
+        await _apush_view(view_id, view_hash, view)
     except Exception as e:
         log.exception("Wizard open failed: %s", e)
 
-def update_wizard(view_id: str, token: str, view_hash: str | None, new_state_values: dict | None, nav: str | None = None):
+
+async def aupdate_wizard(view_id: str, token: str, view_hash: str | None, new_state_values: dict | None,
+                         nav: str | None = None, meta: dict | None = None):
     try:
-        sess = WIZARD_SESSIONS.get(token)
+        sess, from_store = await asyncio.to_thread(_load_session, token, meta)
         if not sess:
-            raise RuntimeError("Wizard session expired")
-        # Merge incoming view state
-        sess["values"] = {**(sess.get("values") or {}), **(new_state_values or {})}
-
-        with ThreadPoolExecutor() as ex:
-            forms_future = ex.submit(get_ticket_forms_cached)
-            fields_future = ex.submit(get_ticket_fields_cached)
-            forms = forms_future.result()
-            fd_fields = fields_future.result()
-        form = next((f for f in forms if str(f["id"]) == str(sess["ticket_form_id"])), None)
-        if not form:
-            raise RuntimeError("Form not found for wizard session")
-
-        fd_fields = filter_fields_for_form(form, fd_fields)
-
-        # Determine current page item and compute navigation relative to
-        # the freshly generated page sequence. This avoids glitches where
-        # unrelated fields appear or pages repeat when conditional
-        # branches change.
-        pages = compute_pages(form, fd_fields, sess["values"])
-        # Drop stale answers for fields no longer in the current flow so
-        # that unrelated branches are ignored. Recompute pages after
-        # trimming to reflect any removed branches.
-        by_id = {f.get("id"): f for f in fd_fields}
-        valid_names = set()
-        for item in pages:
-            if isinstance(item, int):
-                f = by_id.get(item)
-                if f and f.get("name"):
-                    valid_names.add(f["name"])
-        if "core" in pages:
-            valid_names.update({"subject", "description"})
-        sess["values"] = {k: v for k, v in sess["values"].items() if k in valid_names}
-        pages = compute_pages(form, fd_fields, sess["values"])
-
-        page = max(0, min(int(sess.get("page", 0)), len(pages) - 1))
-        current_item = pages[page]
-
-        if nav == "next":
-            # Don't advance unless the current field has a value when the
-            # page represents a specific field id.
-            allow_advance = True
-            if isinstance(current_item, int):
-                field_obj = next((f for f in fd_fields if f.get("id") == current_item), None)
-                if field_obj and selected_value_for(field_obj, sess["values"]) is None:
-                    allow_advance = False
-            if allow_advance:
-                page = min(page + 1, len(pages) - 1)
-        elif nav == "prev":
-            page = max(page - 1, 0)
-
-        sess["page"] = page
-
-        view = build_wizard_page_modal(form, fd_fields, token, page, sess["values"])
-        try:
-            slack_api("views.update", {"view_id": view_id, "hash": view_hash, "view": view})
-        except RuntimeError as e:
-            data = e.args[0] if e.args else {}
-            if isinstance(data, dict) and data.get("error") == "hash_conflict":
-                time.sleep(0.05)
-                slack_api("views.update", {"view_id": view_id, "view": view})
-            else:
-                raise
+            log.info("Wizard session expired for view %s", view_id)
+            await _apush_view(view_id, None, SESSION_EXPIRED_VIEW)
+            return
+        forms, fd_fields = await _acatalog()
+        form = _find_form(forms, sess["ticket_form_id"], "Form not found for wizard session")
+        await aprefetch_form(form, fd_fields)
+        view = await asyncio.to_thread(_step_wizard, token, sess, from_store, form, fd_fields, new_state_values, nav)
+        await _apush_view(view_id, view_hash, view)
     except Exception as e:
         log.exception("Wizard update failed: %s", e)
 
+def wizard_submission(meta: dict, state_values: dict | None):
+    """Return ``(token, merged_values, ticket_form_id)`` for a wizard submit.
+
+    Raises ``KeyError`` when the token's session has expired, since the
+    answers from earlier pages are gone with it.
+    """
+    token = meta.get("wizard_token")
+    session, _ = _load_session(token, meta) if token else (None, False)
+    if token and session is None:
+        raise KeyError(token)
+    merged = dict((session.get("values") or {})) if session else {}
+    merged.update(state_values or {})
+    ticket_form_id = (session or {}).get("ticket_form_id") or meta.get("ticket_form_id")
+    return token, merged, ticket_form_id
+
+
 def _json_dumps(obj):
     import json
     return json.dumps(obj)
@@ -1,18 +1,27 @@
 from __future__ import annotations
-import json, logging, threading
+import json, logging
 from flask import Blueprint, request, jsonify
 from config import ENABLE_WIZARD
+from services import executor
+from services.coalesce import VIEWS, action_seq
 from services.freshdesk import (
-    fd_get,
+    fd_post,
     get_ticket_forms_cached,
     get_ticket_fields_cached,
 )
 from services.slack import slack_api, get_user_email
-from logic.forms import filter_portal_forms
+from logic.forms import portal_picker_modal
+from logic.choice_search import options_for
 from logic.single_page import build_form_fields_modal
-from logic.wizard import open_wizard_first_page, update_wizard, WIZARD_SESSIONS
+from logic.wizard import (
+    open_wizard_first_page,
+    update_wizard,
+    wizard_submission,
+    WIZARD_SESSIONS,
+    SESSION_EXPIRED_VIEW,
+)
 from logic.ticket import modal_values_to_fd_ticket
-from ui import loading_modal, build_form_picker_modal
+from ui import loading_modal, error_modal, ticket_created_modal
 
 log = logging.getLogger(__name__)
 bp = Blueprint("core", __name__)
@@ -29,6 +38,47 @@ def _notify_user_ticket_created(user_id: str, ticket_id: int) -> bool:
         log.exception("Notify user failed: %s", e)
         return False
 
+_SUBMIT_FAILED = {"response_action": "errors", "errors": {"subject": "Ticket creation failed. Please try again."}}
+_BUSY_VIEW = error_modal(":hourglass: The helpdesk bot is busy right now. Close this and try again in a moment.")
+_PICK_BUSY = {"response_action": "errors", "errors": {"form_select": "Busy right now, please try again in a moment."}}
+
+
+def _show_busy(view_id: str):
+    # The worker pool turned the job away; don't leave a spinner up forever.
+    try:
+        slack_api("views.update", {"view_id": view_id, "view": _BUSY_VIEW}, supersede=view_id)
+    except Exception as e:
+        log.warning("Could not show the busy view on %s: %s", view_id, e)
+
+
+def _create_ticket(payload: dict, values: dict, ticket_form_id, token: str | None = None) -> dict:
+    user_id = (payload.get("user") or {}).get("id")
+    user_email = get_user_email(user_id) if user_id else None
+    fd_ticket = modal_values_to_fd_ticket(values, ticket_form_id, user_email)
+    try:
+        created = fd_post("/api/v2/tickets", fd_ticket)
+        ticket_id = created.get("id")
+        log.info("✅ Ticket created: %s", ticket_id)
+        notified = _notify_user_ticket_created(user_id, ticket_id) if user_id and ticket_id else False
+        if token:
+            WIZARD_SESSIONS.pop(token, None)
+        if notified:
+            return {"response_action": "clear"}
+        return {"response_action": "update", "view": ticket_created_modal(ticket_id)}
+    except Exception as e:
+        log.exception("Ticket create failed: %s", e)
+        return _SUBMIT_FAILED
+
+
+def _run_submit(payload: dict, values: dict, ticket_form_id, token: str | None = None) -> dict:
+    # Submits go to the front of the shared pool and may use its reserved workers.
+    try:
+        return executor.run(executor.SUBMIT, _create_ticket, payload, values, ticket_form_id, token)
+    except RuntimeError as e:
+        log.error("Ticket submit not scheduled: %s", e)
+        return _SUBMIT_FAILED
+
+
 @bp.route("/it-ticket", methods=["POST"])
 def it_ticket_command():
     # Handling the /it-ticket slash command kickoff.
@@ -44,37 +94,31 @@ def it_ticket_command():
 
     def _populate():
         try:
-            forms = filter_portal_forms(get_ticket_forms_cached())
-            modal = build_form_picker_modal(forms)
-            payload = {"view_id": view_id, "view": modal}
+            payload = {"view_id": view_id, "view": portal_picker_modal()}
             if view_hash:
                 payload["hash"] = view_hash
             try:
-                slack_api("views.update", payload)
+                slack_api("views.update", payload, supersede=view_id)
             except RuntimeError:
                 payload.pop("hash", None)
-                slack_api("views.update", payload)
+                slack_api("views.update", payload, supersede=view_id)
         except Exception as e:
             log.exception("Opening form picker failed: %s", e)
-            err_view = {
-                "type": "modal",
-                "title": {"type": "plain_text", "text": "New IT Ticket"},
-                "close": {"type": "plain_text", "text": "Close"},
-                "blocks": [
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": f":warning: Failed to load forms.\n`{e}`",
-                        },
-                    }
-                ],
-            }
-            slack_api("views.update", {"view_id": view_id, "view": err_view})
-
-    threading.Thread(target=_populate, daemon=True).start()
+            err_view = error_modal(f":warning: Failed to load forms.\n`{e}`")
+            slack_api("views.update", {"view_id": view_id, "view": err_view}, supersede=view_id)
+
+    if executor.submit(executor.PICKER, _populate) is None and view_id:
+        _show_busy(view_id)
     return "", 200
 
+@bp.route("/options", methods=["POST"])
+def options_load():
+    # Slack's options-load URL: typeahead for external_select dropdowns.
+    payload = json.loads(request.form["payload"])
+    if payload.get("type") != "block_suggestion":
+        return jsonify({"options": []}), 200
+    return jsonify({"options": options_for(payload.get("action_id"), payload.get("value"))}), 200
+
 @bp.route("/interactions", methods=["POST"])
 def interactions():
     # All the Slack interactive callbacks funnel through here.
@@ -93,11 +137,10 @@ def interactions():
 
         response = {"response_action": "update", "view": loading_modal("Loading form...")}
         if ENABLE_WIZARD:
-            threading.Thread(
-                target=open_wizard_first_page,
-                args=(view["id"], int(chosen), view.get("hash")),
-                daemon=True,
-            ).start()
+            queued = executor.submit_latest(
+                VIEWS, executor.NAV, view["id"], action_seq(payload),
+                open_wizard_first_page, view["id"], int(chosen), view.get("hash"), droppable=False,
+            )
         else:
             # single-page async update
             def _run():
@@ -111,13 +154,17 @@ def interactions():
                         slack_api(
                             "views.update",
                             {"view_id": view["id"], "hash": view.get("hash"), "view": updated},
+                            supersede=view["id"],
                         )
                     except RuntimeError:
-                        slack_api("views.update", {"view_id": view["id"], "view": updated})
+                        slack_api("views.update", {"view_id": view["id"], "view": updated}, supersede=view["id"])
                 except Exception as e:
                     log.exception("Async update failed: %s", e)
 
-            threading.Thread(target=_run, daemon=True).start()
+            queued = executor.submit_latest(VIEWS, executor.NAV, view["id"], action_seq(payload), _run, droppable=False)
+        if not queued:
+            # Nothing will replace the loading view; keep the picker open instead.
+            return jsonify(_PICK_BUSY), 200
         return jsonify(response), 200
 
     # Live updates while the user changes inputs or clicks wizard nav
@@ -138,11 +185,12 @@ def interactions():
                     nav = "next"
                 elif a.get("action_id") == "wizard_prev":
                     nav = "prev"
-            threading.Thread(
-                target=update_wizard,
-                args=(view["id"], token, view.get("hash"), state_values, nav),
-                daemon=True,
-            ).start()
+            # Input-only changes collapse to the newest state; nav clicks all run, in order.
+            if not executor.submit_latest(
+                VIEWS, executor.NAV, view["id"], action_seq(payload),
+                update_wizard, view["id"], token, view.get("hash"), state_values, nav, meta, droppable=nav is None,
+            ):
+                _show_busy(view["id"])
             return "", 200
 
         # Single-page live update: rebuild fields based on current selections
@@ -156,46 +204,22 @@ def interactions():
                     form = next((f for f in forms if str(f["id"]) == str(ticket_form_id)), None)
                     updated = build_form_fields_modal(form, fd_fields, state_values)
                     try:
-                        slack_api("views.update", {"view_id": view["id"], "hash": view.get("hash"), "view": updated})
+                        slack_api("views.update", {"view_id": view["id"], "hash": view.get("hash"), "view": updated}, supersede=view["id"])
                     except RuntimeError:
-                        slack_api("views.update", {"view_id": view["id"], "view": updated})
+                        slack_api("views.update", {"view_id": view["id"], "view": updated}, supersede=view["id"])
                 except Exception as e:
                     log.exception("Live update failed: %s", e)
-            threading.Thread(target=_run_update, daemon=True).start()
+            if not executor.submit_latest(VIEWS, executor.LIVE, view["id"], action_seq(payload), _run_update):
+                _show_busy(view["id"])
         return "", 200
 
     # Single-page submit
     if ptype == "view_submission" and cb == "submit_it_ticket":
-        values = view["state"]["values"]
         try:
             meta = json.loads(view.get("private_metadata") or "{}")
         except json.JSONDecodeError:
             meta = {}
-        ticket_form_id = meta.get("ticket_form_id")
-        user_id = (payload.get("user") or {}).get("id")
-        user_email = get_user_email(user_id) if user_id else None
-        fd_ticket = modal_values_to_fd_ticket(values, ticket_form_id, user_email)
-        try:
-            created = fd_get("/api/v2/admin/ticket_fields")  # dummy ping to keep token warm
-            from services.freshdesk import fd_post
-            created = fd_post("/api/v2/tickets", fd_ticket)
-            ticket_id = created.get("id")
-            log.info("✅ Ticket created: %s", ticket_id)
-            notified = _notify_user_ticket_created(user_id, ticket_id) if user_id and ticket_id else False
-            if notified:
-                return jsonify({"response_action": "clear"}), 200
-            success_view = {
-                "type": "modal",
-                "title": {"type": "plain_text", "text": "Ticket created"},
-                "close": {"type": "plain_text", "text": "Close"},
-                "blocks": [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f":white_check_mark: Ticket created: {ticket_id}"}}
-                ]
-            }
-            return jsonify({"response_action": "update", "view": success_view}), 200
-        except Exception as e:
-            log.exception("Ticket create failed: %s", e)
-            return jsonify({"response_action": "errors","errors": {"subject": "Ticket creation failed. Please try again."}}), 200
+        return jsonify(_run_submit(payload, view["state"]["values"], meta.get("ticket_form_id"))), 200
 
     # Wizard submit
     if ptype == "view_submission" and cb == "wizard_submit":
@@ -203,35 +227,10 @@ def interactions():
             meta = json.loads(view.get("private_metadata") or "{}")
         except json.JSONDecodeError:
             meta = {}
-        token = meta.get("wizard_token"); session = WIZARD_SESSIONS.get(token) if token else None
-        merged = dict((session.get("values") or {})) if session else {}
-        merged.update(view.get("state", {}).get("values", {}) or {})
-        ticket_form_id = (session or {}).get("ticket_form_id") or meta.get("ticket_form_id")
-
-        user_id = (payload.get("user") or {}).get("id")
-        user_email = get_user_email(user_id) if user_id else None
-        fd_ticket = modal_values_to_fd_ticket(merged, ticket_form_id, user_email)
         try:
-            from services.freshdesk import fd_post
-            created = fd_post("/api/v2/tickets", fd_ticket)
-            ticket_id = created.get("id")
-            log.info("✅ Ticket created: %s", ticket_id)
-            notified = _notify_user_ticket_created(user_id, ticket_id) if user_id and ticket_id else False
-            if token and token in WIZARD_SESSIONS:
-                del WIZARD_SESSIONS[token]
-            if notified:
-                return jsonify({"response_action": "clear"}), 200
-            success_view = {
-                "type": "modal",
-                "title": {"type": "plain_text", "text": "Ticket created"},
-                "close": {"type": "plain_text", "text": "Close"},
-                "blocks": [
-                    {"type": "section", "text": {"type": "mrkdwn", "text": f":white_check_mark: Ticket created: {ticket_id}"}}
-                ]
-            }
-            return jsonify({"response_action": "update", "view": success_view}), 200
-        except Exception as e:
-            log.exception("Ticket create failed: %s", e)
-            return jsonify({"response_action": "errors","errors": {"subject": "Ticket creation failed. Please try again."}}), 200
+            token, merged, ticket_form_id = wizard_submission(meta, view.get("state", {}).get("values", {}))
+        except KeyError:
+            return jsonify({"response_action": "update", "view": SESSION_EXPIRED_VIEW}), 200
+        return jsonify(_run_submit(payload, merged, ticket_form_id, token)), 200
 
     return "", 200
@@ -1,7 +1,9 @@
 from __future__ import annotations
 from flask import Blueprint, request, jsonify
+from services import metrics
 from services.freshdesk import fetch_field_detail, fd_get
 from logic.mapping import get_field_choices, iter_choice_items, ensure_choices
+from logic.warmup import CRAWL_STATUS, WARM_STATUS
 
 bp = Blueprint("debug", __name__)
 
@@ -53,3 +55,15 @@ def debug_find():
                 "choices_preview": preview
             })
     return jsonify({"query": q, "results": hits}), 200
+
+@bp.get("/debug/metrics")
+def debug_metrics():
+    return jsonify(metrics.snapshot()), 200
+
+@bp.get("/debug/crawl")
+def debug_crawl():
+    return jsonify(CRAWL_STATUS), 200
+
+@bp.get("/debug/warmup")
+def debug_warmup():
+    return jsonify(WARM_STATUS), 200
@@ -0,0 +1,93 @@
+import threading, logging
+from services import metrics
+
+log = logging.getLogger(__name__)
+
+
+class LatestWins:
+    """Per-key queue where newer work replaces older work still waiting.
+
+    Each job carries a sequence number (Slack's ``action_ts``) or ``None``. ``offer``
+    drops a job older than what the key last rendered, and replaces any
+    pending job marked ``droppable``; non-droppable jobs (wizard nav
+    clicks) stay queued in order. Only one drainer runs per key, so updates
+    for a view never race each other. ``offer`` returns True when the
+    caller must start that drainer, which then loops on ``next`` and
+    ``rendered``.
+    """
+
+    def __init__(self, name: str, max_keys: int = 4096):
+        self.name = name
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._pending: dict[object, list] = {}
+        self._running: set = set()
+        self._rendered: dict[object, float] = {}
+
+    def offer(self, key, seq: float | None, job, droppable: bool = True) -> bool:
+        with self._lock:
+            if seq is not None and seq < self._rendered.get(key, float("-inf")):
+                metrics.incr(f"{self.name}.stale_dropped")
+                return False
+            queue = self._pending.setdefault(key, [])
+            kept = [item for item in queue if not item[2]]
+            if len(kept) != len(queue):
+                metrics.incr(f"{self.name}.superseded", len(queue) - len(kept))
+            kept.append((seq, job, droppable))
+            self._pending[key] = kept
+            if key in self._running:
+                return False
+            self._running.add(key)
+            return True
+
+    def next(self, key):
+        """Pop the next job for ``key`` as ``(seq, job)``; ``None`` ends the drainer."""
+        with self._lock:
+            queue = self._pending.get(key) or []
+            floor = self._rendered.get(key, float("-inf"))
+            while queue:
+                seq, job, _ = queue.pop(0)
+                if seq is None or seq >= floor:
+                    return seq, job
+                metrics.incr(f"{self.name}.stale_dropped")
+            self._pending.pop(key, None)
+            self._running.discard(key)
+            return None
+
+    def rendered(self, key, seq: float | None):
+        with self._lock:
+            if seq is not None and seq >= self._rendered.get(key, float("-inf")):
+                self._rendered.pop(key, None)
+                if len(self._rendered) >= self.max_keys:
+                    # Views older than this are long closed.
+                    self._rendered.pop(next(iter(self._rendered)))
+                self._rendered[key] = seq
+
+    def abandon(self, key):
+        """Forget queued work for ``key`` when its drainer could not be started."""
+        with self._lock:
+            self._pending.pop(key, None)
+            self._running.discard(key)
+
+    def pending(self, key) -> int:
+        with self._lock:
+            return len(self._pending.get(key) or [])
+
+
+def action_seq(payload: dict) -> float | None:
+    """Ordering stamp for an interaction: its newest ``action_ts``.
+
+    Events without one (view submissions) are ``None``: queued in arrival
+    order but never judged stale, since our clock isn't Slack's.
+    """
+    stamps = []
+    for a in payload.get("actions") or []:
+        try:
+            stamps.append(float(a.get("action_ts")))
+        except (TypeError, ValueError):
+            pass
+    return max(stamps) if stamps else None
+
+
+# One queue per open Slack view, shared by every entry point.
+VIEWS = LatestWins("views")
@@ -0,0 +1,153 @@
+import os, time, logging, threading
+from collections import deque
+from concurrent.futures import Future
+from config import WORKER_POOL_SIZE, WORKER_QUEUE_MAX, WORKER_RESERVED
+from services import metrics
+
+log = logging.getLogger(__name__)
+
+# Lanes in priority order; a free worker always takes from the first
+# non-empty lane it is allowed to serve.
+SUBMIT, NAV, PICKER, LIVE = "submit", "nav", "picker", "live"
+LANES = (SUBMIT, NAV, PICKER, LIVE)
+_URGENT = {SUBMIT, NAV}
+
+
+class LaneExecutor:
+    """Fixed pool of worker threads fed from bounded per-lane queues.
+
+    ``reserved`` workers never pick up picker or live-update work, so a
+    submit or wizard step finds a free worker even while a burst of
+    keystroke rebuilds is queued. A full lane rejects new work instead of
+    growing without bound.
+    """
+
+    def __init__(self, size: int, max_queue: int, reserved: int = 0, name: str = "executor"):
+        self.name = name
+        self.size = max(1, size)
+        self.max_queue = max(1, max_queue)
+        self.reserved = max(0, min(reserved, self.size - 1))
+        self._queues = {lane: deque() for lane in LANES}
+        self._cond = threading.Condition()
+        self._busy = 0
+        self._threads: list[threading.Thread] = []
+
+    def _start(self):
+        # Workers start on first use, not at import.
+        while len(self._threads) < self.size:
+            t = threading.Thread(target=self._work, name=f"{self.name}-{len(self._threads)}", daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def submit(self, lane: str, fn, *args, **kwargs) -> Future | None:
+        """Queue ``fn(*args, **kwargs)`` on ``lane``; ``None`` if the lane is full."""
+        fut = Future()
+        with self._cond:
+            q = self._queues[lane]
+            if len(q) >= self.max_queue:
+                metrics.incr(f"{self.name}.rejected.{lane}")
+                log.warning("%s: %s lane full (%d queued); rejecting", self.name, lane, len(q))
+                return None
+            if len(self._threads) < self.size:
+                self._start()
+            q.append((time.monotonic(), fut, fn, args, kwargs))
+            metrics.gauge(f"{self.name}.queue.{lane}", len(q))
+            self._cond.notify()
+        return fut
+
+    def run(self, lane: str, fn, *args, **kwargs):
+        """Run ``fn`` on the pool and wait for its result."""
+        fut = self.submit(lane, fn, *args, **kwargs)
+        if fut is None:
+            raise RuntimeError(f"{self.name}: {lane} lane is full")
+        return fut.result()
+
+    def _next(self):
+        for lane in LANES:
+            q = self._queues[lane]
+            if q and (lane in _URGENT or self._busy < self.size - self.reserved):
+                return lane, q.popleft()
+        return None, None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                lane, item = self._next()
+                while item is None:
+                    self._cond.wait()
+                    lane, item = self._next()
+                self._busy += 1
+                metrics.gauge(f"{self.name}.queue.{lane}", len(self._queues[lane]))
+                metrics.gauge(f"{self.name}.busy", self._busy)
+            enqueued, fut, fn, args, kwargs = item
+            waited_ms = (time.monotonic() - enqueued) * 1000
+            metrics.incr(f"{self.name}.wait_ms.{lane}", waited_ms)
+            metrics.incr(f"{self.name}.done.{lane}")
+            metrics.gauge(f"{self.name}.last_wait_ms.{lane}", round(waited_ms, 1))
+            try:
+                if fut.set_running_or_notify_cancel():
+                    try:
+                        fut.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        log.exception("%s: %s task failed: %s", self.name, lane, e)
+                        fut.set_exception(e)
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    metrics.gauge(f"{self.name}.busy", self._busy)
+                    # A reserved slot may have opened up for lower lanes.
+                    self._cond.notify()
+
+    def _after_fork(self):
+        # Worker threads don't survive a fork; the child starts its own on first use.
+        self._cond = threading.Condition()
+        self._threads = []
+        self._busy = 0
+        for q in self._queues.values():
+            q.clear()
+
+    def depth(self) -> dict[str, int]:
+        with self._cond:
+            return {lane: len(q) for lane, q in self._queues.items()}
+
+
+EXECUTOR = LaneExecutor(WORKER_POOL_SIZE, WORKER_QUEUE_MAX, WORKER_RESERVED, name="executor")
+os.register_at_fork(after_in_child=EXECUTOR._after_fork)
+
+
+def submit(lane: str, fn, *args, **kwargs) -> Future | None:
+    return EXECUTOR.submit(lane, fn, *args, **kwargs)
+
+
+def run(lane: str, fn, *args, **kwargs):
+    return EXECUTOR.run(lane, fn, *args, **kwargs)
+
+
+def submit_latest(coalescer, lane: str, key, seq: float | None, fn, *args, droppable: bool = True) -> bool:
+    """Queue ``fn(*args)`` behind ``coalescer`` so only the newest work per key runs.
+
+    A drainer is started on ``lane`` only when no other is running for ``key``.
+    Returns ``False`` when the lane was full and the work was dropped.
+    """
+    if coalescer.offer(key, seq, (fn, args), droppable):
+        if EXECUTOR.submit(lane, _drain, coalescer, key) is None:
+            coalescer.abandon(key)
+            return False
+    return True
+
+
+def _drain(coalescer, key):
+    # One failed job must not end the drainer: the key would stay marked
+    # running and every later update for the view would be dropped.
+    try:
+        while (item := coalescer.next(key)) is not None:
+            seq, (fn, args) = item
+            try:
+                fn(*args)
+            except Exception as e:
+                log.exception("%s: job for %s failed: %s", coalescer.name, key, e)
+            finally:
+                coalescer.rendered(key, seq)
+    except BaseException:
+        coalescer.abandon(key)
+        raise
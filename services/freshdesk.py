@@ -1,20 +1,34 @@
 from __future__ import annotations
+import asyncio
 import time
 import json
+import hashlib
 import re
 from pathlib import Path
 import requests
 import logging
 import os
 import threading
-from bs4 import BeautifulSoup
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
 from requests.adapters import HTTPAdapter
 from config import (
     FRESHDESK_DOMAIN,
     FRESHDESK_API_KEY,
     HTTP_TIMEOUT,
     PORTAL_TICKET_FORM_URL,
+    FORM_DETAIL_TTL,
+    CATALOG_MAX_STALE,
+    FD_RATE_LIMIT,
+    FD_TICKET_RESERVE,
+    FD_RATE_WAIT,
+    FD_MAX_RETRIES,
 )
+from services import metrics, snapshot
+from services.ratelimit import TokenBucket, retry_after_seconds, int_header
+
+if TYPE_CHECKING:
+    import httpx
 
 log = logging.getLogger(__name__)
 
@@ -22,29 +36,167 @@ FD_DEBUG_SCRAPE = os.getenv("FD_DEBUG_SCRAPE", "").lower() in {"1", "true", "yes
 
 
 # Keeping a session around so each call reuses connections and carries auth.
-_session = requests.Session()
-_session.auth = (FRESHDESK_API_KEY, "X")
-_session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    session.auth = (FRESHDESK_API_KEY, "X")
+    session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
+    return session
 
 
-def fd_get(path: str):
+_session = _new_session()
+
+
+# One bucket for the whole Freshdesk account budget. Ticket creation may
+# spend all of it; everything else leaves FD_TICKET_RESERVE of it alone.
+_BUCKET = TokenBucket(FD_RATE_LIMIT, name="freshdesk")
+HIGH, LOW = "high", "low"
+
+
+def _reserve_for(priority: str) -> float:
+    return 0.0 if priority == HIGH else _BUCKET.capacity * FD_TICKET_RESERVE
+
+
+def _no_budget(method: str, path: str) -> RuntimeError:
+    metrics.incr("fd.ratelimit.timeout")
+    return RuntimeError(f"Freshdesk rate limit: no budget for {method} {path}")
+
+
+def _note_limits(headers):
+    remaining = int_header(headers, "X-RateLimit-Remaining")
+    _BUCKET.observe(remaining, int_header(headers, "X-RateLimit-Total"))
+    if remaining is not None:
+        metrics.gauge("fd.ratelimit.remaining", remaining)
+
+
+def _back_off(method: str, path: str, headers):
+    waited = _BUCKET.pause(retry_after_seconds(headers))
+    metrics.incr("fd.ratelimit.429")
+    log.warning("FD %s %s rate limited; retrying in %.1fs", method, path, waited)
+
+
+def _should_retry(method: str, path: str, r, attempt: int) -> bool:
+    # Shared by _request and _arequest: only sending and waiting differ.
+    headers = getattr(r, "headers", None) or {}
+    _note_limits(headers)
+    if r.status_code != 429 or attempt == FD_MAX_RETRIES:
+        return False
+    _back_off(method, path, headers)
+    return True
+
+
+def _request(method: str, path: str, priority: str = LOW, **kwargs):
     url = f"https://{FRESHDESK_DOMAIN}.freshdesk.com{path}"
-    r = _session.get(url, timeout=HTTP_TIMEOUT)
-    if not r.ok:
+    send = _session.get if method == "GET" else _session.post
+    for attempt in range(FD_MAX_RETRIES + 1):
+        if not _BUCKET.acquire(reserve=_reserve_for(priority), timeout=FD_RATE_WAIT):
+            raise _no_budget(method, path)
+        r = send(url, timeout=HTTP_TIMEOUT, **kwargs)
+        if not _should_retry(method, path, r, attempt):
+            return r
+    return r
+
+
+# Requests currently on the wire, keyed by what they fetch. Callers asking
+# for the same thing while it is in flight wait for that result (or error)
+# instead of sending their own copy.
+_INFLIGHT: dict[object, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _single_flight(key, fn, name: str = "fd"):
+    with _INFLIGHT_LOCK:
+        fut = _INFLIGHT.get(key)
+        leader = fut is None
+        if leader:
+            fut = Future()
+            _INFLIGHT[key] = fut
+    if not leader:
+        metrics.incr(f"{name}.coalesced")
+        return fut.result()
+    try:
+        result = fn()
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+
+
+# Last response per path: {"etag", "last_modified", "digest", "data"}. Lets
+# us send conditional requests and hand back the very same parsed object
+# when nothing changed, which downstream caches read as "no change".
+_VALIDATORS: dict[str, dict] = {}
+
+
+def _conditional_headers(path: str) -> dict:
+    prev = _VALIDATORS.get(path)
+    headers = {}
+    if prev and prev.get("etag"):
+        headers["If-None-Match"] = prev["etag"]
+    if prev and prev.get("last_modified"):
+        headers["If-Modified-Since"] = prev["last_modified"]
+    return headers
+
+
+def _accept_get(path: str, r, quiet: bool = False):
+    """Turn a GET response into data, reusing the last payload when unchanged."""
+    prev = _VALIDATORS.get(path)
+    if r.status_code == 304 and prev:
+        metrics.incr("fd.not_modified")
+        return prev["data"]
+    if r.status_code >= 400 and not quiet:
         log.error("❌ FD GET %s -> %s", path, r.text[:800])
     r.raise_for_status()
-    return r.json()
 
+    # Freshdesk rarely sends validators, so fall back to hashing the body.
+    digest = hashlib.blake2b(r.content, digest_size=16).hexdigest()
+    if prev and prev["digest"] == digest:
+        metrics.incr("fd.unchanged_body")
+        data = prev["data"]
+    else:
+        data = r.json()
+    _VALIDATORS[path] = {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "digest": digest,
+        "data": data,
+    }
+    return data
 
-def fd_post(path: str, payload: dict):
-    url = f"https://{FRESHDESK_DOMAIN}.freshdesk.com{path}"
-    r = _session.post(url, json=payload, timeout=HTTP_TIMEOUT)
-    if not r.ok:
+
+def _fd_get(path: str, quiet: bool = False):
+    headers = _conditional_headers(path)
+    if headers:
+        r = _request("GET", path, headers=headers)
+    else:
+        r = _request("GET", path)
+    return _accept_get(path, r, quiet)
+
+
+def fd_get(path: str):
+    return _single_flight(("GET", path), lambda: _fd_get(path))
+
+
+def _post_priority(path: str) -> str:
+    # Creating the user's ticket is the one call that must not wait behind metadata.
+    return HIGH if path == "/api/v2/tickets" else LOW
+
+
+def _accept_post(path: str, r):
+    if r.status_code >= 400:
         log.error("❌ FD POST %s -> %s", path, r.text[:800])
     r.raise_for_status()
     return r.json()
 
 
+def fd_post(path: str, payload: dict):
+    return _accept_post(path, _request("POST", path, priority=_post_priority(path), json=payload))
+
+
 # Portal scraping
 
 def _scrape_portal_fields() -> list[dict]:
@@ -147,6 +299,9 @@ def _scrape_portal_fields() -> list[dict]:
         except Exception as e:  # pragma: no cover - best effort
             log.debug("Skipping malformed ticket_form JSON: %s", e)
 
+    # bs4 is only needed on this fallback path; importing it costs ~20ms.
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(resp.text, "html.parser")
     form = soup.find("form", id="portal_ticket_form") or soup.find("form")
     if not form:
@@ -466,6 +621,8 @@ def _scrape_portal_fields() -> list[dict]:
                 fid_key = form_key
             _SCRAPED_FORM_SECTIONS.setdefault(fid_key, {})[key] = list(sec_map.values())
 
+    _save_scraped()
+
     if FD_DEBUG_SCRAPE:
         for parent, secs in _SCRAPED_SECTIONS.items():
             summary = {s["id"]: s.get("fields", []) for s in secs}
@@ -478,8 +635,10 @@ def _scrape_portal_fields() -> list[dict]:
 
 
 # Cached helpers 
-_FORMS_CACHE: dict[str, object] = {"expires": 0, "data": []}
-_FIELDS_CACHE: dict[str, object] = {"expires": 0, "data": []}
+_FORMS_CACHE: dict[str, object] = {"expires": 0, "data": [], "fetched_at": 0, "retry_at": 0}
+_FIELDS_CACHE: dict[str, object] = {"expires": 0, "data": [], "fetched_at": 0, "retry_at": 0}
+# After a failed background refresh, wait this long before trying again.
+_CATALOG_RETRY_DELAY = 30
 _SCRAPED_SECTIONS: dict[int, list] = {}
 # ``_SCRAPED_FORM_FIELDS`` stores the ordered list of field IDs for a given
 # form while ``_SCRAPED_FORM_SECTIONS`` maps a form id to its conditional
@@ -489,57 +648,216 @@ _SCRAPED_SECTIONS: dict[int, list] = {}
 _SCRAPED_FORM_FIELDS: dict[int, list] = {}
 _SCRAPED_FORM_SECTIONS: dict[int, dict[int, list]] = {}
 
-# Attempt to warm the fields cache from the bundled JSON snapshot. If the
-# file exists we load it as a starting point but still refresh from the live
-# API on first use so that updates in Freshdesk are reflected in the question
-# flow. Missing or malformed files simply fall back to the live API.
+# The bundled JSON snapshot can warm the fields cache as a starting point;
+# it is still refreshed from the live API on first use so that updates in
+# Freshdesk are reflected in the question flow. Missing or malformed files
+# simply fall back to the live API. ``load_snapshot`` reads it at startup.
 _FIELDS_FILE = Path(__file__).resolve().parent.parent / "ticket_fields.json"
-if _FIELDS_FILE.exists():
+
+
+def _load_bundled_fields():
+    if not _FIELDS_FILE.exists():
+        return
     try:
         with _FIELDS_FILE.open("r", encoding="utf-8") as fh:
             _FIELDS_CACHE["data"] = json.load(fh)
-            # expire immediately so fresh data is fetched on first access
+            # expire immediately so fresh data is fetched on first access;
+            # the file's age decides whether it may be served meanwhile
             _FIELDS_CACHE["expires"] = 0
+            _FIELDS_CACHE["fetched_at"] = _FIELDS_FILE.stat().st_mtime
             log.info("Loaded %d ticket fields from %s", len(_FIELDS_CACHE["data"]), _FIELDS_FILE)
     except Exception as e:  # pragma: no cover - best effort only
         log.warning("Failed to load %s: %s", _FIELDS_FILE, e)
 
 
-def get_ticket_forms_cached(ttl: int = 300):
-    now = time.time()
-    if now >= _FORMS_CACHE["expires"]:
-        _FORMS_CACHE["data"] = fd_get("/api/v2/ticket-forms")
-        _FORMS_CACHE["expires"] = now + ttl
-    return _FORMS_CACHE["data"]
+# Callbacks run after the forms or fields catalog comes back different from
+# what we had. ``_CATALOG_VERSION`` bumps at the same time so anything built
+# from the catalog can tell whether it is current.
+_REFRESH_HOOKS: list = []
+_CATALOG_VERSION = 0
 
 
-def get_ticket_fields_cached(ttl: int = 300):
-    now = time.time()
-    if now >= _FIELDS_CACHE["expires"]:
+def on_catalog_refresh(callback):
+    """Register ``callback(kind)`` to run when ``"forms"`` or ``"fields"`` change."""
+    if callback not in _REFRESH_HOOKS:
+        _REFRESH_HOOKS.append(callback)
+    return callback
+
+
+def catalog_version() -> int:
+    return _CATALOG_VERSION
+
+
+def _catalog_changed(kind: str):
+    global _CATALOG_VERSION
+    _CATALOG_VERSION += 1
+    for hook in list(_REFRESH_HOOKS):
         try:
-            _FIELDS_CACHE["data"] = fd_get("/api/v2/admin/ticket_fields")
+            hook(kind)
         except Exception as e:
-            log.warning("Ticket fields API failed (%s); falling back to portal scrape", e)
-            _FIELDS_CACHE["data"] = _scrape_portal_fields()
-        _FIELDS_CACHE["expires"] = now + ttl
-    return _FIELDS_CACHE["data"]
+            log.warning("Catalog refresh hook %s failed: %s", getattr(hook, "__name__", hook), e)
+
 
+def _serve_catalog(kind: str, cache: dict, refresh):
+    """Return ``cache["data"]``, refreshing it with stale-while-revalidate.
 
-def _prewarm_caches():
-    """Warm Freshdesk caches in the background so first requests are fast."""
+    Fresh data is returned as is. Expired data younger than
+    ``CATALOG_MAX_STALE`` is returned immediately while one background
+    refresh runs; only an empty or too-old cache makes the caller wait.
+    """
+
+    now = time.time()
+    if now < cache["expires"]:
+        return cache["data"]
+    key = f"catalog:{kind}"
+    if cache["data"] and now - cache["fetched_at"] < CATALOG_MAX_STALE:
+        metrics.incr("catalog.stale_served")
+        metrics.incr(f"{kind}.stale_served")
+        if now >= cache["retry_at"] and key not in _INFLIGHT:
+            threading.Thread(target=_background_refresh, args=(kind, cache, key, refresh),
+                             name=BACKGROUND_THREAD, daemon=True).start()
+        return cache["data"]
+    _single_flight(key, refresh, name="catalog")
+    return cache["data"]
+
+
+# Name of the stale-while-revalidate refresh threads, so startup can wait
+# for them before forking (see ``lifecycle.quiesce``).
+BACKGROUND_THREAD = "catalog-refresh"
+
+
+def _background_refresh(kind: str, cache: dict, key, refresh):
     try:
-        get_ticket_forms_cached()
-        get_ticket_fields_cached()
-    except Exception as e:  # pragma: no cover - best effort
-        log.debug("Prewarm failed: %s", e)
+        _single_flight(key, refresh, name="catalog")
+    except Exception as e:
+        cache["retry_at"] = time.time() + _CATALOG_RETRY_DELAY
+        metrics.incr("catalog.refresh_failed")
+        log.warning("Background %s refresh failed (%s); serving stale data", kind, e)
+
 
+def get_ticket_forms_cached(ttl: int = 300):
+    return _serve_catalog("forms", _FORMS_CACHE, lambda: _refresh_forms(ttl))
+
+
+def _refresh_forms(ttl: int):
+    if time.time() < _FORMS_CACHE["expires"]:
+        return  # someone refreshed while we were queueing up
+    old = _FORMS_CACHE["data"]
+    _FORMS_CACHE["data"] = fd_get("/api/v2/ticket-forms")
+    _FORMS_CACHE["fetched_at"] = time.time()
+    _FORMS_CACHE["expires"] = _FORMS_CACHE["fetched_at"] + ttl
+    # fd_get hands back the same object when the payload did not change.
+    if _FORMS_CACHE["data"] is old or _FORMS_CACHE["data"] == old:
+        snapshot.touch("forms", "")
+    else:
+        snapshot.save("forms", "", _FORMS_CACHE["data"])
+        for form_id in _changed_form_ids(old, _FORMS_CACHE["data"]):
+            invalidate_form_detail(form_id)
+        _catalog_changed("forms")
 
-# Kick off prewarming thread immediately on import.
-threading.Thread(target=_prewarm_caches, daemon=True).start()
 
+def _changed_form_ids(old, new) -> set:
+    """Ids of forms that were edited, added or removed between two listings."""
+    before = {f.get("id"): f for f in old or [] if isinstance(f, dict)}
+    after = {f.get("id"): f for f in new or [] if isinstance(f, dict)}
+    return {fid for fid in before.keys() | after.keys()
+            if isinstance(fid, int) and before.get(fid) != after.get(fid)}
 
-def get_form_detail(form_id: int):
-    return fd_get(f"/api/v2/ticket-forms/{form_id}")
+
+def get_ticket_fields_cached(ttl: int = 300):
+    return _serve_catalog("fields", _FIELDS_CACHE, lambda: _refresh_fields(ttl))
+
+
+def _keep_fields(reason: str):
+    # The last good catalog beats a scrape or an empty list: keep serving it
+    # and try again shortly instead of wiping every form.
+    _FIELDS_CACHE["expires"] = time.time() + _CATALOG_RETRY_DELAY
+    metrics.incr("catalog.refresh_failed")
+    log.warning("Ticket fields %s; keeping the previous catalog", reason)
+
+
+def _refresh_fields(ttl: int):
+    if time.time() < _FIELDS_CACHE["expires"]:
+        return  # someone refreshed while we were queueing up
+    old = _FIELDS_CACHE["data"]
+    from_api = True
+    try:
+        data = fd_get("/api/v2/admin/ticket_fields")
+    except Exception as e:
+        if old:
+            _keep_fields(f"API failed ({e})")
+            return
+        log.warning("Ticket fields API failed (%s); falling back to portal scrape", e)
+        data = _scrape_portal_fields()
+        from_api = False
+    if not data and old:
+        _keep_fields("refresh came back empty")
+        return
+    _FIELDS_CACHE["data"] = data
+    _FIELDS_CACHE["fetched_at"] = time.time()
+    _FIELDS_CACHE["expires"] = _FIELDS_CACHE["fetched_at"] + ttl
+    # fd_get hands back the same object when the payload did not change.
+    if _FIELDS_CACHE["data"] is old or _FIELDS_CACHE["data"] == old:
+        if from_api:
+            snapshot.touch("fields", "")
+        return
+    # Only API payloads are worth keeping; a scrape is a degraded view.
+    if from_api:
+        snapshot.save("fields", "", _FIELDS_CACHE["data"])
+    _catalog_changed("fields")
+
+
+# Form details keyed by form id: {"expires", "fetched_at", "retry_at", "data"}.
+# Concurrent misses for the same form share one request through
+# ``_single_flight``; expired details are served stale like the catalog.
+_FORM_DETAIL_CACHE: dict[int, dict] = {}
+_FORM_DETAIL_LOCK = threading.Lock()
+
+
+def get_form_detail(form_id: int, ttl: int | None = None):
+    form_id = int(form_id)
+    ttl = FORM_DETAIL_TTL if ttl is None else ttl
+    now = time.time()
+    with _FORM_DETAIL_LOCK:
+        entry = _FORM_DETAIL_CACHE.get(form_id)
+    if entry and now < entry["expires"]:
+        metrics.incr("form_detail.hit")
+        return entry["data"]
+
+    def _load():
+        metrics.incr("form_detail.miss")
+        return _store_form_detail(form_id, fd_get(f"/api/v2/ticket-forms/{form_id}"), ttl)
+
+    key = ("form_detail", form_id)
+    if entry and now - entry["fetched_at"] < CATALOG_MAX_STALE:
+        metrics.incr("form_detail.stale_served")
+        if now >= entry["retry_at"] and key not in _INFLIGHT:
+            threading.Thread(target=_background_refresh, args=("form detail", entry, key, _load),
+                             name=BACKGROUND_THREAD, daemon=True).start()
+        return entry["data"]
+    return _single_flight(key, _load, name="form_detail")
+
+
+def _cache_form_detail(form_id: int, data, ttl: int):
+    fetched = time.time()
+    with _FORM_DETAIL_LOCK:
+        _FORM_DETAIL_CACHE[form_id] = {"expires": fetched + ttl, "fetched_at": fetched, "retry_at": 0, "data": data}
+    return data
+
+
+def _store_form_detail(form_id: int, data, ttl: int):
+    _cache_form_detail(form_id, data, ttl)
+    snapshot.save("form_detail", form_id, data)
+    return data
+
+
+def invalidate_form_detail(form_id: int | None = None):
+    """Drop one cached form detail, or all of them when ``form_id`` is None."""
+    with _FORM_DETAIL_LOCK:
+        if form_id is None:
+            _FORM_DETAIL_CACHE.clear()
+        else:
+            _FORM_DETAIL_CACHE.pop(int(form_id), None)
 
 
 def get_form_fields_scraped(form_id: int) -> list:
@@ -567,21 +885,27 @@ def get_sections_scraped(form_id: int) -> dict[int, list]:
     return dict(secs or {})
 
 
-def get_sections(field_id: int):
+def _fetch_sections(field_id: int):
     path = f"/api/v2/admin/ticket_fields/{field_id}/sections"
-    url = f"https://{FRESHDESK_DOMAIN}.freshdesk.com{path}"
     try:
-        r = _session.get(url, timeout=HTTP_TIMEOUT)
-        if r.ok:
-            return r.json() or []
+        return _fd_get(path, quiet=True) or []
+    except Exception as e:
         # Freshdesk returns 400/404/422 when a field has no conditional
         # sections configured. These responses are expected during wizard
         # traversal so we quietly treat them as "no sections" instead of
         # logging noisy errors.
-        log.debug("No sections for field %s (%s)", field_id, r.status_code)
-    except Exception as e:
         log.debug("No sections for field %s (%s)", field_id, e)
+    return None
+
+
+def get_sections(field_id: int):
+    secs = _single_flight(("sections", int(field_id)), lambda: _fetch_sections(field_id))
+    if secs is not None:
+        return secs
+    return _scraped_sections(field_id)
+
 
+def _scraped_sections(field_id: int):
     # Fallback to scraped portal mappings
     fid = int(field_id)
     secs = _SCRAPED_SECTIONS.get(fid)
@@ -600,3 +924,174 @@ def fetch_field_detail(field_id: int) -> dict | None:
     except Exception as e:
         logging.info("No detail for field %s (%s)", field_id, e)
         return None
+
+
+# Async variants for the ASGI entry point. They share the rate-limit
+# bucket, validators and caches above; only the transport differs. One
+# pooled client per event loop keeps connections warm across modals.
+_ACLIENT: dict = {"loop": None, "client": None}
+_AINFLIGHT: dict[object, asyncio.Future] = {}
+
+
+def _async_client() -> httpx.AsyncClient:
+    # Only the ASGI entry point needs httpx, so the WSGI app never imports it.
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    if _ACLIENT["loop"] is not loop:
+        _ACLIENT["loop"] = loop
+        _ACLIENT["client"] = httpx.AsyncClient(
+            base_url=f"https://{FRESHDESK_DOMAIN}.freshdesk.com",
+            auth=(FRESHDESK_API_KEY, "X"),
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _ACLIENT["client"]
+
+
+async def _arequest(method: str, path: str, priority: str = LOW, **kwargs):
+    client = _async_client()
+    for attempt in range(FD_MAX_RETRIES + 1):
+        if not await _BUCKET.wait(reserve=_reserve_for(priority), timeout=FD_RATE_WAIT):
+            raise _no_budget(method, path)
+        r = await client.request(method, path, **kwargs)
+        if not _should_retry(method, path, r, attempt):
+            return r
+    return r
+
+
+async def _asingle_flight(key, coro_fn, name: str = "fd"):
+    fut = _AINFLIGHT.get(key)
+    if fut is not None:
+        metrics.incr(f"{name}.coalesced")
+        return await asyncio.shield(fut)
+    fut = _AINFLIGHT[key] = asyncio.get_running_loop().create_future()
+    try:
+        result = await coro_fn()
+    except BaseException as e:
+        fut.set_exception(e)
+        fut.exception()  # mark retrieved when nobody else was waiting
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        _AINFLIGHT.pop(key, None)
+
+
+async def _afd_get(path: str, quiet: bool = False):
+    r = await _arequest("GET", path, headers=_conditional_headers(path))
+    return _accept_get(path, r, quiet)
+
+
+async def afd_get(path: str):
+    return await _asingle_flight(("GET", path), lambda: _afd_get(path))
+
+
+async def afd_post(path: str, payload: dict):
+    return _accept_post(path, await _arequest("POST", path, priority=_post_priority(path), json=payload))
+
+
+async def aget_form_detail(form_id: int, ttl: int | None = None):
+    form_id = int(form_id)
+    with _FORM_DETAIL_LOCK:
+        entry = _FORM_DETAIL_CACHE.get(form_id)
+    if entry and time.time() - entry["fetched_at"] < CATALOG_MAX_STALE:
+        # Fresh or servable stale: the sync path answers from memory.
+        return get_form_detail(form_id, ttl)
+    ttl = FORM_DETAIL_TTL if ttl is None else ttl
+
+    async def _load():
+        metrics.incr("form_detail.miss")
+        data = _cache_form_detail(form_id, await afd_get(f"/api/v2/ticket-forms/{form_id}"), ttl)
+        # SQLite commits (and the snapshot lock the warm-up holds) stay off the loop.
+        await asyncio.to_thread(snapshot.save, "form_detail", form_id, data)
+        return data
+
+    return await _asingle_flight(("form_detail", form_id), _load, name="form_detail")
+
+
+async def _afetch_sections(field_id: int):
+    path = f"/api/v2/admin/ticket_fields/{field_id}/sections"
+    try:
+        return await _afd_get(path, quiet=True) or []
+    except Exception as e:
+        log.debug("No sections for field %s (%s)", field_id, e)
+    return None
+
+
+async def aget_sections(field_id: int):
+    secs = await _asingle_flight(("sections", int(field_id)), lambda: _afetch_sections(field_id))
+    if secs is not None:
+        return secs
+    # Scraping is a one-off blocking page load; keep it off the loop.
+    return await asyncio.to_thread(_scraped_sections, field_id)
+
+
+async def afetch_field_detail(field_id: int) -> dict | None:
+    try:
+        return await afd_get(f"/api/v2/admin/ticket_fields/{field_id}")
+    except Exception as e:
+        logging.info("No detail for field %s (%s)", field_id, e)
+        return None
+
+
+def _after_fork():
+    # A forked worker must not reuse the parent's sockets or wait on calls
+    # (and locks) that belonged to the parent's threads.
+    global _session, _INFLIGHT_LOCK, _FORM_DETAIL_LOCK
+    _session = _new_session()
+    _ACLIENT.update(loop=None, client=None)
+    _INFLIGHT.clear()
+    _AINFLIGHT.clear()
+    _INFLIGHT_LOCK = threading.Lock()
+    _FORM_DETAIL_LOCK = threading.Lock()
+    _BUCKET._after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _save_scraped():
+    snapshot.save_many("scraped", {
+        "form_fields": _SCRAPED_FORM_FIELDS,
+        "form_sections": {k: {str(p): v for p, v in secs.items()} for k, secs in _SCRAPED_FORM_SECTIONS.items()},
+        "sections": _SCRAPED_SECTIONS,
+    })
+
+
+def _int_key(k):
+    try:
+        return int(k)
+    except (TypeError, ValueError):
+        return k
+
+
+def load_snapshot():
+    """Seed the in-memory caches from the bundled fields file and the on-disk
+    catalog snapshot. Called once at startup (see ``logic.lifecycle``).
+
+    Everything loaded counts as expired, so it is served stale (within
+    ``CATALOG_MAX_STALE``) while the normal refresh revalidates it.
+    """
+
+    _load_bundled_fields()
+    for kind, cache in (("forms", _FORMS_CACHE), ("fields", _FIELDS_CACHE)):
+        saved = snapshot.load(kind).get("")
+        if saved and saved[0] > cache["fetched_at"]:
+            cache["fetched_at"], cache["data"] = saved
+            cache["expires"] = 0
+    for key, (saved_at, data) in snapshot.load("form_detail").items():
+        _FORM_DETAIL_CACHE[int(key)] = {"expires": 0, "fetched_at": saved_at, "retry_at": 0, "data": data}
+    scraped = snapshot.load("scraped")
+    if "form_fields" in scraped:
+        _SCRAPED_FORM_FIELDS.update({_int_key(k): v for k, v in scraped["form_fields"][1].items()})
+    if "form_sections" in scraped:
+        for k, secs in scraped["form_sections"][1].items():
+            _SCRAPED_FORM_SECTIONS[_int_key(k)] = {_int_key(p): v for p, v in secs.items()}
+    if "sections" in scraped:
+        _SCRAPED_SECTIONS.update({_int_key(k): v for k, v in scraped["sections"][1].items()})
+    log.info(
+        "Catalog snapshot: %d forms, %d fields, %d form details",
+        len(_FORMS_CACHE["data"]), len(_FIELDS_CACHE["data"]), len(_FORM_DETAIL_CACHE),
+    )
@@ -0,0 +1,43 @@
+import os, threading
+
+# Process-wide counters and gauges; cheap enough to bump on every cache hit.
+_LOCK = threading.Lock()
+_COUNTERS: dict[str, float] = {}
+_GAUGES: dict[str, float] = {}
+
+
+def _after_fork():
+    # Counts carry over to the worker; a lock held by a parent thread does not.
+    global _LOCK
+    _LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def incr(name: str, n: float = 1):
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + n
+
+
+def gauge(name: str, value: float):
+    with _LOCK:
+        _GAUGES[name] = value
+
+
+def get(name: str, default: float = 0):
+    with _LOCK:
+        if name in _COUNTERS:
+            return _COUNTERS[name]
+        return _GAUGES.get(name, default)
+
+
+def snapshot() -> dict:
+    with _LOCK:
+        return {"counters": dict(_COUNTERS), "gauges": dict(_GAUGES)}
+
+
+def reset():
+    with _LOCK:
+        _COUNTERS.clear()
+        _GAUGES.clear()
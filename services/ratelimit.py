@@ -0,0 +1,114 @@
+import asyncio, random, threading, time
+
+
+class TokenBucket:
+    """Client-side mirror of a per-minute API budget.
+
+    Tokens refill continuously at ``per_minute / 60`` per second. Callers
+    that pass ``reserve`` only take a token while more than that many are
+    left, so low-priority traffic cannot drain the share kept for urgent
+    calls. ``observe`` re-seeds the bucket from the server's own count and
+    ``pause`` stops everyone until a ``Retry-After`` has passed.
+    """
+
+    def __init__(self, per_minute: float, name: str = ""):
+        self.name = name
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._blocked_until = 0.0
+        self._probe = False
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _take(self, reserve: float, now: float) -> float:
+        """Take a token if allowed; otherwise return how long to wait."""
+        self._refill(now)
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._probe:
+            # The server's window has reset; one call re-seeds us from its headers.
+            self._probe = False
+            self.tokens = max(0.0, self.tokens - 1)
+            return 0.0
+        if self.tokens >= 1 + reserve:
+            self.tokens -= 1
+            return 0.0
+        return (1 + reserve - self.tokens) / self.rate if self.rate > 0 else 1.0
+
+    def try_acquire(self, reserve: float = 0.0) -> float:
+        """Non-blocking acquire for event-loop callers: 0.0 on success, else seconds to wait."""
+        with self._cond:
+            return self._take(reserve, time.monotonic())
+
+    def acquire(self, reserve: float = 0.0, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = self._take(reserve, now)
+                if wait <= 0:
+                    return True
+                if deadline is not None and now + wait > deadline:
+                    return False
+                self._cond.wait(wait)
+
+    async def wait(self, reserve: float = 0.0, timeout: float | None = None) -> bool:
+        """``acquire`` for coroutines: sleeps on the event loop instead of a lock."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(reserve)
+            if wait <= 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def observe(self, remaining: int | None = None, total: int | None = None):
+        with self._cond:
+            self._refill(time.monotonic())
+            if total and total > 0 and total != self.capacity:
+                self.capacity = float(total)
+                self.rate = self.capacity / 60.0
+            if remaining is not None:
+                # The server's count covers every process sharing the key.
+                self.tokens = min(self.capacity, float(remaining))
+            self._cond.notify_all()
+
+    def pause(self, seconds: float, jitter: float = 1.0) -> float:
+        """Block the bucket for ``seconds`` plus up to ``jitter`` random seconds."""
+        wait = max(0.0, seconds) + random.uniform(0, jitter)
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + wait)
+            self._probe = True
+            self._cond.notify_all()
+        return wait
+
+    def _after_fork(self):
+        # The parent's condition may have been held by one of its threads.
+        self._cond = threading.Condition()
+
+    def available(self) -> float:
+        with self._cond:
+            self._refill(time.monotonic())
+            return self.tokens
+
+
+def retry_after_seconds(headers, default: float = 1.0) -> float:
+    raw = (headers or {}).get("Retry-After")
+    try:
+        return max(0.0, float(raw))
+    except (TypeError, ValueError):
+        return default
+
+
+def int_header(headers, name: str) -> int | None:
+    raw = (headers or {}).get(name)
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,118 @@
+"""Just enough of the Redis protocol (RESP2) for the session store.
+
+One socket per client, guarded by a lock; a dropped connection is
+reopened once per command. Pipelining sends several commands in one
+write and reads their replies in order.
+"""
+import socket, threading
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    pass
+
+
+def _encode(*args) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for a in args:
+        if not isinstance(a, bytes):
+            a = str(a).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(a), a))
+    return b"".join(out)
+
+
+class RespClient:
+    def __init__(self, url: str, timeout: float = 2.0):
+        u = urlparse(url)
+        self.host = u.hostname or "localhost"
+        self.port = u.port or 6379
+        self.password = u.password
+        self.db = int((u.path or "/0").strip("/") or 0)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: socket.socket | None = None
+        self._buf = b""
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock, self._buf = sock, b""
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        try:
+            if setup:
+                self._send_all(setup)
+        except BaseException:
+            # Keep only a socket whose handshake went through; the next
+            # command reconnects instead of running unauthenticated.
+            self._sock = None
+            sock.close()
+            raise
+
+    def close(self):
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+            self._sock = None
+
+    def _readline(self) -> bytes:
+        while b"\r\n" not in self._buf:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("Redis closed the connection")
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\r\n", 1)
+        return line
+
+    def _readexact(self, n: int) -> bytes:
+        while len(self._buf) < n + 2:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("Redis closed the connection")
+            self._buf += chunk
+        data, self._buf = self._buf[:n], self._buf[n + 2:]
+        return data
+
+    def _reply(self):
+        line = self._readline()
+        kind, rest = line[:1], line[1:]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            return RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            n = int(rest)
+            return None if n < 0 else self._readexact(n)
+        if kind == b"*":
+            n = int(rest)
+            return None if n < 0 else [self._reply() for _ in range(n)]
+        raise RespError(f"Unexpected reply {line[:40]!r}")
+
+    def _send_all(self, commands):
+        self._sock.sendall(b"".join(_encode(*c) for c in commands))
+        replies = [self._reply() for _ in commands]
+        for r in replies:
+            if isinstance(r, RespError):
+                raise r
+        return replies
+
+    def pipeline(self, *commands):
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send_all(commands)
+                except (OSError, ConnectionError):
+                    if self._sock is not None:
+                        self._sock.close()
+                    self._sock = None
+                    if attempt:
+                        raise
+
+    def execute(self, *args):
+        return self.pipeline(args)[0]
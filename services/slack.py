@@ -1,25 +1,178 @@
+import os
+import time
+import asyncio
 import requests
 import logging
+import threading
+import itertools
 from requests.adapters import HTTPAdapter
-from config import SLACK_BOT_TOKEN, HTTP_TIMEOUT
+from config import SLACK_BOT_TOKEN, HTTP_TIMEOUT, SLACK_RATE_WAIT, SLACK_MAX_RETRIES
+from services import metrics
+from services.ratelimit import TokenBucket, retry_after_seconds
 
 log = logging.getLogger(__name__)
 
 # Reusing one session so Slack isn't opening a new connection each time.
-_session = requests.Session()
-_session.headers.update({"Authorization": f"Bearer {SLACK_BOT_TOKEN}", "Content-Type": "application/json"})
-_session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
-
-
-def slack_api(method: str, payload: dict):
-    # My thin wrapper around Slack's API; keeps things consistent.
-    r = _session.post(
-        f"https://slack.com/api/{method}",
-        json=payload,
-        timeout=HTTP_TIMEOUT
-    )
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update({"Authorization": f"Bearer {SLACK_BOT_TOKEN}", "Content-Type": "application/json"})
+    session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
+    return session
+
+
+_session = _new_session()
+
+# Slack's published per-minute floors for each tier, and the methods we use.
+# chat.postMessage is "special" (about one per second per channel).
+TIER_PER_MINUTE = {1: 1, 2: 20, 3: 50, 4: 100, "special": 60}
+METHOD_TIERS = {
+    "views.open": 4,
+    "views.update": 4,
+    "views.push": 4,
+    "users.info": 4,
+    "users.profile.get": 4,
+    "conversations.open": 3,
+    "chat.postMessage": "special",
+}
+_BUCKETS: dict[str, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+# A trigger_id is only valid for 3 seconds, so these methods give up on the
+# rate limit well before that instead of waiting SLACK_RATE_WAIT to fail.
+TRIGGER_WAIT = 2.0
+_TRIGGER_METHODS = {"views.open", "views.push"}
+
+# Latest call number per (method, supersede key). A queued call that is no
+# longer the latest for its key is dropped instead of sent.
+_GENERATIONS: dict[tuple, int] = {}
+_GEN_LOCK = threading.Lock()
+_GEN_COUNTER = itertools.count(1)
+
+
+def _bucket_for(method: str) -> TokenBucket:
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(method)
+        if bucket is None:
+            tier = METHOD_TIERS.get(method, 3)
+            bucket = _BUCKETS[method] = TokenBucket(TIER_PER_MINUTE[tier], name=method)
+        return bucket
+
+
+def _next_generation(key: tuple) -> int:
+    with _GEN_LOCK:
+        gen = _GENERATIONS[key] = next(_GEN_COUNTER)
+        return gen
+
+
+def _superseded(key: tuple | None, gen: int) -> bool:
+    if key is None:
+        return False
+    with _GEN_LOCK:
+        return _GENERATIONS.get(key) != gen
+
+
+def _release_generation(key: tuple | None, gen: int):
+    # Forget finished keys so one entry per view doesn't pile up forever.
+    if key is None:
+        return
+    with _GEN_LOCK:
+        if _GENERATIONS.get(key) == gen:
+            del _GENERATIONS[key]
+
+
+def _deadline(method: str) -> float | None:
+    return time.monotonic() + TRIGGER_WAIT if method in _TRIGGER_METHODS else None
+
+
+def _wait_left(deadline: float | None) -> float:
+    return SLACK_RATE_WAIT if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def _retry_in_time(deadline: float | None, waited: float) -> bool:
+    return deadline is None or time.monotonic() + waited < deadline
+
+
+def slack_api(method: str, payload: dict, supersede: str | None = None):
+    """Call a Slack Web API method within its tier's rate limit.
+
+    Calls wait for a token from the method's bucket and a 429 (or an
+    ``ratelimited`` error) pauses that bucket for ``Retry-After`` before
+    retrying. With ``supersede`` set, usually the ``view_id`` of a
+    ``views.update``, a call that a newer one with the same key overtook
+    while it was waiting is dropped and returns ``None``.
+    """
+    bucket = _bucket_for(method)
+    key = (method, supersede) if supersede is not None else None
+    gen = _next_generation(key) if key else 0
+    try:
+        return _call(method, payload, bucket, key, gen)
+    finally:
+        _release_generation(key, gen)
+
+
+# Pieces shared by _call and aslack_api; only sending and waiting differ.
+
+def _no_budget(method: str) -> RuntimeError:
+    metrics.incr("slack.ratelimit.timeout")
+    return RuntimeError({"ok": False, "error": "ratelimited", "method": method})
+
+
+def _dropped(method: str, key: tuple | None, gen: int) -> bool:
+    if not _superseded(key, gen):
+        return False
+    metrics.incr("slack.superseded")
+    log.debug("Slack %s for %s superseded; dropping", method, key[1])
+    return True
+
+
+def _parse(r) -> tuple[dict | None, bool]:
+    """``(data, rate_limited)`` for a response; data is None for an HTTP 429."""
+    if r.status_code == 429:
+        return None, True
     r.raise_for_status()
     data = r.json()
+    return data, data.get("error") == "ratelimited"
+
+
+def _should_retry(method: str, bucket: TokenBucket, r, limited: bool, attempt: int,
+                  deadline: float | None) -> bool:
+    if not limited or attempt >= SLACK_MAX_RETRIES:
+        return False
+    waited = bucket.pause(retry_after_seconds(getattr(r, "headers", None)))
+    metrics.incr("slack.ratelimit.429")
+    if _retry_in_time(deadline, waited):
+        log.warning("Slack %s rate limited; retrying in %.1fs", method, waited)
+        return True
+    log.warning("Slack %s rate limited past its trigger_id; giving up", method)
+    return False
+
+
+def _finish(method: str, r, data: dict | None):
+    if data is None:
+        r.raise_for_status()
+    return _result(method, data)
+
+
+def _call(method: str, payload: dict, bucket: TokenBucket, key: tuple | None, gen: int):
+    deadline = _deadline(method)
+    for attempt in range(SLACK_MAX_RETRIES + 1):
+        if not bucket.acquire(timeout=_wait_left(deadline)):
+            raise _no_budget(method)
+        if _dropped(method, key, gen):
+            return None
+        # My thin wrapper around Slack's API; keeps things consistent.
+        r = _session.post(
+            f"https://slack.com/api/{method}",
+            json=payload,
+            timeout=HTTP_TIMEOUT
+        )
+        data, limited = _parse(r)
+        if not _should_retry(method, bucket, r, limited, attempt, deadline):
+            break
+    return _finish(method, r, data)
+
+
+def _result(method: str, data: dict):
     if not data.get("ok"):
         if data.get("error") == "hash_conflict":
             # Another process updated the view; caller will retry without hash.
@@ -30,6 +183,63 @@ def slack_api(method: str, payload: dict):
     return data
 
 
+# Pooled client for the asyncio entry point; rebuilt if the loop changes.
+_ACLIENT: dict = {"loop": None, "client": None}
+
+
+def _async_client() -> "httpx.AsyncClient":
+    # Imported here so only the ASGI entry point pays for httpx.
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    if _ACLIENT["loop"] is not loop:
+        _ACLIENT["loop"] = loop
+        _ACLIENT["client"] = httpx.AsyncClient(
+            base_url="https://slack.com/api/",
+            headers=dict(_session.headers),
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _ACLIENT["client"]
+
+
+async def aslack_api(method: str, payload: dict, supersede: str | None = None):
+    """Coroutine version of ``slack_api`` sharing its buckets and supersede keys."""
+    bucket = _bucket_for(method)
+    key = (method, supersede) if supersede is not None else None
+    gen = _next_generation(key) if key else 0
+    try:
+        client = _async_client()
+        deadline = _deadline(method)
+        for attempt in range(SLACK_MAX_RETRIES + 1):
+            if not await bucket.wait(timeout=_wait_left(deadline)):
+                raise _no_budget(method)
+            if _dropped(method, key, gen):
+                return None
+            r = await client.post(method, json=payload)
+            data, limited = _parse(r)
+            if not _should_retry(method, bucket, r, limited, attempt, deadline):
+                break
+        return _finish(method, r, data)
+    finally:
+        _release_generation(key, gen)
+
+
+def _after_fork():
+    # Each forked worker gets its own connections and unheld locks.
+    global _session, _BUCKETS_LOCK, _GEN_LOCK
+    _session = _new_session()
+    _ACLIENT.update(loop=None, client=None)
+    _BUCKETS_LOCK = threading.Lock()
+    _GEN_LOCK = threading.Lock()
+    _GENERATIONS.clear()
+    for bucket in _BUCKETS.values():
+        bucket._after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
 _EMAIL_CACHE: dict[str, str] = {}
 
 
@@ -48,31 +258,60 @@ def get_user_email(user_id: str) -> str | None:
         return cached
 
     try:
-        info = slack_api("users.info", {"user": user_id})
-        email = ((info.get("user") or {}).get("profile") or {}).get("email")
+        email = _email_from_info(slack_api("users.info", {"user": user_id}))
         if email:
             _EMAIL_CACHE[user_id] = email
             return email
     except Exception as e:
         log.debug("Slack users.info error: %s", e)
     try:
-        profile = slack_api("users.profile.get", {"user": user_id})
-        data = profile.get("profile") or {}
-        email = data.get("email")
+        email = _email_from_profile(slack_api("users.profile.get", {"user": user_id}))
         if email:
             _EMAIL_CACHE[user_id] = email
-            return email
-        # Fall back to custom profile fields. Many workspaces store the real
-        # email address in a "Contact Information" field instead of the
-        # standard ``profile.email`` attribute.
-        fields = data.get("fields") or {}
-        for field in fields.values():
-            label = (field.get("label") or "").lower()
-            value = field.get("value") or ""
-            if value and "email" in label and "@" in value:
-                _EMAIL_CACHE[user_id] = value
-                return value
+        return email
+    except Exception as e:
+        log.warning("Could not fetch email for %s: %s", user_id, e)
         return None
+
+
+async def aget_user_email(user_id: str) -> str | None:
+    """Coroutine version of :func:`get_user_email` sharing its cache."""
+    cached = _EMAIL_CACHE.get(user_id)
+    if cached:
+        return cached
+    try:
+        email = _email_from_info(await aslack_api("users.info", {"user": user_id}))
+        if email:
+            _EMAIL_CACHE[user_id] = email
+            return email
+    except Exception as e:
+        log.debug("Slack users.info error: %s", e)
+    try:
+        email = _email_from_profile(await aslack_api("users.profile.get", {"user": user_id}))
+        if email:
+            _EMAIL_CACHE[user_id] = email
+        return email
     except Exception as e:
         log.warning("Could not fetch email for %s: %s", user_id, e)
         return None
+
+
+def _email_from_info(info: dict) -> str | None:
+    return ((info.get("user") or {}).get("profile") or {}).get("email")
+
+
+def _email_from_profile(profile: dict) -> str | None:
+    data = profile.get("profile") or {}
+    email = data.get("email")
+    if email:
+        return email
+    # Fall back to custom profile fields. Many workspaces store the real
+    # email address in a "Contact Information" field instead of the
+    # standard ``profile.email`` attribute.
+    fields = data.get("fields") or {}
+    for field in fields.values():
+        label = (field.get("label") or "").lower()
+        value = field.get("value") or ""
+        if value and "email" in label and "@" in value:
+            return value
+    return None
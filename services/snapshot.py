@@ -0,0 +1,115 @@
+"""Local SQLite copy of the Freshdesk catalog so restarts come up warm.
+
+Every successful refresh writes its payload here as JSON, keyed by
+``(kind, key)``. At startup ``logic.lifecycle.load_snapshots`` reads it back
+into the caches (``freshdesk.load_snapshot`` and
+``branching.load_sections_snapshot``), which then revalidate like any
+other stale entry. The schema version lives in
+``PRAGMA user_version`` and a mismatch simply starts a fresh file.
+"""
+import os, json, logging, sqlite3, threading, time
+from pathlib import Path
+from config import SNAPSHOT_PATH
+
+log = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_LOCK = threading.Lock()
+_CONN: sqlite3.Connection | None = None
+_PATH = SNAPSHOT_PATH
+
+
+def _connect() -> sqlite3.Connection | None:
+    global _CONN
+    if _CONN is not None or not _PATH:
+        return _CONN
+    try:
+        Path(_PATH).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(_PATH, timeout=5, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS snapshot")
+            conn.execute(
+                "CREATE TABLE snapshot (kind TEXT NOT NULL, key TEXT NOT NULL, saved_at REAL NOT NULL,"
+                " payload TEXT NOT NULL, PRIMARY KEY (kind, key))"
+            )
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        _CONN = conn
+    except Exception as e:
+        log.warning("Catalog snapshot unavailable at %s: %s", _PATH, e)
+        _CONN = None
+    return _CONN
+
+
+def _after_fork():
+    # SQLite connections must not cross a fork; the child reopens on first use.
+    global _CONN, _LOCK
+    _CONN = None
+    _LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def set_path(path: str | None):
+    """Point the store at another file (or disable it with ``None``)."""
+    global _CONN, _PATH
+    with _LOCK:
+        if _CONN is not None:
+            _CONN.close()
+        _CONN = None
+        _PATH = path
+
+
+def save(kind: str, key, data):
+    save_many(kind, {key: data})
+
+
+def save_many(kind: str, items: dict):
+    if not items:
+        return
+    try:
+        now = time.time()
+        rows = [(kind, str(k), now, json.dumps(v, separators=(",", ":"))) for k, v in items.items()]
+        with _LOCK:
+            conn = _connect()
+            if conn is None:
+                return
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO snapshot VALUES (?, ?, ?, ?)", rows)
+                conn.execute("COMMIT")
+            except Exception:
+                # Leave the shared connection usable for the next write.
+                conn.execute("ROLLBACK")
+                raise
+    except Exception as e:
+        log.warning("Could not save %s snapshot: %s", kind, e)
+
+
+def touch(kind: str, key):
+    """Mark an entry as revalidated without rewriting its payload."""
+    try:
+        with _LOCK:
+            conn = _connect()
+            if conn is None:
+                return
+            conn.execute("UPDATE snapshot SET saved_at = ? WHERE kind = ? AND key = ?", (time.time(), kind, str(key)))
+    except Exception as e:
+        log.warning("Could not touch %s snapshot: %s", kind, e)
+
+
+def load(kind: str) -> dict[str, tuple[float, object]]:
+    """Return ``{key: (saved_at, data)}`` for every saved entry of ``kind``."""
+    try:
+        with _LOCK:
+            conn = _connect()
+            if conn is None:
+                return {}
+            rows = conn.execute("SELECT key, saved_at, payload FROM snapshot WHERE kind = ?", (kind,)).fetchall()
+        return {key: (saved_at, json.loads(payload)) for key, saved_at, payload in rows}
+    except Exception as e:
+        log.warning("Could not load %s snapshot: %s", kind, e)
+        return {}
@@ -0,0 +1,4 @@
+import os, tempfile
+
+# Keep the catalog snapshot out of the working tree while tests run.
+os.environ.setdefault("SNAPSHOT_PATH", os.path.join(tempfile.mkdtemp(prefix="fd-snapshot-"), "catalog.sqlite3"))
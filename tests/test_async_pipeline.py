@@ -0,0 +1,187 @@
+import sys, pathlib, asyncio, json, threading
+from urllib.parse import urlencode
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import httpx
+import asgi
+from services import freshdesk
+from logic import wizard, branching
+
+
+def test_afd_get_coalesces_and_reuses_unchanged_body(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json={"id": 1})
+
+    async def run():
+        freshdesk._ACLIENT["loop"] = asyncio.get_running_loop()
+        freshdesk._ACLIENT["client"] = httpx.AsyncClient(
+            base_url="https://x.freshdesk.com", transport=httpx.MockTransport(handler))
+        first, second = await asyncio.gather(freshdesk.afd_get("/api/v2/async-x"), freshdesk.afd_get("/api/v2/async-x"))
+        third = await freshdesk.afd_get("/api/v2/async-x")
+        return first, second, third
+
+    freshdesk._VALIDATORS.pop("/api/v2/async-x", None)
+    first, second, third = asyncio.run(run())
+    assert calls == ["/api/v2/async-x", "/api/v2/async-x"]
+    assert first is second is third
+
+
+def test_async_wizard_fans_out_section_levels(monkeypatch):
+    wizard.clear_form_plans()
+    fields = [
+        {"id": 1, "name": "a", "type": "custom_dropdown", "choices": [{"value": "x", "label": "X"}]},
+        {"id": 2, "name": "b", "type": "custom_dropdown", "choices": [{"value": "x", "label": "X"}]},
+        {"id": 3, "name": "c", "type": "custom_text"},
+        {"id": 4, "name": "d", "type": "custom_text"},
+    ]
+    sections = {1: [{"id": 10, "choices": [{"value": "x"}], "fields": [3]}],
+                2: [{"id": 20, "choices": [{"value": "x"}], "fields": [4]}]}
+    active, peak, pushed = [0], [0], []
+
+    async def fake_sections(fid):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.02)
+        active[0] -= 1
+        return sections.get(fid, [])
+
+    async def fake_detail(fid):
+        return {"fields": [1, 2]}
+
+    async def fake_slack(method, payload, supersede=None):
+        pushed.append(payload["view"])
+        return {"ok": True}
+
+    for fid in (1, 2, 3, 4):
+        branching.SECTIONS_CACHE.pop(fid, None)
+    monkeypatch.setattr(branching, "aget_sections", fake_sections)
+    monkeypatch.setattr(branching.snapshot, "save", lambda *a: None)
+    monkeypatch.setattr(wizard, "aget_form_detail", fake_detail)
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1, 2]})
+    monkeypatch.setattr(wizard, "aslack_api", fake_slack)
+    monkeypatch.setattr(wizard, "get_ticket_forms_cached", lambda: [{"id": 9}])
+    monkeypatch.setattr(wizard, "get_ticket_fields_cached", lambda: fields)
+
+    asyncio.run(wizard.aopen_wizard_first_page("vid", 9, None))
+    assert peak[0] == 2
+    assert branching.SECTIONS_CACHE[1] == sections[1]
+    assert pushed and pushed[0]["callback_id"] == "wizard_page"
+
+
+def test_asgi_acks_pick_form_without_selection():
+    sent = []
+    body = urlencode({"payload": json.dumps({"type": "view_submission", "view": {"callback_id": "pick_form"}})})
+
+    async def receive():
+        return {"type": "http.request", "body": body.encode(), "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/interactions"}
+    asyncio.run(asgi.app(scope, receive, send))
+    assert sent[0]["status"] == 200
+    assert json.loads(sent[1]["body"])["response_action"] == "errors"
+
+
+def test_async_wizard_update_keeps_blocking_work_off_the_loop(monkeypatch):
+    threads = {}
+
+    def fake_load(token, meta):
+        threads["load"] = threading.current_thread()
+        return {"ticket_form_id": 9, "page": 0, "values": {}}, True
+
+    def fake_step(token, sess, from_store, form, fd_fields, new_state_values, nav):
+        threads["step"] = threading.current_thread()
+        return {"type": "modal"}
+
+    async def no_prefetch(form, fd_fields):
+        return None
+
+    async def fake_slack(method, payload, supersede=None):
+        return {"ok": True}
+
+    monkeypatch.setattr(wizard, "_load_session", fake_load)
+    monkeypatch.setattr(wizard, "_step_wizard", fake_step)
+    monkeypatch.setattr(wizard, "aprefetch_form", no_prefetch)
+    monkeypatch.setattr(wizard, "aslack_api", fake_slack)
+    monkeypatch.setattr(wizard, "get_ticket_forms_cached", lambda: [{"id": 9}])
+    monkeypatch.setattr(wizard, "get_ticket_fields_cached", lambda: [])
+
+    asyncio.run(wizard.aupdate_wizard("vid", "tok", None, {}, "next"))
+    assert set(threads) == {"load", "step"}
+    assert threading.main_thread() not in threads.values()
+
+
+def test_plan_choice_fields_include_nested_levels():
+    from logic.plan import compile_form_plan
+    level2 = {"id": 21, "name": "model", "type": "nested_field_level", "level": 2}
+    fields = [{"id": 2, "name": "device", "type": "nested_field", "dependent_fields": [level2]}]
+    plan = compile_form_plan(1, ("k",), [2], fields, lambda fid: [])
+    assert {f["id"] for f in plan.choice_fields()} == {2, 21}
+
+
+def test_prefetch_runs_once_per_catalog_with_the_wizard_plan_key(monkeypatch):
+    wizard.clear_form_plans()
+    fields = [{"id": 1, "name": "a", "type": "custom_text"}, {"id": 5, "type": "default_subject", "name": "subject"}]
+    form = {"id": 9}
+    details = []
+
+    async def fake_detail(fid):
+        details.append(fid)
+        return {"fields": [1]}
+
+    async def no_sections(roots, fd_fields):
+        return None
+
+    monkeypatch.setattr(wizard, "aget_form_detail", fake_detail)
+    monkeypatch.setattr(wizard, "aprefetch_sections", no_sections)
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1]})
+    monkeypatch.setattr(wizard, "get_sections_cached", lambda fid: [])
+    monkeypatch.setattr(wizard, "catalog_version", lambda: 3)
+
+    async def run():
+        for _ in range(3):
+            await wizard.aprefetch_form(form, fields)
+
+    asyncio.run(run())
+    assert details == [9]
+    plans = dict(wizard._FORM_PLANS)
+    wizard.get_form_plan(form, wizard.filter_fields_for_form(form, fields))
+    assert wizard._FORM_PLANS == plans
+
+    asyncio.run(wizard.aprefetch_form(form, list(fields)))
+    assert details == [9, 9]
+
+
+def test_async_paths_write_snapshots_off_the_loop(monkeypatch):
+    writes = []
+
+    async def fake_sections(fid):
+        return [{"id": 10, "fields": [fid + 1]}] if fid < 3 else []
+
+    async def fake_afd_get(path):
+        return {"id": 8, "fields": [1]}
+
+    def record(kind, items):
+        writes.append((kind, sorted(items), threading.current_thread() is threading.main_thread()))
+
+    for fid in (1, 2, 3):
+        branching.SECTIONS_CACHE.pop(fid, None)
+    freshdesk.invalidate_form_detail(8)
+    monkeypatch.setattr(branching, "aget_sections", fake_sections)
+    monkeypatch.setattr(freshdesk, "afd_get", fake_afd_get)
+    monkeypatch.setattr(branching.snapshot, "save_many", record)
+
+    async def run():
+        await branching.aprefetch_sections([1], [])
+        await freshdesk.aget_form_detail(8)
+
+    asyncio.run(run())
+    assert writes == [("sections", [1], False), ("sections", [2], False), ("sections", [3], False),
+                      ("form_detail", [8], False)]
+    assert freshdesk._FORM_DETAIL_CACHE[8]["data"] == {"id": 8, "fields": [1]}
@@ -0,0 +1,35 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from logic import mapping
+
+
+def _dropdown(**kw):
+    return {"id": 42, "name": "cf_app", "label": "App", "type": "custom_dropdown", "displayed_to_customers": True,
+            "updated_at": "2024-01-01T00:00:00Z", "choices": ["Excel", "Word"], **kw}
+
+
+def test_blocks_render_once_per_field_version(monkeypatch):
+    mapping.clear_block_cache()
+    calls = []
+    real = mapping.to_slack_block
+    monkeypatch.setattr(mapping, "to_slack_block", lambda f: calls.append(f["id"]) or real(f))
+    field = _dropdown()
+    first, second = mapping.field_blocks(field), mapping.field_blocks(field)
+    assert first == second == mapping.normalize_blocks(real(field))
+    assert calls == [42]
+
+    field["choices"] = ["Excel", "Word", "Teams"]
+    assert len(mapping.field_blocks(field)[0]["element"]["options"]) == 3
+    mapping.field_blocks(dict(field, updated_at="2024-02-01T00:00:00Z"))
+    assert calls == [42, 42, 42]
+
+
+def test_handed_out_blocks_do_not_touch_the_template():
+    mapping.clear_block_cache()
+    field = _dropdown()
+    mine = mapping.field_blocks(field)[0]
+    mine["element"]["initial_option"] = mine["element"]["options"][0]
+    mine["block_id"] = "changed"
+    again = mapping.field_blocks(field)[0]
+    assert "initial_option" not in again["element"] and again["block_id"] == "cf_app"
@@ -0,0 +1,46 @@
+import sys, pathlib, json
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from flask import Flask
+from services import executor
+from services.coalesce import VIEWS
+from routes import core
+
+
+def _client(monkeypatch):
+    pushed = []
+
+    def fake_slack(method, payload, supersede=None):
+        pushed.append((method, payload.get("view_id"), payload["view"]))
+        return {"ok": True, "view": {"id": "V1", "hash": "h"}}
+
+    # Every lane is full.
+    monkeypatch.setattr(executor.EXECUTOR, "submit", lambda *a, **k: None)
+    monkeypatch.setattr(core, "slack_api", fake_slack)
+    app = Flask(__name__)
+    app.register_blueprint(core.bp)
+    return app.test_client(), pushed
+
+
+def test_full_picker_lane_replaces_the_loading_view(monkeypatch):
+    client, pushed = _client(monkeypatch)
+    assert client.post("/it-ticket", data={"trigger_id": "t"}).status_code == 200
+    assert [p[0] for p in pushed] == ["views.open", "views.update"]
+    assert pushed[1][1:] == ("V1", core._BUSY_VIEW)
+
+
+def test_full_nav_lane_keeps_the_picker_open(monkeypatch):
+    client, pushed = _client(monkeypatch)
+    values = {"form_select": {"ticket_form_select": {"selected_option": {"value": "5"}}}}
+    payload = {"type": "view_submission", "view": {"id": "V2", "callback_id": "pick_form", "state": {"values": values}}}
+    resp = client.post("/interactions", data={"payload": json.dumps(payload)})
+    assert resp.get_json() == core._PICK_BUSY
+    assert VIEWS.pending("V2") == 0
+
+
+def test_full_nav_lane_shows_busy_instead_of_a_dead_wizard(monkeypatch):
+    client, pushed = _client(monkeypatch)
+    view = {"id": "V3", "callback_id": "wizard_page", "private_metadata": json.dumps({"wizard_token": "tok"})}
+    payload = {"type": "block_actions", "view": view, "actions": [{"action_id": "wizard_next", "action_ts": "1.0"}]}
+    assert client.post("/interactions", data={"payload": json.dumps(payload)}).status_code == 200
+    assert pushed == [("views.update", "V3", core._BUSY_VIEW)]
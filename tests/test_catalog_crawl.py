@@ -0,0 +1,39 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from logic import warmup, branching
+
+
+def test_crawl_fills_sections_cache(monkeypatch):
+    forms = [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]
+    details = {1: {"fields": [10, 11]}, 2: {"fields": [11, 12]}}
+    sections = {10: [{"id": 100, "fields": [20]}], 20: [{"id": 200, "fields": [30]}]}
+    fetched = []
+
+    monkeypatch.setattr(warmup, "get_ticket_forms_cached", lambda: forms)
+    monkeypatch.setattr(warmup, "filter_portal_forms", lambda fs: fs)
+    monkeypatch.setattr(warmup, "get_ticket_fields_cached", lambda: [
+        {"id": 12, "type": "nested_field", "dependent_fields": [{"id": 13, "level": 2}]},
+    ])
+    monkeypatch.setattr(warmup, "get_form_detail", lambda fid: details[fid])
+
+    def fake_get_sections(fid):
+        fetched.append(fid)
+        return sections.get(fid, [])
+
+    monkeypatch.setattr(branching, "get_sections", fake_get_sections)
+    branching.SECTIONS_CACHE.clear()
+
+    assert warmup.crawl_catalog(concurrency=4)
+    assert sorted(fetched) == [10, 11, 12, 13, 20, 30]
+    assert set(branching.SECTIONS_CACHE) == {10, 11, 12, 13, 20, 30}
+    status = warmup.CRAWL_STATUS
+    assert status["state"] == "done"
+    assert status["forms_done"] == 2 and status["fields_done"] == 6
+    assert status["duration"] is not None
+
+    fetched.clear()
+    warmup.crawl_catalog()
+    assert fetched == []
+    warmup.crawl_catalog(refresh=True)
+    assert sorted(fetched) == [10, 11, 12, 13, 20, 30]
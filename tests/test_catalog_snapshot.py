@@ -0,0 +1,76 @@
+import sqlite3
+from services import freshdesk, snapshot
+from logic import branching
+
+
+def test_snapshot_round_trip_and_schema_reset(tmp_path):
+    path = str(tmp_path / "snap.sqlite3")
+    snapshot.set_path(path)
+    try:
+        snapshot.save("sections", 5, [{"id": 1, "fields": [2]}])
+        snapshot.save_many("form_detail", {7: {"id": 7}, 8: {"id": 8}})
+        assert snapshot.load("sections")["5"][1] == [{"id": 1, "fields": [2]}]
+        assert set(snapshot.load("form_detail")) == {"7", "8"}
+
+        snapshot.set_path(None)
+        with sqlite3.connect(path) as conn:
+            conn.execute("PRAGMA user_version=99")
+        snapshot.set_path(path)
+        assert snapshot.load("sections") == {}
+    finally:
+        snapshot.set_path(None)
+
+
+def test_failed_write_rolls_back_and_later_writes_succeed(tmp_path):
+    path = str(tmp_path / "snap.sqlite3")
+    snapshot.set_path(path)
+    try:
+        snapshot.save("sections", 1, [])
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                "CREATE TRIGGER reject BEFORE INSERT ON snapshot WHEN NEW.key = 'bad'"
+                " BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+            )
+        snapshot.save_many("sections", {2: [], "bad": []})
+        assert set(snapshot.load("sections")) == {"1"}
+        snapshot.save("sections", 3, [])
+        snapshot.touch("sections", 1)
+        assert set(snapshot.load("sections")) == {"1", "3"}
+    finally:
+        snapshot.set_path(None)
+
+
+def test_restart_serves_from_snapshot_then_revalidates(tmp_path, monkeypatch):
+    snapshot.set_path(str(tmp_path / "snap.sqlite3"))
+    try:
+        monkeypatch.setattr(freshdesk, "fd_get", lambda path: [{"id": 1, "name": "Form"}])
+        monkeypatch.setitem(freshdesk._FORMS_CACHE, "expires", 0)
+        monkeypatch.setitem(freshdesk._FORMS_CACHE, "data", [])
+        monkeypatch.setitem(freshdesk._FORMS_CACHE, "fetched_at", 0)
+        freshdesk.get_ticket_forms_cached()
+        monkeypatch.setattr(freshdesk, "fd_get", lambda path: {"id": 1, "fields": [3]})
+        freshdesk.invalidate_form_detail()
+        freshdesk.get_form_detail(1)
+        monkeypatch.setattr(branching, "get_sections", lambda fid: [{"id": 9, "fields": [4]}])
+        branching.SECTIONS_CACHE.clear()
+        branching.get_sections_cached(3)
+
+        # "restart": wipe memory, then load from disk with the network gone
+        def offline(path):
+            raise ConnectionError("offline")
+
+        monkeypatch.setattr(freshdesk, "fd_get", offline)
+        monkeypatch.setitem(freshdesk._FORMS_CACHE, "data", [])
+        monkeypatch.setitem(freshdesk._FORMS_CACHE, "fetched_at", 0)
+        freshdesk.invalidate_form_detail()
+        branching.SECTIONS_CACHE.clear()
+        freshdesk.load_snapshot()
+        branching.load_sections_snapshot()
+
+        assert freshdesk.get_ticket_forms_cached() == [{"id": 1, "name": "Form"}]
+        assert freshdesk.get_form_detail(1) == {"id": 1, "fields": [3]}
+        assert branching.SECTIONS_CACHE[3] == [{"id": 9, "fields": [4]}]
+    finally:
+        snapshot.set_path(None)
+        freshdesk.invalidate_form_detail()
+        branching.SECTIONS_CACHE.clear()
@@ -0,0 +1,46 @@
+import sys, pathlib, json
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from flask import Flask
+from logic import mapping, choice_search
+from routes.core import bp as core_bp
+
+APPS = ["Adobe Acrobat", "Microsoft Excel", "Microsoft Word", "Excel Add-ins", "Zoom", "Jira Service Desk"]
+
+
+def _labels(options):
+    return [o["text"]["text"] for o in options]
+
+
+def test_index_matches_prefixes_and_substrings_in_rank_order():
+    idx = choice_search.ChoiceIndex(mapping.choices_to_slack_options(APPS))
+    assert _labels(idx.search("excel")) == ["Excel Add-ins", "Microsoft Excel"]
+    assert _labels(idx.search("mi wo")) == ["Microsoft Word"]
+    assert _labels(idx.search("ervic")) == ["Jira Service Desk"]
+    assert idx.search("nothing here") == []
+    assert len(idx.search("", limit=3)) == 3
+
+
+def test_large_dropdown_renders_as_external_select(monkeypatch):
+    field = {"id": 7, "name": "cf_app", "type": "custom_dropdown", "displayed_to_customers": True, "choices": APPS}
+    monkeypatch.setattr(mapping, "EXTERNAL_SELECT_THRESHOLD", 5)
+    real_options = mapping.choices_to_slack_options
+    monkeypatch.setattr(mapping, "choices_to_slack_options", lambda *a: (_ for _ in ()).throw(AssertionError))
+    elem = mapping.to_slack_block(field)["element"]
+    monkeypatch.setattr(mapping, "choices_to_slack_options", real_options)
+    assert elem["type"] == "external_select" and "options" not in elem
+    monkeypatch.setattr(mapping, "EXTERNAL_SELECT_THRESHOLD", 100)
+    assert mapping.to_slack_block(field)["element"]["type"] == "static_select"
+    entry = {"cf_app": {"type": "external_select", "selected_option": {"value": "Zoom"}}}
+    assert mapping.extract_input(entry) == "Zoom"
+
+
+def test_options_endpoint_answers_block_suggestion(monkeypatch):
+    fields = [{"id": 7, "name": "cf_app", "type": "custom_dropdown", "choices": APPS}]
+    monkeypatch.setattr(mapping, "get_ticket_fields_cached", lambda: fields)
+    app = Flask(__name__)
+    app.register_blueprint(core_bp)
+    payload = {"type": "block_suggestion", "action_id": "cf_app", "block_id": "cf_app", "value": "zo"}
+    resp = app.test_client().post("/options", data={"payload": json.dumps(payload)})
+    assert resp.status_code == 200
+    assert resp.get_json()["options"] == [{"text": {"type": "plain_text", "text": "Zoom"}, "value": "Zoom"}]
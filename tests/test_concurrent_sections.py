@@ -0,0 +1,75 @@
+import sys, pathlib, threading, time, dataclasses
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from logic import wizard
+from logic.plan import compile_form_plan
+
+
+def _fields(n):
+    return [{"id": i, "name": f"f{i}", "type": "custom_text", "required_for_customers": True} for i in range(1, n + 1)]
+
+
+def test_frontier_fetched_concurrently_within_limit():
+    lock = threading.Lock()
+    state = {"now": 0, "peak": 0}
+
+    def slow_sections(fid):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.03)
+        with lock:
+            state["now"] -= 1
+        if fid == 1:
+            return [{"id": 100, "choices": [{"value": "v"}], "fields": list(range(11, 21))}]
+        return []
+
+    fields = _fields(20)
+    start = time.monotonic()
+    plan = compile_form_plan(1, ("k",), list(range(1, 11)), fields, slow_sections, concurrency=4)
+    elapsed = time.monotonic() - start
+    assert plan.complete
+    assert plan.reachable == {str(i) for i in range(1, 21)}
+    assert state["peak"] == 4
+    # 20 lookups of 30ms in two levels through 4 workers, not 600ms serially
+    assert elapsed < 0.4
+
+
+def test_deadline_returns_partial_plan_that_is_not_cached(monkeypatch):
+    wizard.clear_form_plans()
+
+    def stuck(fid):
+        time.sleep(0.2)
+        return []
+
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1, 2]})
+    monkeypatch.setattr(wizard, "get_sections_cached", stuck)
+    monkeypatch.setattr(wizard, "SECTIONS_CONCURRENCY", 2)
+    monkeypatch.setattr(wizard, "SECTIONS_DEADLINE", 0.02)
+    plan = wizard.get_form_plan({"id": 4}, _fields(2))
+    assert not plan.complete
+    assert wizard._FORM_PLANS == {}
+
+
+def test_partial_plan_reused_until_retry_after(monkeypatch):
+    wizard.clear_form_plans()
+    compiles = []
+
+    def partial(form_id, key, order, fields, sections_for, **kw):
+        compiles.append(form_id)
+        return dataclasses.replace(compile_form_plan(form_id, key, order, fields, lambda fid: []), complete=False)
+
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1]})
+    monkeypatch.setattr(wizard, "compile_form_plan", partial)
+    monkeypatch.setattr(wizard, "PARTIAL_PLAN_RETRY", 60)
+    fields = _fields(1)
+    first = wizard.get_form_plan({"id": 4}, fields)
+    assert wizard.get_form_plan({"id": 4}, fields) is first
+    assert compiles == [4]
+
+    monkeypatch.setattr(wizard, "PARTIAL_PLAN_RETRY", 0)
+    wizard.clear_form_plans()
+    wizard.get_form_plan({"id": 4}, fields)
+    wizard.get_form_plan({"id": 4}, fields)
+    assert compiles == [4, 4, 4]
+    assert wizard._FORM_PLANS == {}
@@ -0,0 +1,62 @@
+import json
+from services import freshdesk, metrics
+
+
+class _Resp:
+    def __init__(self, status, body=b"", headers=None):
+        self.status_code = status
+        self.ok = status < 400
+        self.content = body
+        self.text = body.decode()
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(self.status_code)
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def test_etag_revalidation_returns_same_object(monkeypatch):
+    sent = []
+    replies = [
+        _Resp(200, b'[{"id": 1}]', {"ETag": 'W/"v1"'}),
+        _Resp(304),
+    ]
+
+    def fake_get(url, timeout, headers=None):
+        sent.append(headers)
+        return replies.pop(0)
+
+    monkeypatch.setattr(freshdesk._session, "get", fake_get)
+    freshdesk._VALIDATORS.pop("/api/v2/x", None)
+    metrics.reset()
+    first = freshdesk.fd_get("/api/v2/x")
+    second = freshdesk.fd_get("/api/v2/x")
+    assert sent == [None, {"If-None-Match": 'W/"v1"'}]
+    assert second is first
+    assert metrics.get("fd.not_modified") == 1
+
+
+def test_unchanged_body_skips_parsing(monkeypatch):
+    body = b'[{"id": 2}]'
+    monkeypatch.setattr(freshdesk._session, "get", lambda url, timeout: _Resp(200, body))
+    freshdesk._VALIDATORS.pop("/api/v2/y", None)
+    first = freshdesk.fd_get("/api/v2/y")
+    monkeypatch.setattr(_Resp, "json", lambda self: (_ for _ in ()).throw(AssertionError("re-parsed")))
+    assert freshdesk.fd_get("/api/v2/y") is first
+
+
+def test_unchanged_catalog_does_not_fire_refresh_hooks(monkeypatch):
+    data = [{"id": 3}]
+    fired = []
+    monkeypatch.setattr(freshdesk, "fd_get", lambda path: data)
+    monkeypatch.setattr(freshdesk, "_REFRESH_HOOKS", [fired.append])
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "data", [])
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "expires", 0)
+    freshdesk.get_ticket_forms_cached()
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "expires", 0)
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "fetched_at", 0)
+    freshdesk.get_ticket_forms_cached()
+    assert fired == ["forms"]
@@ -0,0 +1,49 @@
+import sys, pathlib, threading
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from services import metrics
+from services.executor import LaneExecutor, SUBMIT, NAV, LIVE
+
+
+def test_submit_jumps_queued_live_updates():
+    pool = LaneExecutor(1, 500, name="t_prio")
+    gate = threading.Event()
+    order = []
+    pool.submit(LIVE, gate.wait)
+    futs = [pool.submit(LIVE, order.append, f"live{i}") for i in range(200)]
+    futs.append(pool.submit(NAV, order.append, "nav"))
+    futs.append(pool.submit(SUBMIT, order.append, "submit"))
+    gate.set()
+    for f in futs:
+        f.result(timeout=5)
+    assert order[:2] == ["submit", "nav"]
+    assert metrics.get("t_prio.done.submit") == 1
+
+
+def test_reserved_worker_stays_free_for_submits():
+    pool = LaneExecutor(2, 10, reserved=1, name="t_reserve")
+    gate = threading.Event()
+    started = threading.Semaphore(0)
+
+    def _live():
+        started.release()
+        gate.wait()
+
+    pool.submit(LIVE, _live)
+    pool.submit(LIVE, _live)
+    assert started.acquire(timeout=2)
+    # The second live task waits; the reserved worker takes the submit.
+    assert pool.submit(SUBMIT, lambda: "ok").result(timeout=2) == "ok"
+    assert pool.depth()[LIVE] == 1
+    gate.set()
+
+
+def test_full_lane_rejects_and_counts():
+    pool = LaneExecutor(1, 1, name="t_full")
+    gate, started = threading.Event(), threading.Event()
+    pool.submit(LIVE, lambda: (started.set(), gate.wait()))
+    assert started.wait(2)
+    assert pool.submit(LIVE, lambda: None) is not None
+    assert pool.submit(LIVE, lambda: None) is None
+    assert metrics.get("t_full.rejected.live") == 1
+    gate.set()
@@ -0,0 +1,48 @@
+import sys, pathlib, json
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from logic import wizard
+
+
+def _open_twice(monkeypatch, bump_between=False):
+    form = {"id": 4, "name": "Laptop", "fields": [1]}
+    fd_fields = [{"id": 1}]
+    version = [7]
+    builds, pushed = [], []
+
+    def fake_build(form_, fields_arg, token, page, state):
+        builds.append(token)
+        nav = {"type": "button", "action_id": "wizard_next", "value": token}
+        meta = {"ticket_form_id": form_["id"], "wizard_token": token, "page_index": 0}
+        return {"type": "modal", "blocks": [{"type": "actions", "elements": [nav]}],
+                "private_metadata": json.dumps(meta)}
+
+    wizard.clear_first_pages()
+    wizard.WIZARD_SESSIONS.clear()
+    monkeypatch.setattr(wizard, "catalog_version", lambda: version[0])
+    monkeypatch.setattr(wizard, "get_ticket_forms_cached", lambda: [form])
+    monkeypatch.setattr(wizard, "get_ticket_fields_cached", lambda: fd_fields)
+    monkeypatch.setattr(wizard, "filter_fields_for_form", lambda f, fields: fields)
+    monkeypatch.setattr(wizard, "build_wizard_page_modal", fake_build)
+    monkeypatch.setattr(wizard, "slack_api", lambda method, payload, supersede=None: pushed.append(payload["view"]))
+
+    wizard.open_wizard_first_page("v1", 4, None)
+    if bump_between:
+        version[0] += 1
+    wizard.open_wizard_first_page("v2", 4, None)
+    return builds, pushed
+
+
+def test_first_page_is_rendered_once_and_gets_its_own_token(monkeypatch):
+    builds, pushed = _open_twice(monkeypatch)
+    assert builds == [wizard._TOKEN_SLOT]
+    tokens = [json.loads(v["private_metadata"])["wizard_token"] for v in pushed]
+    assert len(set(tokens)) == 2
+    for view, token in zip(pushed, tokens):
+        assert view["blocks"][0]["elements"][0]["value"] == token
+        assert token in wizard.WIZARD_SESSIONS
+
+
+def test_new_catalog_version_renders_again(monkeypatch):
+    builds, _ = _open_twice(monkeypatch, bump_between=True)
+    assert len(builds) == 2
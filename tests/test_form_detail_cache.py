@@ -0,0 +1,76 @@
+import threading, time
+from services import freshdesk, metrics
+
+
+def test_form_detail_cached_and_invalidated(monkeypatch):
+    calls = []
+
+    def fake_get(path):
+        calls.append(path)
+        return {"id": 7, "fields": [1, 2]}
+
+    monkeypatch.setattr(freshdesk, "fd_get", fake_get)
+    freshdesk.invalidate_form_detail()
+    metrics.reset()
+
+    assert freshdesk.get_form_detail(7)["fields"] == [1, 2]
+    assert freshdesk.get_form_detail(7)["fields"] == [1, 2]
+    assert calls == ["/api/v2/ticket-forms/7"]
+    assert metrics.get("form_detail.miss") == 1
+    assert metrics.get("form_detail.hit") == 1
+
+    freshdesk.invalidate_form_detail(7)
+    freshdesk.get_form_detail(7)
+    assert len(calls) == 2
+
+
+def test_form_detail_concurrent_misses_coalesce(monkeypatch):
+    calls = []
+
+    def slow_get(path):
+        calls.append(path)
+        time.sleep(0.05)
+        return {"id": 8}
+
+    monkeypatch.setattr(freshdesk, "fd_get", slow_get)
+    freshdesk.invalidate_form_detail()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(freshdesk.get_form_detail(8))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["/api/v2/ticket-forms/8"]
+    assert results == [{"id": 8}] * 5
+
+
+def test_form_detail_errors_are_not_cached(monkeypatch):
+    def boom(path):
+        raise RuntimeError("down")
+
+    monkeypatch.setattr(freshdesk, "fd_get", boom)
+    freshdesk.invalidate_form_detail()
+    for _ in range(2):
+        try:
+            freshdesk.get_form_detail(9)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("expected failure")
+    assert 9 not in freshdesk._FORM_DETAIL_CACHE
+
+
+def test_forms_refresh_drops_details_of_changed_forms(monkeypatch):
+    listing = [{"id": 7, "updated_at": "a"}, {"id": 8, "updated_at": "a"}, {"id": 9, "updated_at": "a"}]
+    monkeypatch.setattr(freshdesk, "fd_get", lambda path: {"id": int(path.rsplit("/", 1)[1]), "fields": []})
+    monkeypatch.setattr(freshdesk.snapshot, "save", lambda *a: None)
+    monkeypatch.setattr(freshdesk, "_catalog_changed", lambda kind: None)
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "data", listing)
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "expires", 0)
+    freshdesk.invalidate_form_detail()
+    for fid in (7, 8, 9):
+        freshdesk.get_form_detail(fid)
+
+    monkeypatch.setattr(freshdesk, "fd_get", lambda path: [{"id": 7, "updated_at": "b"}, listing[1]])
+    freshdesk._refresh_forms(300)
+    assert set(freshdesk._FORM_DETAIL_CACHE) == {8}
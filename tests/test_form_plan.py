@@ -0,0 +1,82 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from logic import wizard
+
+
+def _fields():
+    return [
+        {"id": 1, "name": "parent", "type": "custom_dropdown", "required_for_customers": True,
+         "choices": [{"value": "yes", "label": "Yes"}, {"value": "no", "label": "No"}]},
+        {"id": 2, "name": "child", "type": "custom_text", "required_for_customers": True},
+        {"id": 3, "name": "hidden", "type": "custom_text"},
+        {"id": 4, "name": "other", "type": "custom_text"},
+        {"id": 5, "type": "default_subject", "name": "subject"},
+    ]
+
+
+def test_plan_compiled_once_and_reused(monkeypatch):
+    wizard.clear_form_plans()
+    calls = []
+
+    def fake_sections(fid):
+        calls.append(fid)
+        if fid == 1:
+            return [{"id": 11, "choices": [{"value": "yes", "label": "Yes"}], "fields": [2, 3]}]
+        return []
+
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1]})
+    monkeypatch.setattr(wizard, "get_sections_cached", fake_sections)
+    form = {"id": 7}
+    fields = _fields()
+
+    plan = wizard.get_form_plan(form, fields)
+    assert plan.reachable == {"1", "2", "3"}
+    assert plan.renderable == {"1": True, "2": True, "3": False}
+    assert plan.sections["1"][0].values == {"yes"}
+    assert sorted(calls) == [1, 2, 3]
+
+    state = {"parent": {"a": {"type": "static_select", "selected_option": {"value": "yes"}}}}
+    for _ in range(3):
+        assert wizard.compute_pages(form, fields, state) == [1, 2, "core", None]
+    assert wizard.compute_pages(form, fields, {}) == [1, "core", None]
+    assert [f["id"] for f in wizard.filter_fields_for_form(form, fields)] == [1, 2, 3, 5]
+    assert sorted(calls) == [1, 2, 3]
+
+
+def test_plan_recompiled_when_fields_change(monkeypatch):
+    wizard.clear_form_plans()
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1]})
+    monkeypatch.setattr(wizard, "get_sections_cached", lambda fid: [])
+    form = {"id": 7}
+    fields = _fields()
+    first = wizard.get_form_plan(form, fields)
+    # A refresh hands out a new list rather than editing the cached one.
+    fields = [dict(fields[0], updated_at="2025-01-01T00:00:00Z")] + fields[1:]
+    assert wizard.get_form_plan(form, fields) is not first
+
+
+def test_fingerprint_computed_once_per_catalog_version(monkeypatch):
+    wizard.clear_form_plans()
+    version, calls = [1], []
+    monkeypatch.setattr(wizard, "catalog_version", lambda: version[0])
+    monkeypatch.setattr(wizard, "fields_fingerprint", lambda fs: calls.append(1) or "fp")
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1]})
+    monkeypatch.setattr(wizard, "get_sections_cached", lambda fid: [])
+    fields = _fields()
+    for _ in range(3):
+        wizard.get_form_plan({"id": 7}, fields)
+    assert len(calls) == 1
+    version[0] += 1
+    wizard.get_form_plan({"id": 7}, fields)
+    assert len(calls) == 2
+
+
+def test_filtered_fields_keep_their_identity(monkeypatch):
+    wizard.clear_form_plans()
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1]})
+    monkeypatch.setattr(wizard, "get_sections_cached", lambda fid: [])
+    fields = _fields()
+    first = wizard.filter_fields_for_form({"id": 7}, fields)
+    assert wizard.filter_fields_for_form({"id": 7}, fields) is first
+    assert wizard.filter_fields_for_form({"id": 7}, list(fields)) is not first
@@ -0,0 +1,75 @@
+from services import freshdesk, metrics, ratelimit
+from services.ratelimit import TokenBucket
+
+
+class _Resp:
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.ok = status < 400
+        self.headers = headers or {}
+        self.text = ""
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(self.status_code)
+
+    def json(self):
+        return {"id": 42}
+
+
+def test_reserve_keeps_budget_for_high_priority():
+    bucket = TokenBucket(10)
+    bucket.rate = 0.001  # effectively no refill during the test
+    low = 0
+    while bucket.acquire(reserve=2, timeout=0):
+        low += 1
+    assert low == 8
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0)
+
+
+def test_observe_seeds_from_headers():
+    bucket = TokenBucket(100)
+    bucket.observe(remaining=5, total=400)
+    assert bucket.capacity == 400
+    assert 5 <= bucket.available() < 6
+
+
+def test_ticket_post_retries_after_429(monkeypatch):
+    replies = [
+        _Resp(429, {"Retry-After": "0", "X-RateLimit-Remaining": "0", "X-RateLimit-Total": "100"}),
+        _Resp(201, {"X-RateLimit-Remaining": "99", "X-RateLimit-Total": "100"}),
+    ]
+    sent = []
+
+    def fake_post(url, timeout, json=None):
+        sent.append(url)
+        return replies.pop(0)
+
+    monkeypatch.setattr(freshdesk._session, "post", fake_post)
+    monkeypatch.setattr(ratelimit.random, "uniform", lambda a, b: 0)
+    monkeypatch.setattr(freshdesk, "_BUCKET", TokenBucket(100))
+    metrics.reset()
+    assert freshdesk.fd_post("/api/v2/tickets", {"subject": "x"}) == {"id": 42}
+    assert len(sent) == 2
+    assert metrics.get("fd.ratelimit.429") == 1
+    assert metrics.get("fd.ratelimit.remaining") == 99
+
+
+def test_async_ticket_post_retries_like_the_sync_one(monkeypatch):
+    import asyncio
+    replies = [_Resp(429, {"Retry-After": "0"}), _Resp(201, {"X-RateLimit-Remaining": "98"})]
+
+    class _Client:
+        async def request(self, method, path, **kwargs):
+            return replies.pop(0)
+
+    monkeypatch.setattr(freshdesk, "_async_client", lambda: _Client())
+    monkeypatch.setattr(ratelimit.random, "uniform", lambda a, b: 0)
+    monkeypatch.setattr(freshdesk, "_BUCKET", TokenBucket(100))
+    metrics.reset()
+    assert asyncio.run(freshdesk.afd_post("/api/v2/tickets", {"subject": "x"})) == {"id": 42}
+    assert not replies
+    assert metrics.get("fd.ratelimit.429") == 1
+    assert metrics.get("fd.ratelimit.remaining") == 98
@@ -0,0 +1,35 @@
+import sys, pathlib, os, json, subprocess
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+# ``import app`` takes ~0.2s here; the budget leaves room for slow CI boxes
+# but still catches a parse, network call or heavy import sneaking back in.
+BUDGET = float(os.getenv("IMPORT_BUDGET_SECONDS", "1.0"))
+
+_PROBE = """
+import json, sys, time, threading
+t = time.perf_counter()
+import app
+print(json.dumps({
+    "seconds": time.perf_counter() - t,
+    "threads": threading.active_count(),
+    "modules": [m for m in ("bs4", "httpx") if m in sys.modules],
+    "fields": len(sys.modules["services.freshdesk"]._FIELDS_CACHE["data"] or []),
+}))
+"""
+
+
+def _probe(tmp_path):
+    env = dict(os.environ, DATA_DIR=str(tmp_path / "data"), SESSION_BACKEND="sqlite")
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_app_is_fast_and_side_effect_free(tmp_path):
+    runs = [_probe(tmp_path) for _ in range(3)]
+    assert min(r["seconds"] for r in runs) < BUDGET
+    first = runs[0]
+    assert first["threads"] == 1
+    assert first["modules"] == []
+    assert first["fields"] == 0
+    assert not (tmp_path / "data").exists()
@@ -0,0 +1,77 @@
+import sys, pathlib, itertools
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from logic import wizard
+from logic.plan import walk_pages, resume_walk, changed_answers
+
+
+def _sel(v):
+    return {"a": {"type": "static_select", "selected_option": {"value": v}}}
+
+
+def _txt(v):
+    return {"a": {"type": "plain_text_input", "value": v}}
+
+
+def _setup(monkeypatch):
+    wizard.clear_form_plans()
+    fields = [
+        {"id": 1, "name": "kind", "type": "custom_dropdown", "required_for_customers": True,
+         "choices": [{"value": "hw", "label": "HW"}, {"value": "sw", "label": "SW"}]},
+        {"id": 2, "name": "device", "type": "custom_text", "required_for_customers": True},
+        {"id": 3, "name": "app", "type": "custom_dropdown", "required_for_customers": True,
+         "choices": [{"value": "x", "label": "X"}, {"value": "y", "label": "Y"}]},
+        {"id": 4, "name": "app_x", "type": "custom_text", "required_for_customers": True},
+        {"id": 5, "name": "notes", "type": "custom_text", "required_for_customers": True},
+    ]
+    sections = {
+        1: [{"id": 11, "choices": [{"value": "hw"}], "fields": [2]},
+            {"id": 12, "choices": [{"value": "sw"}], "fields": [3]}],
+        3: [{"id": 31, "choices": [{"value": "x"}], "fields": [4]}],
+    }
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1, 5]})
+    monkeypatch.setattr(wizard, "get_sections_cached", lambda fid: sections.get(fid, []))
+    form = {"id": 3}
+    return form, fields, wizard.get_form_plan(form, fields)
+
+
+def test_resume_matches_full_walk(monkeypatch):
+    form, fields, plan = _setup(monkeypatch)
+    answers = {
+        "kind": [None, _sel("hw"), _sel("sw")],
+        "device": [None, _txt("d")],
+        "app": [None, _sel("x"), _sel("y")],
+        "app_x": [None, _txt("ax")],
+        "notes": [None, _txt("n")],
+    }
+    states = []
+    for combo in itertools.product(*answers.values()):
+        states.append({k: v for k, v in zip(answers, combo) if v is not None})
+    for before in states:
+        prev = walk_pages(plan, before)
+        for after in states:
+            changed = changed_answers(before, after) | (set(before) - set(after))
+            resumed = resume_walk(plan, after, prev, changed)
+            assert resumed["pages"] == walk_pages(plan, after)["pages"]
+
+
+def test_update_wizard_drops_only_stale_descendants(monkeypatch):
+    form, fields, plan = _setup(monkeypatch)
+    monkeypatch.setattr(wizard, "get_ticket_forms_cached", lambda: [form])
+    monkeypatch.setattr(wizard, "get_ticket_fields_cached", lambda: fields)
+    monkeypatch.setattr(wizard, "slack_api", lambda *a, **k: None)
+    wizard.WIZARD_SESSIONS.clear()
+    wizard.WIZARD_SESSIONS["t"] = {"ticket_form_id": 3, "page": 0, "values": {}}
+
+    for state in ({"kind": _sel("sw")}, {"app": _sel("x")}, {"app_x": _txt("ax")}, {"notes": _txt("n")}):
+        wizard.update_wizard("vid", "t", None, state, "next")
+    sess = wizard.WIZARD_SESSIONS["t"]
+    assert sess["walk"]["pages"] == [1, 3, 4, 5]
+
+    calls = []
+    real_walk = wizard.resume_walk
+    monkeypatch.setattr(wizard, "resume_walk", lambda *a: calls.append(a[3]) or real_walk(*a))
+    wizard.update_wizard("vid", "t", None, {"kind": _sel("hw")}, None)
+    assert calls == [{"kind"}]
+    assert set(sess["values"]) == {"kind", "notes"}
+    assert sess["walk"]["pages"] == [1, 2]
@@ -0,0 +1,104 @@
+import sys, pathlib, os, signal, threading, time
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from services import freshdesk, slack, metrics
+from logic import warmup, wizard, lifecycle
+
+
+def test_forked_child_opens_its_own_http_sessions():
+    parent = (id(freshdesk._session), id(slack._session))
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        fresh = id(freshdesk._session) not in parent and id(slack._session) not in parent
+        os.write(w, b"1" if fresh else b"0")
+        os._exit(0)
+    os.close(w)
+    os.waitpid(pid, 0)
+    assert os.read(r, 1) == b"1"
+
+
+def test_compile_plans_fills_plan_cache(monkeypatch):
+    wizard.clear_form_plans()
+    fields = [{"id": 1, "name": "a", "type": "custom_text"}]
+    monkeypatch.setattr(warmup, "get_ticket_forms_cached", lambda: [{"id": 5, "name": "Help", "fields": [1]}])
+    monkeypatch.setattr(warmup, "get_ticket_fields_cached", lambda: fields)
+    monkeypatch.setattr(warmup, "filter_portal_forms", lambda forms: forms)
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1]})
+    monkeypatch.setattr(wizard, "get_sections_cached", lambda fid: [])
+    assert warmup.compile_plans() == 1
+    assert [k[0] for k in wizard._FORM_PLANS] == [5]
+
+
+def test_forked_child_does_not_inherit_held_locks():
+    slack._bucket_for("views.update")
+    held, release = threading.Event(), threading.Event()
+    locks = [freshdesk._BUCKET._cond, slack._BUCKETS["views.update"]._cond, metrics._LOCK,
+             warmup._WARM_LOCK, warmup._CRAWL_LOCK]
+
+    def hold():
+        for lock in locks:
+            lock.acquire()
+        held.set()
+        release.wait(5)
+        for lock in locks:
+            lock.release()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    assert held.wait(2)
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        signal.alarm(2)  # a deadlock kills the child before it answers
+        freshdesk._BUCKET.try_acquire()
+        slack._BUCKETS["views.update"].try_acquire()
+        metrics.incr("prefork.child")
+        ok = warmup._WARM_LOCK.acquire(blocking=False) and warmup._CRAWL_LOCK.acquire(blocking=False)
+        os.write(w, b"1" if ok else b"0")
+        os._exit(0)
+    os.close(w)
+    release.set()
+    holder.join()
+    os.waitpid(pid, 0)
+    assert os.read(r, 1) == b"1"
+
+
+def test_quiesce_waits_for_background_refreshes():
+    done = threading.Event()
+    t = threading.Thread(target=lambda: time.sleep(0.1) or done.set(), name=freshdesk.BACKGROUND_THREAD)
+    t.start()
+    assert lifecycle.quiesce(2)
+    assert done.is_set()
+
+    stuck = threading.Event()
+    t = threading.Thread(target=stuck.wait, args=(2,), name=warmup.WARM_THREAD)
+    t.start()
+    assert not lifecycle.quiesce(0.05)
+    stuck.set()
+    t.join()
+
+
+def test_preload_startup_refetches_snapshot_sections(monkeypatch):
+    from logic import branching
+    stale = [{"id": 10, "fields": [], "label": "old"}]
+    fresh = [{"id": 10, "fields": [], "label": "new"}]
+    fields = [{"id": 1, "name": "a", "type": "custom_text"}]
+    monkeypatch.setattr(lifecycle, "_STARTED", False)
+    monkeypatch.setattr(lifecycle, "configure_logging", lambda: None)
+    monkeypatch.setattr(freshdesk, "load_snapshot", lambda: None)
+    monkeypatch.setattr(freshdesk, "on_catalog_refresh", lambda hook: None)
+    monkeypatch.setattr(branching.snapshot, "load", lambda kind: {"1": (0, stale)} if kind == "sections" else {})
+    monkeypatch.setattr(branching.snapshot, "save_many", lambda *a: None)
+    monkeypatch.setattr(branching, "get_sections", lambda fid: fresh if fid == 1 else [])
+    monkeypatch.setattr(warmup, "_FORM_SIGS", {})
+    monkeypatch.setattr(warmup, "get_ticket_forms_cached", lambda: [{"id": 5, "name": "Help", "fields": [1]}])
+    monkeypatch.setattr(warmup, "get_ticket_fields_cached", lambda: fields)
+    monkeypatch.setattr(warmup, "filter_portal_forms", lambda forms: forms)
+    monkeypatch.setattr(warmup, "get_form_detail", lambda fid: {"fields": [1]})
+    monkeypatch.setattr(wizard, "get_form_detail", lambda fid: {"fields": [1]})
+    branching.SECTIONS_CACHE.pop(1, None)
+
+    assert lifecycle.startup(preload=True)
+    assert warmup.WARM_STATUS["steps"]["sections"]["state"] == "done"
+    assert branching.SECTIONS_CACHE[1] == fresh
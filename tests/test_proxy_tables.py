@@ -0,0 +1,33 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from logic import mapping, ticket
+
+LONG = "Request access to the shared finance drive " * 5
+
+
+def _catalog(monkeypatch):
+    field = {"id": 9, "name": "cf_drive", "type": "custom_dropdown", "displayed_to_customers": True,
+             "choices": ["Short", LONG]}
+    monkeypatch.setattr(mapping, "get_ticket_fields_cached", lambda: [field])
+    monkeypatch.setattr(mapping, "fetch_field_detail", lambda fid: (_ for _ in ()).throw(AssertionError("fetched")))
+    return field
+
+
+def test_rendered_proxy_resolves_from_tables(monkeypatch):
+    field = _catalog(monkeypatch)
+    values = [o["value"] for o in mapping.choices_to_slack_options(field["choices"])]
+    assert values[0] == "Short" and values[1].startswith("hash:")
+    assert ticket.resolve_proxy_value("cf_drive", values[1]) == LONG
+    forward, reverse = mapping.proxy_tables(field["choices"])
+    assert forward[LONG] == values[1] and reverse == {values[1]: LONG}
+
+
+def test_submit_maps_proxy_back_and_keeps_unknown_hashes(monkeypatch):
+    _catalog(monkeypatch)
+    proxy = mapping.proxy_value_if_needed(LONG)
+    values = {"cf_drive": {"cf_drive": {"type": "external_select", "selected_option": {"value": proxy}}}}
+    built = ticket.modal_values_to_fd_ticket(values, None)
+    assert built["custom_fields"] == {"cf_drive": LONG}
+    assert ticket.resolve_proxy_value("cf_drive", "hash:deadbeef") == "hash:deadbeef"
+    assert ticket.resolve_proxy_value("cf_missing", proxy) == proxy
@@ -0,0 +1,41 @@
+import sys, pathlib, json, itertools
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from logic import mapping
+
+
+def _variants(field):
+    # Every combination of the visibility flags, with and without choices.
+    for displayed, required, editable, choices in itertools.product((True, False, None), repeat=4):
+        f = dict(field)
+        for key, val in (("displayed_to_customers", displayed), ("required_for_customers", required),
+                         ("customers_can_edit", editable)):
+            if val is None:
+                f.pop(key, None)
+            else:
+                f[key] = val
+        f.pop("choices", None)
+        if choices:
+            f["choices"] = ["a", "b" * 200]
+        if f.get("dependent_fields"):
+            f["dependent_fields"] = [dict(d, displayed_to_customers=displayed) for d in f["dependent_fields"]]
+        yield f
+
+
+def test_is_renderable_matches_rendering_over_bundled_catalog(monkeypatch):
+    fetched = []
+    monkeypatch.setattr(mapping, "fetch_field_detail", lambda fid: fetched.append(fid))
+    fields = json.loads((ROOT / "ticket_fields.json").read_text(encoding="utf-8"))
+    fields.append({"id": 1, "name": "cf_odd", "type": "custom_rating", "displayed_to_customers": True})
+    fields.append({"id": 2, "name": "cf_tree", "type": "nested_field", "displayed_to_customers": True,
+                   "dependent_fields": [{"id": 3, "name": "cf_leaf", "type": "custom_dropdown", "level": 2}]})
+    checked = 0
+    for field in fields:
+        for f in [field, *_variants(field)]:
+            expected = bool(mapping.normalize_blocks(mapping.to_slack_block(json.loads(json.dumps(f)))))
+            fetched.clear()
+            assert mapping.is_renderable(f) == expected, (f.get("id"), f.get("type"))
+            assert fetched == []
+            checked += 1
+    assert checked > len(fields) * 80
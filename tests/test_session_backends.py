@@ -0,0 +1,117 @@
+import sys, pathlib, socketserver, threading, fnmatch
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import pytest
+from logic.sessions import SessionStore, SqliteSessions, RedisSessions, dumps, loads
+
+
+class _FakeRedis(socketserver.ThreadingTCPServer):
+    """Tiny RESP server covering the commands RedisSessions sends."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        self.data, self.ttls = {}, {}
+        super().__init__(("127.0.0.1", 0), _Handler)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        n = int(line[1:])
+        args = []
+        for _ in range(n):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def handle(self):
+        srv = self.server
+        while (args := self._read()) is not None:
+            cmd = args[0].upper()
+            if cmd == b"GET":
+                v = srv.data.get(args[1])
+                out = b"$-1\r\n" if v is None else b"$%d\r\n%s\r\n" % (len(v), v)
+            elif cmd == b"SET":
+                srv.data[args[1]] = args[2]
+                if len(args) > 4:
+                    srv.ttls[args[1]] = int(args[4])
+                out = b"+OK\r\n"
+            elif cmd == b"EXPIRE":
+                out = b":%d\r\n" % (args[1] in srv.data)
+                srv.ttls[args[1]] = int(args[2])
+            elif cmd == b"DEL":
+                out = b":%d\r\n" % (srv.data.pop(args[1], None) is not None)
+            elif cmd == b"SCAN":
+                keys = [k for k in srv.data if fnmatch.fnmatchcase(k.decode(), args[3].decode())]
+                out = b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys) + b"".join(b"$%d\r\n%s\r\n" % (len(k), k) for k in keys)
+            else:
+                out = b"-ERR unknown command\r\n"
+            self.wfile.write(out)
+
+
+@pytest.fixture
+def fake_redis():
+    srv = _FakeRedis()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _backends(tmp_path, fake_redis):
+    host, port = fake_redis.server_address
+    return [
+        SessionStore(600, 100, 1 << 20),
+        SqliteSessions(str(tmp_path / "s.sqlite3"), 600, 100),
+        RedisSessions(f"redis://{host}:{port}/0", 600),
+    ]
+
+
+def test_backends_share_one_contract(tmp_path, fake_redis):
+    big = {"ticket_form_id": 5, "page": 2, "values": {f"f{i}": {"a": {"type": "plain_text_input", "value": "x" * 40}} for i in range(30)}}
+    for store in _backends(tmp_path, fake_redis):
+        assert store.get("t1") is None
+        store["t1"] = big
+        store["t2"] = {"page": 0}
+        assert store["t1"] == big
+        assert sorted(store) == ["t1", "t2"]
+        assert store.pop("t2") == {"page": 0}
+        assert "t2" not in store
+        with pytest.raises(KeyError):
+            del store["t2"]
+
+
+def test_redis_sessions_slide_expiry_and_compress(fake_redis):
+    host, port = fake_redis.server_address
+    store = RedisSessions(f"redis://{host}:{port}/0", 900)
+    value = {"values": {"name": "y" * 2000}}
+    store["tok"] = value
+    blob = fake_redis.data[b"wizard:session:tok"]
+    assert blob[:1] == b"z" and len(blob) < 200
+    fake_redis.ttls.clear()
+    assert store["tok"] == value
+    assert fake_redis.ttls[b"wizard:session:tok"] == 900
+
+
+def test_sqlite_sessions_visible_across_connections(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    a, b = SqliteSessions(path, 600, 100), SqliteSessions(path, 600, 100)
+    a["tok"] = {"page": 3}
+    assert b["tok"] == {"page": 3}
+    assert loads(dumps({"k": 1})) == {"k": 1}
+
+
+def test_redis_failed_auth_does_not_keep_the_socket(fake_redis):
+    from services.resp import RespClient, RespError
+    host, port = fake_redis.server_address
+    fake_redis.data[b"k"] = b"v"
+    client = RespClient(f"redis://:secret@{host}:{port}/0")
+    for _ in range(2):
+        # The fake server rejects AUTH; GET must never run on that socket.
+        with pytest.raises(RespError):
+            client.execute("GET", "k")
+        assert client._sock is None
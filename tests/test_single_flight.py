@@ -0,0 +1,82 @@
+import threading, time
+from services import freshdesk
+
+
+class _Resp:
+    ok = True
+    text = ""
+    status_code = 200
+    headers = {}
+
+    def __init__(self, data):
+        self._data = data
+        self.content = repr(data).encode()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+def _run_concurrently(fn, n=8):
+    results, errors = [], []
+
+    def _call():
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=_call) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_gets_share_one_request(monkeypatch):
+    calls = []
+
+    def slow_get(url, timeout):
+        calls.append(url)
+        time.sleep(0.05)
+        return _Resp([{"id": 1}])
+
+    monkeypatch.setattr(freshdesk._session, "get", slow_get)
+    results, errors = _run_concurrently(lambda: freshdesk.fd_get("/api/v2/ticket-forms"))
+    assert not errors
+    assert len(calls) == 1
+    assert results == [[{"id": 1}]] * 8
+
+
+def test_concurrent_gets_share_the_error(monkeypatch):
+    calls = []
+
+    def failing_get(url, timeout):
+        calls.append(url)
+        time.sleep(0.05)
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(freshdesk._session, "get", failing_get)
+    results, errors = _run_concurrently(lambda: freshdesk.fd_get("/api/v2/ticket-forms"))
+    assert len(calls) == 1
+    assert not results and len(errors) == 8
+
+
+def test_expired_forms_cache_refreshes_once(monkeypatch):
+    calls = []
+
+    def slow_fd_get(path):
+        calls.append(path)
+        time.sleep(0.05)
+        return [{"id": 2}]
+
+    monkeypatch.setattr(freshdesk, "fd_get", slow_fd_get)
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "expires", 0)
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "data", [])
+    results, errors = _run_concurrently(freshdesk.get_ticket_forms_cached)
+    assert not errors
+    assert calls == ["/api/v2/ticket-forms"]
+    assert results == [[{"id": 2}]] * 8
@@ -0,0 +1,87 @@
+import threading, time
+from services import slack, ratelimit, metrics
+from services.ratelimit import TokenBucket
+
+
+class _Resp:
+    def __init__(self, status, data=None, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self._data = data or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def json(self):
+        return self._data
+
+
+def test_retries_after_429(monkeypatch):
+    replies = [_Resp(429, headers={"Retry-After": "0"}), _Resp(200, {"ok": True, "view": {"id": "V1"}})]
+    monkeypatch.setattr(slack._session, "post", lambda url, json, timeout: replies.pop(0))
+    monkeypatch.setattr(ratelimit.random, "uniform", lambda a, b: 0)
+    monkeypatch.setattr(slack, "_BUCKETS", {})
+    metrics.reset()
+    assert slack.slack_api("views.update", {"view_id": "V1"})["view"]["id"] == "V1"
+    assert metrics.get("slack.ratelimit.429") == 1
+
+
+def test_method_tiers_get_their_own_buckets(monkeypatch):
+    monkeypatch.setattr(slack, "_BUCKETS", {})
+    assert slack._bucket_for("views.update").capacity == 100
+    assert slack._bucket_for("conversations.open").capacity == 50
+    assert slack._bucket_for("views.update") is not slack._bucket_for("users.info")
+
+
+def test_superseded_views_update_is_dropped(monkeypatch):
+    sent = []
+    monkeypatch.setattr(slack._session, "post", lambda url, json, timeout: sent.append(json) or _Resp(200, {"ok": True}))
+    bucket = TokenBucket(100)
+    bucket.pause(0.1, jitter=0)
+    monkeypatch.setattr(slack, "_BUCKETS", {"views.update": bucket})
+
+    results = {}
+    older = threading.Thread(target=lambda: results.setdefault("old", slack.slack_api(
+        "views.update", {"view": "old"}, supersede="V1")))
+    older.start()
+    time.sleep(0.02)
+    results["new"] = slack.slack_api("views.update", {"view": "new"}, supersede="V1")
+    older.join()
+    assert results["old"] is None
+    assert sent == [{"view": "new"}]
+    assert slack._GENERATIONS == {}
+
+
+def test_views_open_gives_up_before_trigger_expires(monkeypatch):
+    sent = []
+    monkeypatch.setattr(slack._session, "post", lambda url, json, timeout: sent.append(json) or _Resp(200, {"ok": True}))
+    monkeypatch.setattr(slack, "TRIGGER_WAIT", 0.1)
+    bucket = TokenBucket(100)
+    bucket.pause(5, jitter=0)
+    monkeypatch.setattr(slack, "_BUCKETS", {"views.open": bucket})
+    start = time.monotonic()
+    try:
+        slack.slack_api("views.open", {"trigger_id": "T"})
+        raise AssertionError("expected a rate-limit error")
+    except RuntimeError as e:
+        assert e.args[0]["error"] == "ratelimited"
+    assert time.monotonic() - start < 1
+    assert sent == []
+
+
+def test_async_call_retries_like_the_sync_one(monkeypatch):
+    import asyncio
+    replies = [_Resp(200, {"ok": False, "error": "ratelimited"}, {"Retry-After": "0"}),
+               _Resp(200, {"ok": True, "view": {"id": "V1"}})]
+
+    class _Client:
+        async def post(self, method, json):
+            return replies.pop(0)
+
+    monkeypatch.setattr(slack, "_async_client", lambda: _Client())
+    monkeypatch.setattr(ratelimit.random, "uniform", lambda a, b: 0)
+    monkeypatch.setattr(slack, "_BUCKETS", {})
+    metrics.reset()
+    assert asyncio.run(slack.aslack_api("views.update", {"view_id": "V1"}))["view"]["id"] == "V1"
+    assert metrics.get("slack.ratelimit.429") == 1
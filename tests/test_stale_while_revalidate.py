@@ -0,0 +1,76 @@
+import threading, time
+from services import freshdesk, metrics
+
+
+def _prime(monkeypatch, data, age):
+    now = time.time()
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "data", data)
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "expires", now - 1)
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "fetched_at", now - age)
+    monkeypatch.setitem(freshdesk._FORMS_CACHE, "retry_at", 0)
+
+
+def test_expired_cache_served_stale_while_refreshing(monkeypatch):
+    gate = threading.Event()
+    calls = []
+
+    def slow_fd_get(path):
+        calls.append(path)
+        gate.wait(1)
+        return [{"id": "new"}]
+
+    monkeypatch.setattr(freshdesk, "fd_get", slow_fd_get)
+    _prime(monkeypatch, [{"id": "old"}], age=400)
+    metrics.reset()
+
+    start = time.monotonic()
+    for _ in range(5):
+        assert freshdesk.get_ticket_forms_cached() == [{"id": "old"}]
+    assert time.monotonic() - start < 0.5
+    assert metrics.get("catalog.stale_served") == 5
+
+    gate.set()
+    deadline = time.time() + 1
+    while freshdesk._FORMS_CACHE["data"] != [{"id": "new"}] and time.time() < deadline:
+        time.sleep(0.01)
+    assert freshdesk.get_ticket_forms_cached() == [{"id": "new"}]
+    assert calls == ["/api/v2/ticket-forms"]
+
+
+def test_too_stale_cache_blocks_for_fresh_data(monkeypatch):
+    monkeypatch.setattr(freshdesk, "fd_get", lambda path: [{"id": "new"}])
+    _prime(monkeypatch, [{"id": "old"}], age=freshdesk.CATALOG_MAX_STALE + 1)
+    assert freshdesk.get_ticket_forms_cached() == [{"id": "new"}]
+
+
+def test_failed_background_refresh_backs_off(monkeypatch):
+    calls = []
+
+    def boom(path):
+        calls.append(path)
+        raise RuntimeError("down")
+
+    monkeypatch.setattr(freshdesk, "fd_get", boom)
+    _prime(monkeypatch, [{"id": "old"}], age=400)
+    assert freshdesk.get_ticket_forms_cached() == [{"id": "old"}]
+    deadline = time.time() + 1
+    while not freshdesk._FORMS_CACHE["retry_at"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert freshdesk.get_ticket_forms_cached() == [{"id": "old"}]
+    time.sleep(0.05)
+    assert calls == ["/api/v2/ticket-forms"]
+
+
+def test_failed_or_empty_fields_refresh_keeps_last_catalog(monkeypatch):
+    good = [{"id": 1, "name": "cf_app"}]
+    scraped = []
+    monkeypatch.setattr(freshdesk, "_scrape_portal_fields", lambda: scraped.append(1) or [])
+    monkeypatch.setattr(freshdesk.snapshot, "save", lambda *a: None)
+    for fd_get in (lambda path: (_ for _ in ()).throw(RuntimeError("down")), lambda path: []):
+        monkeypatch.setattr(freshdesk, "fd_get", fd_get)
+        monkeypatch.setitem(freshdesk._FIELDS_CACHE, "data", good)
+        monkeypatch.setitem(freshdesk._FIELDS_CACHE, "expires", 0)
+        freshdesk._refresh_fields(300)
+        assert freshdesk._FIELDS_CACHE["data"] is good
+        assert 0 < freshdesk._FIELDS_CACHE["expires"] - time.time() <= freshdesk._CATALOG_RETRY_DELAY
+    assert scraped == []
@@ -0,0 +1,46 @@
+import sys, pathlib, json
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from logic import wizard
+from logic.mapping import extract_input
+from test_incremental_wizard import _setup, _sel, _txt
+
+
+def test_answers_round_trip_through_metadata_encoding():
+    values = {
+        "kind": _sel("hw"),
+        "notes": _txt("hello"),
+        "agree": {"a": {"type": "checkboxes", "selected_options": [{"value": "y"}]}},
+        "empty": {"a": {"type": "plain_text_input", "value": None}},
+    }
+    decoded = wizard.decode_answers(wizard.encode_answers(values))
+    assert {k: extract_input(v) for k, v in decoded.items()} == {"kind": "hw", "notes": "hello", "agree": True}
+
+
+def _run_stateless(monkeypatch, state):
+    form, fields, plan = _setup(monkeypatch)
+    pushed = []
+    monkeypatch.setattr(wizard, "WIZARD_STATELESS", True)
+    monkeypatch.setattr(wizard, "get_ticket_forms_cached", lambda: [form])
+    monkeypatch.setattr(wizard, "get_ticket_fields_cached", lambda: fields)
+    monkeypatch.setattr(wizard, "slack_api", lambda method, payload, supersede=None: pushed.append(payload["view"]))
+    wizard.WIZARD_SESSIONS.clear()
+    meta = {"ticket_form_id": 3, "wizard_token": "t", "page_index": 0, "a": wizard.encode_answers({})}
+    wizard.update_wizard("vid", "t", None, state, "next", meta)
+    return json.loads(pushed[0]["private_metadata"])
+
+
+def test_stateless_update_keeps_answers_in_view(monkeypatch):
+    meta = _run_stateless(monkeypatch, {"kind": _sel("sw")})
+    assert len(wizard.WIZARD_SESSIONS) == 0
+    assert meta["page_index"] == 1
+    token, merged, form_id = wizard.wizard_submission(meta, {"app": _sel("x")})
+    assert form_id == 3
+    assert {k: extract_input(v) for k, v in merged.items()} == {"kind": "sw", "app": "x"}
+
+
+def test_oversized_answers_fall_back_to_store(monkeypatch):
+    big = "".join(f"{i:06d}" for i in range(3000))
+    meta = _run_stateless(monkeypatch, {"kind": _sel("sw"), "notes": _txt(big)})
+    assert "a" not in meta
+    assert extract_input(wizard.WIZARD_SESSIONS["t"]["values"]["notes"]) == big
@@ -0,0 +1,94 @@
+import sys, pathlib, threading, time
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from services import executor
+from services.coalesce import LatestWins, action_seq
+
+
+def test_only_newest_pending_state_renders():
+    views = LatestWins("t_views")
+    gate, started, done = threading.Event(), threading.Event(), threading.Event()
+    rendered = []
+
+    def render(state):
+        if state == 1:
+            started.set()
+            gate.wait(2)
+        rendered.append(state)
+        if state == 10:
+            done.set()
+
+    executor.submit_latest(views, executor.LIVE, "V1", 1.0, render, 1)
+    assert started.wait(2)
+    for i in range(2, 11):
+        executor.submit_latest(views, executor.LIVE, "V1", float(i), render, i)
+    gate.set()
+    assert done.wait(2)
+    assert rendered == [1, 10]
+
+
+def test_nav_clicks_kept_and_older_input_dropped():
+    views = LatestWins("t_nav")
+    assert views.offer("V", 5.0, "next", droppable=False)
+    assert not views.offer("V", 6.0, "type")
+    assert not views.offer("V", 7.0, "next2", droppable=False)
+    assert not views.offer("V", 8.0, "type2")
+    assert views.next("V") == (5.0, "next")
+    views.rendered("V", 5.0)
+    assert views.next("V") == (7.0, "next2")
+    views.rendered("V", 7.0)
+    # An event stamped before the last render arrives late and is ignored.
+    assert not views.offer("V", 6.5, "late")
+    assert views.next("V") == (8.0, "type2")
+    views.rendered("V", 8.0)
+    assert views.next("V") is None
+
+
+def test_action_seq_uses_action_ts():
+    assert action_seq({"actions": [{"action_ts": "1700000000.123"}]}) == 1700000000.123
+    assert action_seq({"type": "view_submission"}) is None
+
+
+def test_failed_job_does_not_wedge_the_view():
+    views = LatestWins("t_fail")
+    rendered, done = [], threading.Event()
+
+    def render(state):
+        if state == 1:
+            raise RuntimeError("slack down")
+        rendered.append(state)
+        done.set()
+
+    assert executor.submit_latest(views, executor.LIVE, "V", 1.0, render, 1)
+    # Let the first drainer finish before the next offer.
+    deadline = time.time() + 1
+    while "V" in views._running and time.time() < deadline:
+        time.sleep(0.01)
+    executor.submit_latest(views, executor.LIVE, "V", 2.0, render, 2)
+    assert done.wait(2)
+    assert rendered == [2]
+
+
+def test_async_drainer_survives_failed_and_cancelled_jobs(monkeypatch):
+    import asyncio, asgi
+    views = LatestWins("t_async")
+    monkeypatch.setattr(asgi, "VIEWS", views)
+    rendered = []
+
+    async def boom():
+        raise RuntimeError("slack down")
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    async def ok():
+        rendered.append("ok")
+
+    async def run():
+        for job in (boom, ok, cancelled, ok):
+            asgi._spawn_latest("V", None, job, droppable=False)
+            await asyncio.gather(*asgi._TASKS, return_exceptions=True)
+
+    asyncio.run(run())
+    assert rendered == ["ok", "ok"]
+    assert "V" not in views._running
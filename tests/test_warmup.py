@@ -0,0 +1,102 @@
+import sys, pathlib, types, threading
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from logic import warmup
+
+
+def _fake_catalog(monkeypatch, detail=lambda fid: {"fields": [1]}):
+    forms = [{"id": 5, "name": "Help"}, {"id": 6, "name": "Access"}]
+    fields = [{"id": 1, "type": "custom_dropdown"}]
+    hydrated, rendered = [], []
+
+    def fake_crawl(refresh=False, concurrency=1, form_ids=None):
+        warmup.CRAWL_STATUS.update({"state": "done", "fields_done": 3, "errors": 0})
+        return True
+
+    plan = types.SimpleNamespace(reachable=frozenset({"1"}), by_id={"1": fields[0]}, choice_fields=lambda: fields)
+    monkeypatch.setattr(warmup, "get_ticket_forms_cached", lambda: forms)
+    monkeypatch.setattr(warmup, "get_ticket_fields_cached", lambda: fields)
+    monkeypatch.setattr(warmup, "filter_portal_forms", lambda fs: fs)
+    monkeypatch.setattr(warmup, "get_form_detail", detail)
+    monkeypatch.setattr(warmup, "crawl_catalog", fake_crawl)
+    monkeypatch.setattr(warmup, "compile_plans", lambda: len(forms))
+    monkeypatch.setattr(warmup, "filter_fields_for_form", lambda form, fs: fs)
+    monkeypatch.setattr(warmup, "get_form_plan", lambda form, fs: plan)
+    monkeypatch.setattr(warmup, "ensure_choices", lambda f: hydrated.append(f["id"]) or f)
+    monkeypatch.setattr(warmup, "portal_picker_modal", lambda: {"callback_id": "pick_form"})
+    monkeypatch.setattr(warmup, "prerender_first_page", lambda form, fs: rendered.append(form["id"]) or "{}")
+    return hydrated, rendered
+
+
+def test_warm_up_runs_every_step(monkeypatch):
+    hydrated, rendered = _fake_catalog(monkeypatch)
+    assert warmup.warm_up()
+    steps = warmup.WARM_STATUS["steps"]
+    assert warmup.WARM_STATUS["state"] == "done"
+    assert {s["state"] for s in steps.values()} == {"done"}
+    assert steps["form_details"]["count"] == 2
+    assert steps["sections"]["count"] == 3
+    assert steps["plans"]["count"] == 2
+    assert hydrated == [1]
+    assert sorted(rendered) == [5, 6]
+    assert all(s["duration"] is not None for s in steps.values())
+
+
+def test_failed_step_skips_only_its_dependents(monkeypatch):
+    def broken(fid):
+        raise RuntimeError("detail down")
+
+    _fake_catalog(monkeypatch, detail=broken)
+    assert warmup.warm_up()
+    steps = warmup.WARM_STATUS["steps"]
+    assert warmup.WARM_STATUS["state"] == "degraded"
+    assert steps["form_details"] == {**steps["form_details"], "state": "failed", "error": "detail down"}
+    for name in ("sections", "plans", "choices", "first_pages"):
+        assert steps[name]["state"] == "skipped"
+    assert steps["picker"]["state"] == "done"
+    assert steps["fields"]["state"] == "done"
+
+
+def test_refresh_recrawls_only_changed_forms(monkeypatch):
+    _fake_catalog(monkeypatch)
+    crawled = []
+
+    def fake_crawl(refresh=False, concurrency=1, form_ids=None):
+        crawled.append(form_ids)
+        warmup.CRAWL_STATUS.update({"state": "done", "errors": 0})
+        return True
+
+    monkeypatch.setattr(warmup, "_FORM_SIGS", {})
+    monkeypatch.setattr(warmup, "crawl_catalog", fake_crawl)
+
+    assert warmup.warm_up(refresh=True)
+    forms = warmup.get_ticket_forms_cached()
+    forms[1]["name"] = "Access requests"
+    assert warmup.warm_up(refresh=True)
+    assert warmup.warm_up(refresh=True)
+    assert crawled == [{5, 6}, {6}, set()]
+
+
+def test_warm_up_requested_while_running_runs_again(monkeypatch):
+    _fake_catalog(monkeypatch)
+    entered, release = threading.Event(), threading.Event()
+    runs = []
+
+    def slow_forms():
+        runs.append(1)
+        if len(runs) == 1:
+            entered.set()
+            release.wait(2)
+        return [{"id": 5, "name": "Help"}]
+
+    monkeypatch.setattr(warmup, "get_ticket_forms_cached", slow_forms)
+    first = threading.Thread(target=warmup.warm_up)
+    first.start()
+    assert entered.wait(2)
+    assert warmup.warm_up(refresh=True) is False
+    release.set()
+    first.join(2)
+    assert len(runs) == 2
+    assert not warmup._RERUN["pending"]
+    assert warmup._WARM_LOCK.acquire(blocking=False)
+    warmup._WARM_LOCK.release()
@@ -70,7 +70,7 @@ def test_update_wizard_uses_filtered_fields(monkeypatch):
     monkeypatch.setattr(wizard, "get_ticket_forms_cached", lambda: [form])
     monkeypatch.setattr(wizard, "get_ticket_fields_cached", lambda: fd_fields)
 
-    captured = {"compute_fields": []}
+    captured = {"plan_fields": [], "walks": 0}
 
     def fake_filter(f, fields):
         captured["called"] = (f, fields)
@@ -78,14 +78,21 @@ def test_update_wizard_uses_filtered_fields(monkeypatch):
 
     monkeypatch.setattr(wizard, "filter_fields_for_form", fake_filter)
 
-    def fake_compute(form_, fields_arg, state):
-        captured["compute_fields"].append(fields_arg)
-        return [None]
+    def fake_plan(form_, fields_arg):
+        captured["plan_fields"].append(fields_arg)
+        return "plan"
 
-    monkeypatch.setattr(wizard, "compute_pages", fake_compute)
+    monkeypatch.setattr(wizard, "get_form_plan", fake_plan)
 
-    def fake_build(form_, fields_arg, tok, page, state):
+    def fake_resume(plan, state, prev, changed):
+        captured["walks"] += 1
+        return {"plan": "v", "pages": [], "checkpoints": [], "visited": []}
+
+    monkeypatch.setattr(wizard, "resume_walk", fake_resume)
+
+    def fake_build(form_, fields_arg, tok, page, state, pages=None, plan=None):
         captured["fields_passed"] = fields_arg
+        captured["pages_passed"] = pages
         return {"type": "modal"}
 
     monkeypatch.setattr(wizard, "build_wizard_page_modal", fake_build)
@@ -94,6 +101,8 @@ def test_update_wizard_uses_filtered_fields(monkeypatch):
     wizard.update_wizard("vid", token, None, None)
 
     assert captured["called"] == (form, fd_fields)
-    # compute_pages is invoked twice before rendering
-    assert captured["compute_fields"] == [[{"id": 1}], [{"id": 1}]]
+    # pages are walked once and handed to the renderer
+    assert captured["plan_fields"] == [[{"id": 1}]]
+    assert captured["walks"] == 1
+    assert captured["pages_passed"] == ["core", None]
     assert captured["fields_passed"] == [{"id": 1}]
@@ -0,0 +1,45 @@
+import sys, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from services import metrics
+from logic import sessions, wizard
+from logic.sessions import SessionStore
+
+
+def test_idle_sessions_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sessions.time, "time", lambda: now[0])
+    store = SessionStore(60, 10, 10_000, name="t_ttl")
+    store["a"] = {"page": 0}
+    now[0] += 30
+    assert store.get("a") == {"page": 0}
+    now[0] += 59
+    assert "a" in store
+    now[0] += 61
+    assert store.get("a") is None
+    assert metrics.get("t_ttl.expired") == 1
+    assert metrics.get("t_ttl.count") == 0
+
+
+def test_lru_eviction_by_count_and_bytes():
+    store = SessionStore(0, 2, 10_000, name="t_lru")
+    store["a"] = {"v": 1}
+    store["b"] = {"v": 2}
+    store.get("a")
+    store["c"] = {"v": 3}
+    assert sorted(store) == ["a", "c"]
+
+    small = SessionStore(0, 100, 70, name="t_bytes")
+    for token in "xyz":
+        small[token] = {"values": "." * 20}
+    assert list(small) == ["y", "z"]
+    assert small.bytes <= 70
+    assert metrics.get("t_bytes.evicted") == 1
+
+
+def test_expired_session_shows_expired_view(monkeypatch):
+    wizard.WIZARD_SESSIONS.clear()
+    pushed = []
+    monkeypatch.setattr(wizard, "slack_api", lambda method, payload, supersede=None: pushed.append(payload))
+    wizard.update_wizard("vid", "gone", "h", {}, "next")
+    assert pushed[0]["view"] == wizard.SESSION_EXPIRED_VIEW
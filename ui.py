@@ -41,3 +41,22 @@ def build_form_picker_modal(forms):
             "dispatch_action": True
         }]
     }
+
+def error_modal(text):
+    # Same shell as the loading modal, just with the problem spelled out.
+    return {
+        "type": "modal",
+        "title": {"type": "plain_text", "text": "New IT Ticket"},
+        "close": {"type": "plain_text", "text": "Close"},
+        "blocks": [{"type": "section", "text": {"type": "mrkdwn", "text": text}}]
+    }
+
+def ticket_created_modal(ticket_id):
+    return {
+        "type": "modal",
+        "title": {"type": "plain_text", "text": "Ticket created"},
+        "close": {"type": "plain_text", "text": "Close"},
+        "blocks": [
+            {"type": "section", "text": {"type": "mrkdwn", "text": f":white_check_mark: Ticket created: {ticket_id}"}}
+        ]
+    }